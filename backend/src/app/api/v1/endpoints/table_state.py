@@ -1,5 +1,6 @@
 """API endpoints for table state operations."""
 
+import asyncio
 import logging
 from typing import List, Optional
 
@@ -14,6 +15,8 @@ from app.schemas.table_state_api import (
     TableStateResponse,
     TableStateUpdate,
     TableStateListResponse,
+    TableStateSummaryListResponse,
+    TableStateSummaryResponse,
 )
 from app.services.table_state_service import TableStateService
 
@@ -40,7 +43,9 @@ async def create_table_state(
 ) -> TableStateResponse:
     """Create a new table state."""
     # Check if a table state with the same ID already exists
-    existing_table_state = TableStateService.get_table_state(table_state_create.id)
+    existing_table_state = await asyncio.to_thread(
+        TableStateService.get_table_state, table_state_create.id
+    )
     if existing_table_state:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -55,7 +60,9 @@ async def create_table_state(
     )
     
     # Save the table state
-    saved_table_state = TableStateService.save_table_state(table_state)
+    saved_table_state = await asyncio.to_thread(
+        TableStateService.save_table_state, table_state
+    )
     
     return TableStateResponse(
         id=saved_table_state.id,
@@ -77,7 +84,7 @@ async def list_table_states(
     _: dict = Depends(jwt_auth),
 ) -> TableStateListResponse:
     """List all table states."""
-    table_states = TableStateService.list_table_states()
+    table_states = await asyncio.to_thread(TableStateService.list_table_states)
     
     return TableStateListResponse(
         items=[
@@ -93,6 +100,32 @@ async def list_table_states(
     )
 
 
+@router.get(
+    "/summaries",
+    response_model=TableStateSummaryListResponse,
+    status_code=status.HTTP_200_OK,
+    summary="List all table state summaries",
+    description="List the ID, name and timestamps of all table states, without their data.",
+)
+async def list_table_state_summaries(
+    _: dict = Depends(jwt_auth),
+) -> TableStateSummaryListResponse:
+    """List all table state summaries."""
+    summaries = await asyncio.to_thread(TableStateService.list_table_state_summaries)
+    
+    return TableStateSummaryListResponse(
+        items=[
+            TableStateSummaryResponse(
+                id=summary.id,
+                name=summary.name,
+                created_at=summary.created_at,
+                updated_at=summary.updated_at,
+            )
+            for summary in summaries
+        ]
+    )
+
+
 @router.get(
     "/{table_id}",
     response_model=TableStateResponse,
@@ -105,7 +138,7 @@ async def get_table_state(
     _: dict = Depends(jwt_auth),
 ) -> TableStateResponse:
     """Get a table state by ID."""
-    table_state = TableStateService.get_table_state(table_id)
+    table_state = await asyncio.to_thread(TableStateService.get_table_state, table_id)
     
     if not table_state:
         raise HTTPException(
@@ -136,7 +169,9 @@ async def update_table_state(
 ) -> TableStateResponse:
     """Update a table state by ID."""
     # Get the existing table state
-    existing_table_state = TableStateService.get_table_state(table_id)
+    existing_table_state = await asyncio.to_thread(
+        TableStateService.get_table_state, table_id
+    )
     
     if not existing_table_state:
         raise HTTPException(
@@ -152,7 +187,9 @@ async def update_table_state(
         existing_table_state.data = table_state_update.data
     
     # Save the updated table state
-    updated_table_state = TableStateService.save_table_state(existing_table_state)
+    updated_table_state = await asyncio.to_thread(
+        TableStateService.save_table_state, existing_table_state
+    )
     
     return TableStateResponse(
         id=updated_table_state.id,
@@ -175,7 +212,7 @@ async def delete_table_state(
 ) -> None:
     """Delete a table state by ID."""
     # Delete the table state
-    deleted = TableStateService.delete_table_state(table_id)
+    deleted = await asyncio.to_thread(TableStateService.delete_table_state, table_id)
     
     if not deleted:
         raise HTTPException(
@@ -30,7 +30,9 @@ class Qdrant(BaseSettings):
     url: Optional[str] = None
     port: Optional[int] = 6333
     grpc_port: int = 6334
-    prefer_grpc: bool = False
+    # gRPC multiplexes concurrent calls over one connection and skips JSON
+    # encoding; set to false if only the REST port is reachable
+    prefer_grpc: bool = True
     https: Optional[bool] = None
     api_key: Optional[str] = None
     prefix: Optional[str] = None
@@ -55,6 +57,17 @@ class Settings(BaseSettings):
     # S3 CONFIG
     s3_bucket_name: str = "ai-grid-deep"
     s3_prefix: str = "documents"  # Folder prefix for documents in the bucket
+    # Files at least this large are uploaded in parts of this size (8MB)
+    s3_multipart_threshold: int = 8 * 1024 * 1024
+    # Maximum number of parts uploaded concurrently per file, and of blocking
+    # S3/Textract calls in flight across files
+    s3_max_concurrency: int = 10
+    # Hash file contents for Textract cache keys instead of using stat metadata
+    textract_content_hash: bool = False
+    # SQLite file keeping Textract results across restarts; unset to disable
+    textract_cache_db_uri: Optional[str] = None
+    # Seconds a persisted Textract result is reused for (30 days)
+    textract_cache_ttl: int = 30 * 24 * 3600
 
     # API CONFIG
     project_name: str = "AI Grid API"
@@ -75,6 +88,8 @@ class Settings(BaseSettings):
     llm_provider: str = "openai"
     llm_model: str = "gpt-4o"
     openai_api_key: Optional[str] = None
+    # Maximum number of concurrent LLM API calls per worker
+    llm_concurrency: int = 20
 
     # VECTOR DATABASE CONFIG
     vector_db_provider: str = "milvus"
@@ -87,9 +102,19 @@ class Settings(BaseSettings):
 
     # QDRANT CONFIG
     qdrant: Qdrant = Field(default_factory=lambda: Qdrant())
+    # Maximum number of upsert batches sent to Qdrant concurrently
+    qdrant_max_in_flight: int = 4
 
     # QUERY CONFIG
     query_type: str = "hybrid"
+    # Maximum number of queries processed concurrently per worker
+    query_concurrency: int = 10
+    # Maximum number of characters of retrieved chunks put in a query prompt
+    query_max_context_chars: int = 100_000
+    # Maximum number of query results cached per worker
+    query_cache_size: int = 1024
+    # Seconds a query result is reused for
+    query_cache_ttl: int = 300
 
     # DOCUMENT PROCESSING CONFIG
     loader: str = "pypdf"
@@ -13,7 +13,10 @@ from app.core.auth import decode_token
 from app.core.config import Settings, get_settings
 from app.services.document_service import DocumentService
 from app.services.embedding.factory import EmbeddingServiceFactory
+from app.services.loaders.cache import cache_stats, close_caches
+from app.services.loaders.simple_pdf_service import close_pdf_pool
 from app.services.llm.factory import CompletionServiceFactory
+from app.services.table_state_service import init_db
 from app.services.vector_db.factory import VectorDBFactory
 
 logging.basicConfig(level=logging.INFO)
@@ -192,6 +195,12 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Error setting up data directory: {e}")
     
+    # Create the table states schema
+    try:
+        init_db()
+    except Exception as e:
+        logger.error(f"Error initializing table states database: {e}")
+    
     # Initialize LangSmith tracing if enabled
     if settings.langsmith_tracing and settings.langsmith_api_key:
         logger.info("Initializing LangSmith tracing")
@@ -247,6 +256,13 @@ async def startup_event():
         app.state.services_initialized = False
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and worker processes started by the services."""
+    close_caches()
+    close_pdf_pool()
+
+
 @app.get("/ping")
 async def pong(settings: Settings = Depends(get_settings)) -> Dict[str, Any]:
     """Ping the API to check if it's running."""
@@ -255,3 +271,9 @@ async def pong(settings: Settings = Depends(get_settings)) -> Dict[str, Any]:
         "environment": settings.environment,
         "testing": settings.testing,
     }
+
+
+@app.get("/cache-stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """Get the size and hit/miss counters of the document caches."""
+    return cache_stats()
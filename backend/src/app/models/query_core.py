@@ -1,6 +1,7 @@
 """Query model."""
 
-from typing import List, Literal, Optional, Union
+from functools import cached_property
+from typing import Dict, Iterable, List, Literal, Optional, Tuple, Union
 
 from pydantic import BaseModel
 
@@ -28,6 +29,25 @@ class TransformationDict(BaseModel):
     resolved: Union[str, List[str]]
 
 
+def parse_entity_options(options: Iterable[str]) -> Dict[str, str]:
+    """Parse "keyword:replacement" resolve_entity options into a dict.
+
+    Raises
+    ------
+    ValueError
+        If an option has no "keyword:replacement" separator.
+    """
+    parsed: Dict[str, str] = {}
+    for option in options:
+        # partition doesn't build a list per option like split does, and
+        # only splits at the first colon so replacements may contain one
+        keyword, separator, replacement = option.partition(":")
+        if not separator:
+            raise ValueError(f"Invalid resolve_entity option: {option!r}")
+        parsed[keyword] = replacement
+    return parsed
+
+
 class Rule(BaseModel):
     """Rule model."""
 
@@ -35,6 +55,21 @@ class Rule(BaseModel):
     options: Optional[List[str]] = None
     length: Optional[int] = None
 
+    @cached_property
+    def parsed_options(self) -> Dict[str, str]:
+        """Get the "keyword:replacement" options as a dict, parsed once.
+
+        Raises
+        ------
+        ValueError
+            If an option has no "keyword:replacement" separator.
+        """
+        return parse_entity_options(self.options or ())
+
+    def cache_key(self) -> Tuple[str, Tuple[str, ...], Optional[int]]:
+        """Get a hashable key identifying the rule, for caching query results."""
+        return (self.type, tuple(self.options or ()), self.length)
+
 
 class Chunk(BaseModel):
     """Chunk model."""
@@ -20,3 +20,13 @@ class TableState(BaseModel):
         """Configuration for the TableState model."""
         
         from_attributes = True  # Updated from orm_mode for Pydantic V2
+
+
+class TableStateSummary(BaseModel):
+    """Model for the metadata of a table state, without its data."""
+    
+    id: str
+    name: str
+    user_id: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
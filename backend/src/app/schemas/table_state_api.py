@@ -35,3 +35,18 @@ class TableStateListResponse(BaseModel):
     """Schema for listing table states."""
     
     items: List[TableStateResponse]
+
+
+class TableStateSummaryResponse(BaseModel):
+    """Schema for table state metadata response, without the data."""
+    
+    id: str
+    name: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class TableStateSummaryListResponse(BaseModel):
+    """Schema for listing table state metadata."""
+    
+    items: List[TableStateSummaryResponse]
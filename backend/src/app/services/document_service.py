@@ -14,6 +14,7 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.core.config import Settings
 from app.services.llm.base import CompletionService
 from app.services.loaders.factory import LoaderFactory
+from app.services.query_service import clear_document_results
 from app.services.vector_db.base import VectorDBService
 
 logger = logging.getLogger(__name__)
@@ -95,6 +96,8 @@ class DocumentService:
                 
                 result = await self.vector_db_service.upsert_vectors(prepared_chunks, parent_run_id)
                 logger.info(f"Upsert result: {result}")
+                # Results cached before the document was indexed are stale
+                clear_document_results(document_id)
             except Exception as e:
                 logger.error(f"Error processing document: {e}", exc_info=True)
                 # Don't delete the file on error, so we can debug
@@ -641,6 +644,7 @@ class DocumentService:
         try:
             # The parent_run_id will be handled by the traceable decorator
             result = await self.vector_db_service.delete_document(document_id, parent_run_id)
+            clear_document_results(document_id)
             return result
         except Exception as e:
             logger.error(f"Error deleting document: {e}")
@@ -5,7 +5,7 @@ import logging
 import time
 from typing import Any, Optional, Type
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pydantic import BaseModel
 
 from app.core.config import Settings
@@ -26,8 +26,12 @@ class OpenAICompletionService(CompletionService):
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        # Bounds the API calls in flight, whichever queries they come from
+        self._semaphore = asyncio.Semaphore(settings.llm_concurrency)
         if settings.openai_api_key:
-            self.client = OpenAI(api_key=settings.openai_api_key)
+            # The async client lets concurrent queries reach the API together
+            # instead of each blocking the event loop until it completes
+            self.client = AsyncOpenAI(api_key=settings.openai_api_key)
         else:
             self.client = None  # type: ignore
             logger.warning(
@@ -57,11 +61,13 @@ class OpenAICompletionService(CompletionService):
                 # Use asyncio.wait_for with reduced timeout for faster failure detection
                 start_time = time.time()
                 
-                # Create and execute the API call task with timeout
-                response = await asyncio.wait_for(
-                    self._make_api_call(prompt, response_model, parent_run_id),
-                    timeout=timeout
-                )
+                # Create and execute the API call task with timeout; waiting
+                # for a slot doesn't count towards it
+                async with self._semaphore:
+                    response = await asyncio.wait_for(
+                        self._make_api_call(prompt, response_model, parent_run_id),
+                        timeout=timeout
+                    )
                 
                 elapsed_time = time.time() - start_time
                 logger.info(f"API call completed in {elapsed_time:.2f} seconds")
@@ -110,7 +116,7 @@ class OpenAICompletionService(CompletionService):
     ) -> Any:
         """Make the actual API call to OpenAI with optimized settings."""
         # Use a connection pool for better performance
-        return self.client.beta.chat.completions.parse(
+        return await self.client.beta.chat.completions.parse(
             model=self.settings.llm_model,
             messages=[{"role": "user", "content": prompt}],
             response_format=response_model,
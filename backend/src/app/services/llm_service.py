@@ -141,13 +141,13 @@ async def generate_response(
 
     try:
         response = await llm_service.generate_completion(prompt, output_model)
-        logger.info(f"Raw response from LLM: {response}")
+        logger.debug("Raw response from LLM: %s", response)
 
         if response is None or response.answer is None:
             logger.warning("LLM returned None response")
             return {"answer": None}
 
-        logger.info(f"Processed response: {response.answer}")
+        logger.debug("Processed response: %s", response.answer)
         return {"answer": response.answer}
     except Exception as e:
         logger.error(f"Error generating response: {str(e)}", exc_info=True)
@@ -199,7 +199,7 @@ async def generate_inferred_response(
             logger.warning("LLM returned None response")
             return {"answer": None}
 
-        logger.info(f"Processed response: {response.answer}")
+        logger.debug("Processed response: %s", response.answer)
         return {"answer": response.answer}
     except Exception as e:
         logger.error(f"Error generating response: {str(e)}", exc_info=True)
@@ -1,7 +1,7 @@
 """Base loader service."""
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, List
 
 from langchain.schema import Document as LangchainDocument
 
@@ -13,3 +13,12 @@ class LoaderService(ABC):
     async def load(self, file_path: str) -> List[LangchainDocument]:
         """Load document from file path."""
         pass
+
+    async def load_stream(self, file_path: str) -> AsyncIterator[LangchainDocument]:
+        """Yield documents from file path as they are loaded.
+
+        Loaders that can extract incrementally override this; by default the
+        whole file is loaded first.
+        """
+        for document in await self.load(file_path):
+            yield document
@@ -0,0 +1,278 @@
+"""Bounded in-memory cache for loaded documents."""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+import orjson
+from cachetools import LRUCache, TTLCache
+from langchain.schema import Document as LangchainDocument
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Interval in seconds between sweeps of expired entries
+SWEEP_INTERVAL = 60
+
+# Every live cache, so the app can report stats and stop sweepers on shutdown
+_CACHES: "weakref.WeakSet[DocumentCache]" = weakref.WeakSet()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the size and hit/miss counters of every document cache by name."""
+    return {cache.name: cache.stats() for cache in list(_CACHES)}
+
+
+def close_caches() -> None:
+    """Stop the background sweepers of every document cache."""
+    for cache in list(_CACHES):
+        cache.close()
+
+
+class DocumentCache:
+    """Thread-safe LRU cache with optional TTL expiry for loaded documents.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is
+    reached, and expire ``ttl`` seconds after insertion. A background
+    sweeper started on the first insert drops expired entries so memory is
+    released even for files that are never requested again.
+
+    With ``ttl=None`` entries never expire. Use this when the keys already
+    change with the underlying content, e.g. they include the file's size
+    and modification time.
+    """
+
+    def __init__(self, name: str, maxsize: int = 128, ttl: Optional[float] = 300):
+        """Initialize the cache."""
+        self.name = name
+        self._cache: LRUCache = (
+            LRUCache(maxsize=maxsize) if ttl is None else TTLCache(maxsize=maxsize, ttl=ttl)
+        )
+        self._lock = threading.RLock()
+        self._sweeper: Optional["asyncio.Task[None]"] = None
+        self.hits = 0
+        self.misses = 0
+        _CACHES.add(self)
+
+    def get(self, key: Hashable) -> Optional[List[LangchainDocument]]:
+        """Get the documents cached for a key, or None on a miss."""
+        with self._lock:
+            documents = self._cache.get(key)
+            if documents is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return documents
+
+    def set(self, key: Hashable, documents: List[LangchainDocument]) -> None:
+        """Cache the documents for a key."""
+        with self._lock:
+            self._cache[key] = documents
+        self._start_sweeper()
+
+    def expire(self) -> None:
+        """Remove all expired entries."""
+        if not isinstance(self._cache, TTLCache):
+            return
+        with self._lock:
+            self._cache.expire()
+
+    def clear(self) -> None:
+        """Remove all entries, reset the counters and stop the sweeper."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+        self.close()
+
+    def close(self) -> None:
+        """Stop the background sweeper, it restarts on the next insert."""
+        sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None and not sweeper.done() and not sweeper.get_loop().is_closed():
+            sweeper.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check whether an unexpired entry exists for a key."""
+        with self._lock:
+            return key in self._cache
+
+    def __len__(self) -> int:
+        """Get the number of cached entries."""
+        with self._lock:
+            return len(self._cache)
+
+    def _start_sweeper(self) -> None:
+        """Start the background sweeper on the running event loop."""
+        if not isinstance(self._cache, TTLCache):
+            # Nothing ever expires, so there is nothing to sweep
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not called from a coroutine, expiry still happens on access
+            return
+        if (
+            self._sweeper is not None
+            and not self._sweeper.done()
+            and self._sweeper.get_loop() is loop
+        ):
+            return
+        self._sweeper = loop.create_task(self._sweep())
+
+    async def _sweep(self) -> None:
+        """Periodically evict expired entries until the cache is empty."""
+        while len(self):
+            await asyncio.sleep(SWEEP_INTERVAL)
+            self.expire()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Document cache swept: %s", self.stats())
+
+
+class PersistentDocumentCache:
+    """SQLite-backed cache of loaded documents that survives restarts.
+
+    Meant for results that are expensive to recompute and depend only on the
+    file contents, so keys should be content hashes. Documents are stored as
+    JSON. Storage errors are logged and treated as misses, so a broken cache
+    file never fails a load.
+
+    The methods block on disk I/O; call them from a worker thread.
+    """
+
+    def __init__(self, name: str, path: str, ttl: Optional[float] = None):
+        """Initialize the cache; the database is opened on first use."""
+        self.name = name
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the table, under the lock."""
+        if self._conn is None:
+            dir_path = os.path.dirname(self.path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "key TEXT PRIMARY KEY, documents BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[List[LangchainDocument]]:
+        """Get the documents stored for a key, or None on a miss."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT documents, created_at FROM documents WHERE key = ?", (key,)
+                ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not read {self.name} cache at {self.path}: {e}")
+            return None
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return None
+        return [
+            LangchainDocument(page_content=page_content, metadata=metadata)
+            for page_content, metadata in orjson.loads(row[0])
+        ]
+
+    def set(self, key: str, documents: List[LangchainDocument]) -> None:
+        """Store the documents for a key."""
+        data = orjson.dumps(
+            [(document.page_content, document.metadata) for document in documents],
+            default=str,
+        )
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO documents (key, documents, created_at) VALUES (?, ?, ?)",
+                    (key, data, time.time()),
+                )
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not write {self.name} cache at {self.path}: {e}")
+
+    def close(self) -> None:
+        """Close the database connection, it reopens on next use."""
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+
+class InflightLoads(Generic[T]):
+    """Coalesce concurrent loads of the same key into a single load.
+
+    The first caller for a key runs the load; callers arriving while it is
+    in flight await the same result instead of starting their own. If the
+    caller running the load is cancelled, a waiting caller takes over.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the in-flight map."""
+        self._futures: Dict[Hashable, "asyncio.Future[T]"] = {}
+
+    async def run(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Run the load for a key, or wait for the one already running."""
+        future = self._futures.get(key)
+        while future is not None:
+            logger.debug("Waiting for in-flight load: %s", key)
+            # asyncio.wait never cancels the shared future and only raises
+            # CancelledError when this waiter itself is cancelled, so the
+            # two cancellations can't be mistaken for each other
+            await asyncio.wait((future,))
+            if not future.cancelled():
+                return future.result()
+            # The caller running the load was cancelled (e.g. its client
+            # disconnected), so wait for a retried load or run it ourselves
+            logger.debug("In-flight load was cancelled, retrying: %s", key)
+            future = self._futures.get(key)
+
+        # No await between the lookup and the insert, so no lock is needed
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._futures.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check whether a load for a key is in flight."""
+        return key in self._futures
+
+    def __len__(self) -> int:
+        """Get the number of loads in flight."""
+        return len(self._futures)
@@ -46,6 +46,10 @@ PDF_TYPE_SCANNED = "scanned"
 PDF_TYPE_MIXED = "mixed"
 PDF_TYPE_UNKNOWN = "unknown"
 
+# Text PDFs below this page count are extracted during type detection,
+# while PyMuPDF already has the document open
+FAST_PATH_MAX_PAGES = 50
+
 class PDFLoader(LoaderService):
     """PDF and Text loader service with optimized performance and smart PDF type detection."""
 
@@ -71,11 +75,14 @@ class PDFLoader(LoaderService):
             start_time = time.time()
             
             # Detect PDF type to choose the best extraction method
-            pdf_type = await self._detect_pdf_type(file_path)
+            pdf_type, page_texts = await self._detect_pdf_type(file_path)
             logger.info(f"Detected PDF type: {pdf_type} for {file_path}")
             
             # Choose extraction method based on PDF type
-            if pdf_type == PDF_TYPE_SCANNED:
+            if page_texts is not None:
+                # Small text PDF already extracted during detection
+                documents = self._documents_from_page_texts(page_texts, file_path)
+            elif pdf_type == PDF_TYPE_SCANNED:
                 # For scanned documents, skip PyPDF and go straight to Unstructured
                 if UNSTRUCTURED_AVAILABLE:
                     logger.info(f"Using UnstructuredPDFLoader for scanned document: {file_path}")
@@ -102,10 +109,9 @@ class PDFLoader(LoaderService):
         elif file_extension == ".txt":
             try:
                 logger.info(f"Loading text file: {file_path}")
-                # Run TextLoader in a thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
+                # Run TextLoader in a worker thread to avoid blocking
                 loader = TextLoader(file_path)
-                documents = await loop.run_in_executor(None, loader.load)
+                documents = await asyncio.to_thread(loader.load)
                 logger.info(f"Successfully loaded text file: {len(documents)} documents")
                 return documents
             except Exception as e:
@@ -118,15 +124,13 @@ class PDFLoader(LoaderService):
     
     async def _get_file_hash(self, file_path: str) -> str:
         """Generate a hash of the file for caching."""
-        loop = asyncio.get_event_loop()
-        
-        # Run file hashing in a thread pool
+        # Run file hashing in a worker thread
         def hash_file():
             with open(file_path, 'rb') as f:
                 # Read first 8KB for quick hashing
                 return hashlib.md5(f.read(8192)).hexdigest()
         
-        return await loop.run_in_executor(None, hash_file)
+        return await asyncio.to_thread(hash_file)
     
     def _update_cache(self, file_hash: str, documents: List[LangchainDocument]) -> None:
         """Update the cache with new documents."""
@@ -140,68 +144,110 @@ class PDFLoader(LoaderService):
             PDF_CACHE.pop(oldest_key)
             logger.info(f"Cache full, removed oldest entry: {oldest_key}")
     
-    async def _detect_pdf_type(self, file_path: str) -> str:
-        """Detect if a PDF is text-based, scanned, or mixed."""
+    async def _detect_pdf_type(
+        self, file_path: str
+    ) -> Tuple[str, Optional[Dict[int, str]]]:
+        """Detect if a PDF is text-based, scanned, or mixed.
+
+        Returns the PDF type and, for small text PDFs analyzed with PyMuPDF,
+        the extracted text of every page keyed by zero-based page number.
+        """
         # Quick check based on file size
         file_size = os.path.getsize(file_path)
         if file_size > 10_000_000:  # 10MB
             logger.info(f"Large PDF detected ({file_size} bytes), likely scanned or image-heavy")
-            return PDF_TYPE_SCANNED
+            return PDF_TYPE_SCANNED, None
         
         # Use PyMuPDF for more accurate detection if available
         if PYMUPDF_AVAILABLE:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, self._analyze_pdf_with_pymupdf, file_path)
+            return await asyncio.to_thread(self._analyze_pdf_with_pymupdf, file_path)
         
         # Fallback to basic detection with PyPDF
-        return await self._basic_pdf_detection(file_path)
+        return await self._basic_pdf_detection(file_path), None
     
-    def _analyze_pdf_with_pymupdf(self, file_path: str) -> str:
-        """Analyze PDF using PyMuPDF to determine its type."""
+    def _analyze_pdf_with_pymupdf(
+        self, file_path: str
+    ) -> Tuple[str, Optional[Dict[int, str]]]:
+        """Analyze PDF using PyMuPDF to determine its type.
+
+        Small text PDFs are extracted in the same pass so that the caller
+        does not have to parse the file a second time.
+        """
         try:
             doc = fitz.open(file_path)
             
-            # Check first few pages (up to 5) to determine document characteristics
-            max_pages = min(5, len(doc))
-            text_pages = 0
-            image_pages = 0
-            
-            for page_num in range(max_pages):
-                page = doc[page_num]
+            try:
+                # Check first few pages (up to 5) to determine document characteristics
+                num_pages = len(doc)
+                max_pages = min(5, num_pages)
+                text_pages = 0
+                image_pages = 0
+                sampled_texts: Dict[int, str] = {}
                 
-                # Check for images
-                images = page.get_images(full=True)
+                for page_num in range(max_pages):
+                    page = doc[page_num]
+                    
+                    # Check for images
+                    images = page.get_images(full=True)
+                    
+                    # Check for text
+                    text = page.get_text()
+                    sampled_texts[page_num] = text
+                    
+                    # Determine if page is text-based or image-based
+                    if len(text.strip()) > 100:  # Significant text content
+                        text_pages += 1
+                    if len(images) > 0:  # Has images
+                        image_pages += 1
                 
-                # Check for text
-                text = page.get_text()
+                # Determine document type based on page analysis
+                if text_pages == 0 and image_pages > 0:
+                    pdf_type = PDF_TYPE_SCANNED  # No text pages, only images
+                elif text_pages > 0 and image_pages == 0:
+                    pdf_type = PDF_TYPE_TEXT  # Only text pages
+                elif text_pages > 0 and image_pages > 0:
+                    pdf_type = PDF_TYPE_MIXED  # Mix of text and images
+                else:
+                    pdf_type = PDF_TYPE_UNKNOWN
                 
-                # Determine if page is text-based or image-based
-                if len(text.strip()) > 100:  # Significant text content
-                    text_pages += 1
-                if len(images) > 0:  # Has images
-                    image_pages += 1
-            
-            doc.close()
-            
-            # Determine document type based on page analysis
-            if text_pages == 0 and image_pages > 0:
-                return PDF_TYPE_SCANNED  # No text pages, only images
-            elif text_pages > 0 and image_pages == 0:
-                return PDF_TYPE_TEXT  # Only text pages
-            elif text_pages > 0 and image_pages > 0:
-                return PDF_TYPE_MIXED  # Mix of text and images
-            else:
-                return PDF_TYPE_UNKNOWN
+                # Extract the remaining pages while the document is open
+                page_texts = None
+                if pdf_type == PDF_TYPE_TEXT and num_pages < FAST_PATH_MAX_PAGES:
+                    page_texts = {
+                        page_num: (
+                            sampled_texts[page_num]
+                            if page_num in sampled_texts
+                            else doc[page_num].get_text()
+                        )
+                        for page_num in range(num_pages)
+                    }
+                
+                return pdf_type, page_texts
+            finally:
+                doc.close()
                 
         except Exception as e:
             logger.error(f"Error analyzing PDF with PyMuPDF: {str(e)}")
-            return PDF_TYPE_UNKNOWN
+            return PDF_TYPE_UNKNOWN, None
+    
+    def _documents_from_page_texts(
+        self, page_texts: Dict[int, str], source: str
+    ) -> List[LangchainDocument]:
+        """Wrap per-page text extracted during detection into documents."""
+        documents = [
+            LangchainDocument(
+                page_content=text,
+                metadata={"page": page_num + 1, "source": source}
+            )
+            for page_num, text in sorted(page_texts.items())
+            if text and text.strip()
+        ]
+        logger.info(f"Extracted {len(documents)} pages with PyMuPDF during detection")
+        return documents
     
     async def _basic_pdf_detection(self, file_path: str) -> str:
         """Basic PDF type detection using PyPDF."""
         try:
-            loop = asyncio.get_event_loop()
-            
             # Check for text markers in PDF
             def check_pdf():
                 with open(file_path, 'rb') as f:
@@ -216,7 +262,7 @@ class PDFLoader(LoaderService):
                 else:
                     return PDF_TYPE_UNKNOWN
             
-            return await loop.run_in_executor(None, check_pdf)
+            return await asyncio.to_thread(check_pdf)
         except Exception as e:
             logger.error(f"Error in basic PDF detection: {str(e)}")
             return PDF_TYPE_UNKNOWN
@@ -226,16 +272,16 @@ class PDFLoader(LoaderService):
         try:
             logger.info(f"Loading PDF with optimized PyPDF: {file_path}")
             
-            # Use PyPDF directly for better performance
-            loop = asyncio.get_event_loop()
-            
-            # Run PDF opening in a thread pool to avoid blocking
-            pdf_reader = await loop.run_in_executor(
-                None, 
+            # Use PyPDF directly for better performance, opening the PDF in a
+            # worker thread to avoid blocking
+            pdf_reader = await asyncio.to_thread(
                 functools.partial(pypdf.PdfReader, file_path, strict=False)
             )
             
-            num_pages = len(pdf_reader.pages)
+            # Materialize the page list once; indexing pdf_reader.pages resolves
+            # the page tree on every access
+            pages = await asyncio.to_thread(list, pdf_reader.pages)
+            num_pages = len(pages)
             logger.info(f"PDF has {num_pages} pages")
             
             if num_pages == 0:
@@ -250,16 +296,11 @@ class PDFLoader(LoaderService):
                 batch_end = min(i + batch_size, num_pages)
                 logger.info(f"Processing batch of pages {i} to {batch_end-1}")
                 
-                # Create tasks for this batch
-                tasks = []
-                for page_num in range(i, batch_end):
-                    tasks.append(self._process_page(loop, pdf_reader, page_num, file_path))
-                
-                # Process this batch
-                batch_documents = await asyncio.gather(*tasks)
-                
-                # Filter out empty documents
-                batch_documents = [doc for doc in batch_documents if doc and doc.page_content.strip()]
+                # Pages share the reader's stream and object cache, which aren't
+                # thread-safe, so each batch is extracted serially in one worker
+                batch_documents = await asyncio.to_thread(
+                    self._process_pages, pages, range(i, batch_end), file_path
+                )
                 all_documents.extend(batch_documents)
             
             if all_documents:
@@ -302,12 +343,21 @@ class PDFLoader(LoaderService):
         else:
             return total_pages  # Process all pages at once for small documents
     
-    async def _process_page(self, loop, pdf_reader, page_num: int, source: str) -> Optional[LangchainDocument]:
-        """Process a single PDF page asynchronously."""
+    def _process_pages(
+        self, pages: List[pypdf.PageObject], page_nums: range, source: str
+    ) -> List[LangchainDocument]:
+        """Extract a batch of pages one after another, skipping empty ones."""
+        documents = []
+        for page_num in page_nums:
+            document = self._process_page(pages[page_num], page_num, source)
+            if document is not None:
+                documents.append(document)
+        return documents
+    
+    def _process_page(self, page: pypdf.PageObject, page_num: int, source: str) -> Optional[LangchainDocument]:
+        """Process a single PDF page."""
         try:
-            # Extract text from page in a thread pool
-            page = pdf_reader.pages[page_num]
-            text = await loop.run_in_executor(None, page.extract_text)
+            text = page.extract_text()
             
             if not text or not text.strip():
                 logger.warning(f"No text extracted from page {page_num}")
@@ -329,11 +379,9 @@ class PDFLoader(LoaderService):
         
         try:
             logger.info(f"Attempting to load PDF with UnstructuredPDFLoader: {file_path}")
-            loop = asyncio.get_event_loop()
-            
-            # Run UnstructuredPDFLoader in a thread pool
+            # Run UnstructuredPDFLoader in a worker thread
             unstructured_loader = UnstructuredPDFLoader(file_path)
-            unstructured_documents = await loop.run_in_executor(None, unstructured_loader.load)
+            unstructured_documents = await asyncio.to_thread(unstructured_loader.load)
             
             if unstructured_documents:
                 logger.info(f"Successfully loaded PDF with UnstructuredPDFLoader: {len(unstructured_documents)} elements")
@@ -352,14 +400,13 @@ class PDFLoader(LoaderService):
         
         try:
             logger.info(f"Attempting to load PDF with optimized Unstructured: {file_path}")
-            loop = asyncio.get_event_loop()
             
             # Try different configurations to see what works
             try:
                 # First try with default parameters
                 logger.info("Trying UnstructuredPDFLoader with default parameters")
                 unstructured_loader = UnstructuredPDFLoader(file_path)
-                unstructured_documents = await loop.run_in_executor(None, unstructured_loader.load)
+                unstructured_documents = await asyncio.to_thread(unstructured_loader.load)
                 
                 if unstructured_documents:
                     logger.info(f"Successfully loaded document with default UnstructuredPDFLoader: {len(unstructured_documents)} elements")
@@ -383,8 +430,8 @@ class PDFLoader(LoaderService):
                     )
                     return loader.load()
                 
-                # Execute in thread pool to avoid blocking
-                unstructured_documents = await loop.run_in_executor(None, run_elements_fast_loader)
+                # Execute in a worker thread to avoid blocking
+                unstructured_documents = await asyncio.to_thread(run_elements_fast_loader)
                 
                 if unstructured_documents:
                     logger.info(f"Successfully loaded document with elements/fast UnstructuredPDFLoader: {len(unstructured_documents)} elements")
@@ -407,8 +454,8 @@ class PDFLoader(LoaderService):
                     )
                     return loader.load()
                 
-                # Execute in thread pool to avoid blocking
-                unstructured_documents = await loop.run_in_executor(None, run_paged_loader)
+                # Execute in a worker thread to avoid blocking
+                unstructured_documents = await asyncio.to_thread(run_paged_loader)
                 
                 if unstructured_documents:
                     logger.info(f"Successfully loaded document with paged UnstructuredPDFLoader: {len(unstructured_documents)} elements")
@@ -1,17 +1,24 @@
 """Simple PDF loader service with optimized performance."""
 
 import asyncio
-import functools
+import concurrent.futures
+import contextlib
+import itertools
 import logging
+import mmap
+import multiprocessing
 import os
-from typing import Dict, List, Optional, Union
+import re
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 import time
 
 from langchain.schema import Document as LangchainDocument
 from langchain_community.document_loaders import TextLoader
 import pypdf
+from cachetools import LRUCache
 
 from app.services.loaders.base import LoaderService
+from app.services.loaders.cache import DocumentCache, InflightLoads
 
 logger = logging.getLogger(__name__)
 
@@ -23,11 +30,313 @@ except ImportError:
     UNSTRUCTURED_AVAILABLE = False
     logger.warning("unstructured package not found, please install it with `pip install unstructured`")
 
-# Simple in-memory cache for PDF documents
-# Key: file_path, Value: (timestamp, documents)
-PDF_CACHE: Dict[str, tuple[float, List[LangchainDocument]]] = {}
-# Cache expiration time in seconds (5 minutes)
-CACHE_EXPIRATION = 300
+# Try to import PyMuPDF (fitz), falling back to PyPDF if it's not available
+try:
+    import fitz
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    logger.warning("PyMuPDF (fitz) not found, falling back to PyPDF for PDF extraction")
+
+# Maximum number of cached PDFs
+MAX_CACHE_SIZE = 128
+
+# Bounded LRU in-memory cache for PDF documents. Entries don't expire, a
+# changed file gets a new key and the stale entry ages out of the LRU.
+# Key: (file_path, size, mtime_ns), Value: documents
+PDF_CACHE = DocumentCache("simple_pdf", maxsize=MAX_CACHE_SIZE, ttl=None)
+
+# PDFs currently being loaded, keyed by (file_path, size, mtime_ns)
+PDF_INFLIGHT: InflightLoads[List[LangchainDocument]] = InflightLoads()
+
+# Number of pages extracted per worker thread call when streaming a PDF
+STREAM_BATCH_PAGES = 8
+
+# Pages whose stored content streams exceed this size (64KB, about 256KB once
+# decoded since content streams usually deflate ~4x) are stripped of graphics
+# operators before text extraction; diagrams and plots spend most parse time
+# on paths
+GRAPHICS_STRIP_THRESHOLD = 65536
+
+# Path construction, painting and colour operators, removed together with
+# their operands outside text objects
+_GRAPHICS_OPS = frozenset((
+    b"m", b"l", b"c", b"v", b"y", b"h", b"re",
+    b"S", b"s", b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*", b"n", b"W", b"W*",
+    b"rg", b"RG", b"sc", b"SC", b"scn", b"SCN",
+))
+# PDF whitespace and the delimiters that end a regular token
+_PDF_WHITESPACE = rb"\x00\t\n\x0c\r "
+_PDF_REGULAR = rb"[^" + _PDF_WHITESPACE + rb"()<>\[\]{}/%]"
+# Operands: dict and array delimiters, hex strings, names, numbers and
+# string literals nested up to two deep; deeper ones are counted by _string_end
+_PDF_OPERAND = (
+    rb"<<|>>|<[^>]*>|/" + _PDF_REGULAR + rb"*|[\[\]{}]"
+    rb"|[-+]?(?:\d+\.?\d*|\.\d+)(?!" + _PDF_REGULAR + rb")"
+    rb"|\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)"
+)
+# One instruction: operands, whitespace and comments up to the operator,
+# after the whitespace separating it from the previous one. Matching whole
+# instructions keeps the Python loop to one pass per operator
+_PDF_INSTRUCTION_RE = re.compile(
+    rb"[" + _PDF_WHITESPACE + rb"]*"
+    rb"(?P<body>(?:[" + _PDF_WHITESPACE + rb"]|%[^\r\n]*|" + _PDF_OPERAND + rb")*)"
+    rb"(?:(?P<operator>" + _PDF_REGULAR + rb"+)|(?P<string>\()|[)<>]|\Z)",
+    re.S,
+)
+# Parentheses and escapes inside a string literal
+_PDF_STRING_PART_RE = re.compile(rb"[()\\]")
+# Start of inline image data: the ID operator and the whitespace after it
+_INLINE_IMAGE_DATA_RE = re.compile(
+    rb"[" + _PDF_WHITESPACE + rb"]ID[" + _PDF_WHITESPACE + rb"]"
+)
+# End of inline image data: EI after whitespace, followed by whitespace or the end
+_INLINE_IMAGE_END_RE = re.compile(
+    rb"[" + _PDF_WHITESPACE + rb"]EI(?=[" + _PDF_WHITESPACE + rb"]|$)"
+)
+
+
+# Mean characters per sampled page below which a PDF is treated as scanned
+SCANNED_MIN_CHARS = 20
+
+# Files detected as scanned, keyed by (file_path, size, mtime_ns), so repeat
+# submissions skip text extraction without opening the PDF
+SCANNED_DECISIONS: LRUCache = LRUCache(maxsize=MAX_CACHE_SIZE)
+
+
+# PDFs of at least this size (1MB) are extracted across worker processes;
+# the size is known without parsing the PDF, unlike its page count
+PROCESS_POOL_MIN_BYTES = 1048576
+
+# Workers are started from a clean server process rather than forked, since
+# forking the multithreaded server can deadlock on locks held by other threads
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Process pool for CPU-bound pypdf extraction, created on first use
+_PDF_POOL: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def _available_cpus() -> int:
+    """Get the number of CPUs this process may run on.
+
+    Unlike os.cpu_count(), this honours the CPU affinity mask a container
+    runtime or taskset restricts the process to.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _get_pdf_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Get the shared process pool for pypdf extraction."""
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        _PDF_POOL = concurrent.futures.ProcessPoolExecutor(
+            max_workers=_available_cpus(), mp_context=_MP_CONTEXT
+        )
+    return _PDF_POOL
+
+
+def close_pdf_pool() -> None:
+    """Shut down the pypdf extraction pool and its worker processes."""
+    global _PDF_POOL
+    if _PDF_POOL is not None:
+        _PDF_POOL.shutdown(wait=False, cancel_futures=True)
+        _PDF_POOL = None
+
+
+def _file_key(file_path: str) -> Optional[Tuple[str, int, int]]:
+    """Get a (path, size, mtime_ns) key identifying the current file contents."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (file_path, st.st_size, st.st_mtime_ns)
+
+
+def _sample_page_numbers(start: int, end: int) -> List[int]:
+    """Get the first, middle and last page numbers of a page range."""
+    return sorted({start, (start + end) // 2, end - 1})
+
+
+def _looks_scanned(texts: Iterable[str]) -> bool:
+    """Check whether sampled page texts are too sparse to be a text layer."""
+    lengths = [len(text.strip()) for text in texts]
+    return sum(lengths) / len(lengths) < SCANNED_MIN_CHARS
+
+
+def _page_text(pdf_reader: pypdf.PdfReader, page_num: int) -> str:
+    """Extract the text of a single page, returning "" on errors."""
+    try:
+        return pdf_reader.pages[page_num].extract_text() or ""
+    except Exception as e:
+        logger.error(f"Error processing page {page_num}: {str(e)}")
+        return ""
+
+
+def _extract_pages(
+    pdf_reader: pypdf.PdfReader,
+    page_nums: Iterable[int],
+    skip_scanned: bool = False,
+) -> Optional[List[Tuple[int, str]]]:
+    """Extract text from the given pages, skipping pages without text.
+
+    With ``skip_scanned`` the first, middle and last pages of the document are
+    extracted first and None is returned if they look scanned; otherwise their
+    text is reused.
+    """
+    sampled: Dict[int, str] = {}
+    num_pages = len(pdf_reader.pages)
+    if skip_scanned and num_pages:
+        sampled = {
+            page_num: _page_text(pdf_reader, page_num)
+            for page_num in _sample_page_numbers(0, num_pages)
+        }
+        if _looks_scanned(sampled.values()):
+            return None
+
+    page_texts = []
+    for page_num in page_nums:
+        text = sampled.get(page_num)
+        if text is None:
+            text = _page_text(pdf_reader, page_num)
+
+        if not text.strip():
+            logger.warning(f"No text extracted from page {page_num}")
+            continue
+
+        page_texts.append((page_num, text))
+    return page_texts
+
+
+def _extract_file_pages(
+    file_path: str, offset: int = 0, step: int = 1, skip_scanned: bool = False
+) -> Optional[List[Tuple[int, str]]]:
+    """Open a PDF and extract every ``step``-th page starting at ``offset``.
+
+    Runs in a worker thread or process; each worker opens its own reader since
+    a PdfReader can't be shared across threads or pickled.
+    """
+    with _open_pdf_reader(file_path) as pdf_reader:
+        num_pages = len(pdf_reader.pages)
+        if step == 1:
+            logger.info(f"PDF has {num_pages} pages")
+        return _extract_pages(pdf_reader, range(offset, num_pages, step), skip_scanned)
+
+
+def _count_file_pages(file_path: str, skip_scanned: bool = False) -> Optional[int]:
+    """Open a PDF and get its page count.
+
+    With ``skip_scanned`` the first, middle and last pages are sampled and
+    None is returned if they look scanned.
+    """
+    with _open_pdf_reader(file_path) as pdf_reader:
+        num_pages = len(pdf_reader.pages)
+        logger.info(f"PDF has {num_pages} pages")
+        if skip_scanned and num_pages and _looks_scanned(
+            _page_text(pdf_reader, page_num)
+            for page_num in _sample_page_numbers(0, num_pages)
+        ):
+            return None
+        return num_pages
+
+
+@contextlib.contextmanager
+def _open_pdf_reader(file_path: str) -> Iterator[pypdf.PdfReader]:
+    """Open a PdfReader over a read-only memory map of the file.
+
+    pypdf seeks back and forth between the xref table and the objects it
+    points to; reading from the mapping serves those from the page cache
+    instead of issuing a read() syscall and copy for each one.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files and special files can't be mapped
+            yield pypdf.PdfReader(f, strict=False)
+            return
+
+        with mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_WILLNEED)
+            yield pypdf.PdfReader(mapped, strict=False)
+
+
+def _raw_stream_length(doc, xref: int) -> int:
+    """Get the stored (still encoded) length of a PyMuPDF stream object."""
+    kind, value = doc.xref_get_key(xref, "Length")
+    if kind == "int":
+        return int(value)
+    # Indirect or missing /Length, read the raw bytes without decoding them
+    return len(doc.xref_stream_raw(xref))
+
+
+def _string_end(stream: bytes, start: int) -> int:
+    """Get the end of the string literal opening at ``start``."""
+    depth = 0
+    position = start
+    while True:
+        match = _PDF_STRING_PART_RE.search(stream, position)
+        if match is None:
+            # Unterminated, the string runs to the end of the stream
+            return len(stream)
+        char = match.group()
+        position = match.end()
+        if char == b"\\":
+            # Skip the escaped character, which may be a parenthesis
+            position += 1
+        elif char == b"(":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return position
+
+
+def _strip_graphics_ops(stream: bytes) -> bytes:
+    """Remove graphics operators that produce no text from a content stream.
+
+    The stream is tokenized, so operator-like text inside string literals,
+    hex strings and names is never touched. Each removed operator takes its
+    operands with it. Text objects (BT ... ET) and inline images
+    (BI ... ID <data> EI) are kept as they are.
+    """
+    parts = []
+    kept_from = 0
+    operands_start: Optional[int] = None
+    in_text = False
+    position = 0
+    while position < len(stream):
+        match = _PDF_INSTRUCTION_RE.match(stream, position)
+        if operands_start is None:
+            operands_start = match.start("body")
+        position = match.end()
+        if match.group("string") is not None:
+            # A deeply nested string literal, still part of the operands
+            position = _string_end(stream, match.start("string"))
+            continue
+
+        operator = match.group("operator")
+        if operator == b"BT":
+            in_text = True
+        elif operator == b"ET":
+            in_text = False
+        elif operator == b"BI":
+            # Skip the image dictionary and binary data in one go
+            data = _INLINE_IMAGE_DATA_RE.search(stream, position - 1)
+            end = _INLINE_IMAGE_END_RE.search(stream, data.end()) if data is not None else None
+            position = end.end() if end is not None else len(stream)
+        elif operator in _GRAPHICS_OPS and not in_text:
+            parts.append(stream[kept_from:operands_start])
+            kept_from = position
+        operands_start = None
+
+    parts.append(stream[kept_from:])
+    return b"".join(parts)
+
 
 class SimplePDFLoader(LoaderService):
     """Simple PDF and Text loader service with optimized performance."""
@@ -38,30 +347,27 @@ class SimplePDFLoader(LoaderService):
         logger.info(f"Loading file with extension: {file_extension}")
 
         if file_extension == ".pdf":
-            # Check cache first
-            if file_path in PDF_CACHE:
-                timestamp, documents = PDF_CACHE[file_path]
-                if time.time() - timestamp < CACHE_EXPIRATION:
+            # Check cache first, the key changes whenever the file does
+            cache_key = _file_key(file_path)
+            if cache_key is not None:
+                documents = PDF_CACHE.get(cache_key)
+                if documents is not None:
                     logger.info(f"Using cached PDF: {file_path}")
                     return documents
-            
-            # Not in cache or cache expired, load the PDF
-            start_time = time.time()
-            documents = await self._load_pdf_optimized(file_path)
-            elapsed_time = time.time() - start_time
-            logger.info(f"PDF loading completed in {elapsed_time:.2f} seconds")
-            
-            # Cache the result
-            PDF_CACHE[file_path] = (time.time(), documents)
-            return documents
-                
+
+            # Not in cache or file changed, load the PDF once even if
+            # several requests for it arrive concurrently
+            return await PDF_INFLIGHT.run(
+                cache_key or file_path,
+                lambda: self._load_and_cache_pdf(file_path, cache_key),
+            )
+
         elif file_extension == ".txt":
             try:
                 logger.info(f"Loading text file: {file_path}")
-                # Run TextLoader in a thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
+                # Run TextLoader in a worker thread to avoid blocking
                 loader = TextLoader(file_path)
-                documents = await loop.run_in_executor(None, loader.load)
+                documents = await asyncio.to_thread(loader.load)
                 logger.info(f"Successfully loaded text file: {len(documents)} documents")
                 return documents
             except Exception as e:
@@ -71,55 +377,148 @@ class SimplePDFLoader(LoaderService):
             error_msg = f"Unsupported file type: {file_path}"
             logger.error(error_msg)
             raise ValueError(error_msg)
-    
-    async def _load_pdf_optimized(self, file_path: str) -> List[LangchainDocument]:
-        """Load PDF with optimized performance using direct PyPDF access and parallel processing."""
+
+    async def load_stream(self, file_path: str) -> AsyncIterator[LangchainDocument]:
+        """Yield documents from file path as they are extracted.
+
+        Text PDFs are extracted with PyMuPDF a batch of pages at a time, so
+        callers can start chunking and embedding the first pages while the
+        rest are parsed. Cached, scanned and already loading PDFs, and other
+        file types, are yielded from ``load``.
+        """
+        file_key = _file_key(file_path) if file_path.lower().endswith(".pdf") else None
+        if (
+            not PYMUPDF_AVAILABLE
+            or file_key is None
+            or file_key in PDF_CACHE
+            or file_key in PDF_INFLIGHT
+            or SCANNED_DECISIONS.get(file_key)
+        ):
+            for document in await self.load(file_path):
+                yield document
+            return
+
+        documents = []
+        try:
+            # Close the page stream, and with it the document, even if the
+            # consumer stops iterating early
+            async with contextlib.aclosing(
+                self._stream_with_pymupdf(file_path, file_key)
+            ) as pages:
+                async for document in pages:
+                    documents.append(document)
+                    yield document
+        except Exception as e:
+            if documents:
+                raise
+            logger.warning(f"PyMuPDF streaming failed, loading the whole PDF instead: {str(e)}")
+
+        if documents:
+            PDF_CACHE.set(file_key, documents)
+            return
+
+        # Scanned or empty PDFs take the regular fallbacks, a scanned decision
+        # recorded while streaming sends them straight to Unstructured
+        for document in await self.load(file_path):
+            yield document
+
+    async def _stream_with_pymupdf(
+        self, file_path: str, file_key: Tuple[str, int, int]
+    ) -> AsyncIterator[LangchainDocument]:
+        """Yield the pages of a text PDF, extracting a batch per worker call."""
+        skip_scanned = UNSTRUCTURED_AVAILABLE
+        doc = await asyncio.to_thread(fitz.open, file_path)
+        batch = None
+        pages = None
+
+        def _close():
+            if pages is not None:
+                pages.close()
+            doc.close()
+
         try:
-            logger.info(f"Loading PDF with optimized PyPDF: {file_path}")
-            
-            # Use PyPDF directly for better performance
-            loop = asyncio.get_event_loop()
-            
-            # Run PDF opening in a thread pool to avoid blocking
-            pdf_reader = await loop.run_in_executor(
-                None, 
-                functools.partial(pypdf.PdfReader, file_path, strict=False)
+            logger.info(f"Streaming PDF with PyMuPDF: {file_path} ({doc.page_count} pages)")
+            batch = asyncio.ensure_future(
+                asyncio.to_thread(self._sample_pymupdf_pages, doc, skip_scanned)
             )
-            
-            num_pages = len(pdf_reader.pages)
-            logger.info(f"PDF has {num_pages} pages")
-            
-            if num_pages == 0:
-                logger.warning(f"PDF has no pages: {file_path}")
-                return []
-            
-            # Process pages in parallel but in smaller batches to avoid memory issues
-            batch_size = 10  # Process 10 pages at a time
-            all_documents = []
-            
-            for i in range(0, num_pages, batch_size):
-                batch_end = min(i + batch_size, num_pages)
-                logger.info(f"Processing batch of pages {i} to {batch_end-1}")
-                
-                # Create tasks for this batch
-                tasks = []
-                for page_num in range(i, batch_end):
-                    tasks.append(self._process_page(loop, pdf_reader, page_num, file_path))
-                
-                # Process this batch
-                batch_documents = await asyncio.gather(*tasks)
-                
-                # Filter out empty documents
-                batch_documents = [doc for doc in batch_documents if doc and doc.page_content.strip()]
-                all_documents.extend(batch_documents)
-            
+            sampled = await asyncio.shield(batch)
+            if sampled is None:
+                logger.info(f"PDF appears to be scanned: {file_path}")
+                SCANNED_DECISIONS[file_key] = True
+                return
+
+            pages = self._iter_pymupdf_pages(doc, file_path, sampled)
+            while True:
+                # Shield the worker call so a cancelled consumer can't close
+                # the document while a page is still being extracted
+                batch = asyncio.ensure_future(
+                    asyncio.to_thread(list, itertools.islice(pages, STREAM_BATCH_PAGES))
+                )
+                documents = await asyncio.shield(batch)
+                if not documents:
+                    return
+                for document in documents:
+                    yield document
+        finally:
+            if batch is not None and not batch.done():
+                batch.add_done_callback(lambda _: _close())
+            else:
+                _close()
+
+    async def _load_and_cache_pdf(
+        self, file_path: str, cache_key: Optional[Tuple[str, int, int]]
+    ) -> List[LangchainDocument]:
+        """Load a PDF and store the result in the cache under its file key."""
+        start_time = time.time()
+        documents = await self._load_pdf_optimized(file_path)
+        elapsed_time = time.time() - start_time
+        logger.info(f"PDF loading completed in {elapsed_time:.2f} seconds")
+
+        # Cache the result, unless the file couldn't be stat'ed
+        if cache_key is not None:
+            PDF_CACHE.set(cache_key, documents)
+        return documents
+
+    async def _load_pdf_optimized(self, file_path: str) -> List[LangchainDocument]:
+        """Load PDF with optimized performance using PyMuPDF, falling back to PyPDF."""
+        try:
+            # Scanned PDFs have no text layer, so only sample them when there is
+            # somewhere better to send them
+            skip_scanned = UNSTRUCTURED_AVAILABLE
+            file_key = _file_key(file_path)
+            if skip_scanned and file_key is not None and SCANNED_DECISIONS.get(file_key):
+                logger.info(f"PDF previously detected as scanned, using UnstructuredPDFLoader: {file_path}")
+                return await self._load_with_unstructured(file_path)
+
+            if PYMUPDF_AVAILABLE:
+                logger.info(f"Loading PDF with PyMuPDF: {file_path}")
+
+                # MuPDF releases the GIL, so extract every page in one worker call
+                try:
+                    all_documents = await asyncio.to_thread(
+                        self._extract_with_pymupdf, file_path, skip_scanned
+                    )
+                except Exception as e:
+                    logger.warning(f"PyMuPDF extraction failed, falling back to PyPDF: {str(e)}")
+                    all_documents = await self._load_with_pypdf(file_path, skip_scanned)
+            else:
+                all_documents = await self._load_with_pypdf(file_path, skip_scanned)
+
+            if all_documents is None:
+                logger.info(f"PDF appears to be scanned, using UnstructuredPDFLoader: {file_path}")
+                if file_key is not None:
+                    SCANNED_DECISIONS[file_key] = True
+                return await self._load_with_unstructured(file_path)
+
             if all_documents:
                 logger.info(f"Successfully extracted {len(all_documents)} pages with content")
                 return all_documents
-            
-            # If PyPDF didn't extract any text, try UnstructuredPDFLoader as fallback
+
+            # If no text was extracted, try UnstructuredPDFLoader as fallback
             if UNSTRUCTURED_AVAILABLE:
-                logger.warning("PyPDF returned empty content. Trying UnstructuredPDFLoader as fallback.")
+                logger.warning("PDF text extraction returned empty content. Trying UnstructuredPDFLoader as fallback.")
+                if file_key is not None:
+                    SCANNED_DECISIONS[file_key] = True
                 return await self._load_with_unstructured(file_path)
             else:
                 logger.warning("No text extracted from PDF and Unstructured not available")
@@ -127,10 +526,10 @@ class SimplePDFLoader(LoaderService):
                     page_content=f"PDF document: {os.path.basename(file_path)}",
                     metadata={"source": file_path, "page": 1}
                 )]
-                
+
         except Exception as e:
-            logger.error(f"Error using optimized PyPDF: {str(e)}")
-            
+            logger.error(f"Error using optimized PDF extraction: {str(e)}")
+
             # Try UnstructuredPDFLoader as fallback if available
             if UNSTRUCTURED_AVAILABLE:
                 logger.info("Trying UnstructuredPDFLoader as fallback")
@@ -141,40 +540,168 @@ class SimplePDFLoader(LoaderService):
                     page_content=f"Error processing PDF: {os.path.basename(file_path)}",
                     metadata={"source": file_path, "page": 1, "error": str(e)}
                 )]
-    
-    async def _process_page(self, loop, pdf_reader, page_num: int, source: str) -> Optional[LangchainDocument]:
-        """Process a single PDF page asynchronously."""
+
+    def _extract_with_pymupdf(
+        self, file_path: str, skip_scanned: bool = False
+    ) -> Optional[List[LangchainDocument]]:
+        """Extract text from every page with PyMuPDF in a single pass.
+
+        With ``skip_scanned`` the first, middle and last pages are extracted
+        first and None is returned if they look scanned.
+        """
+        doc = fitz.open(file_path)
         try:
-            # Extract text from page in a thread pool
-            page = pdf_reader.pages[page_num]
-            text = await loop.run_in_executor(None, page.extract_text)
-            
+            logger.info(f"PDF has {doc.page_count} pages")
+            sampled = self._sample_pymupdf_pages(doc, skip_scanned)
+            if sampled is None:
+                return None
+            return list(self._iter_pymupdf_pages(doc, file_path, sampled))
+        finally:
+            doc.close()
+
+    def _sample_pymupdf_pages(self, doc, skip_scanned: bool) -> Optional[Dict[int, str]]:
+        """Extract the sample pages of a PyMuPDF document when detecting scans.
+
+        Returns the sampled page texts by page number, empty without
+        ``skip_scanned``, or None if the samples look scanned.
+        """
+        if not skip_scanned or not doc.page_count:
+            return {}
+        sampled = {
+            page_num: self._pymupdf_page_text(doc, page_num)
+            for page_num in _sample_page_numbers(0, doc.page_count)
+        }
+        return None if _looks_scanned(sampled.values()) else sampled
+
+    def _iter_pymupdf_pages(
+        self, doc, file_path: str, sampled: Dict[int, str]
+    ) -> Iterator[LangchainDocument]:
+        """Yield a document per non-empty page, reusing already sampled texts."""
+        for page_num in range(doc.page_count):
+            text = sampled.get(page_num)
+            if text is None:
+                text = self._pymupdf_page_text(doc, page_num)
+
             if not text or not text.strip():
                 logger.warning(f"No text extracted from page {page_num}")
-                return None
-            
-            # Create LangChain document
-            return LangchainDocument(
+                continue
+
+            yield LangchainDocument(
                 page_content=text,
-                metadata={"page": page_num + 1, "source": source}
+                metadata={"page": page_num + 1, "source": file_path}
             )
+
+    def _pymupdf_page_text(self, doc, page_num: int) -> str:
+        """Extract the text of a single PyMuPDF page."""
+        page = doc.load_page(page_num)
+        self._strip_page_graphics(doc, page, page_num)
+        return page.get_text("text")
+
+    def _strip_page_graphics(self, doc, page, page_num: int) -> None:
+        """Drop graphics operators from a page with an oversized content stream.
+
+        The document is only modified in memory and is never saved.
+        """
+        try:
+            # Gate on the stored stream lengths so small pages are never decoded twice
+            xrefs = page.get_contents()
+            if sum(_raw_stream_length(doc, xref) for xref in xrefs) <= GRAPHICS_STRIP_THRESHOLD:
+                return
+
+            stream = page.read_contents()
+            stripped = _strip_graphics_ops(stream)
+            logger.info(
+                f"Stripped graphics from page {page_num}: "
+                f"{len(stream)} -> {len(stripped)} bytes"
+            )
+            doc.update_stream(xrefs[0], stripped)
+            if len(xrefs) > 1:
+                page.set_contents(xrefs[0])
         except Exception as e:
-            logger.error(f"Error processing page {page_num}: {str(e)}")
+            logger.warning(f"Could not strip graphics from page {page_num}: {str(e)}")
+
+    async def _load_with_pypdf(
+        self, file_path: str, skip_scanned: bool = False
+    ) -> Optional[List[LangchainDocument]]:
+        """Load PDF with direct PyPDF access.
+
+        Returns None if ``skip_scanned`` is set and the PDF looks scanned.
+        """
+        logger.info(f"Loading PDF with optimized PyPDF: {file_path}")
+
+        if os.path.getsize(file_path) >= PROCESS_POOL_MIN_BYTES:
+            page_texts = await self._extract_pages_in_processes(file_path, skip_scanned)
+        else:
+            # Open and extract every page in a single worker call; per-page
+            # hand-offs only add overhead
+            page_texts = await asyncio.to_thread(
+                _extract_file_pages, file_path, skip_scanned=skip_scanned
+            )
+
+        if page_texts is None:
             return None
-    
+
+        return [
+            LangchainDocument(
+                page_content=text,
+                metadata={"page": page_num + 1, "source": file_path}
+            )
+            for page_num, text in page_texts
+        ]
+
+    async def _extract_pages_in_processes(
+        self, file_path: str, skip_scanned: bool = False
+    ) -> Optional[List[Tuple[int, str]]]:
+        """Extract pages across worker processes, since pypdf is bound by the GIL.
+
+        The page count and scanned check come from one worker first, so a
+        scanned PDF is parsed once and no more workers are started than there
+        are pages or available CPUs. Worker ``i`` then extracts every page
+        ``p`` with ``p % workers == i``, which keeps work balanced; each one
+        opens its own reader.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            pool = _get_pdf_pool()
+            num_pages = await loop.run_in_executor(
+                pool, _count_file_pages, file_path, skip_scanned
+            )
+            if num_pages is None:
+                return None
+
+            workers = min(_available_cpus(), num_pages)
+            tasks = [
+                loop.run_in_executor(pool, _extract_file_pages, file_path, offset, workers)
+                for offset in range(workers)
+            ]
+            results = await asyncio.gather(*tasks)
+        except Exception as e:
+            logger.warning(f"Process pool extraction failed, extracting in a thread: {str(e)}")
+            if isinstance(e, concurrent.futures.process.BrokenProcessPool):
+                # Release the broken pool's resources and recreate it on the next call
+                close_pdf_pool()
+            return await asyncio.to_thread(
+                _extract_file_pages, file_path, skip_scanned=skip_scanned
+            )
+
+        return sorted(
+            (page_text for result in results for page_text in result),
+            key=lambda page_text: page_text[0],
+        )
+
     async def _load_with_unstructured(self, file_path: str) -> List[LangchainDocument]:
         """Load PDF with UnstructuredPDFLoader."""
         if not UNSTRUCTURED_AVAILABLE:
             return []
-        
+
         try:
             logger.info(f"Attempting to load PDF with UnstructuredPDFLoader: {file_path}")
-            loop = asyncio.get_event_loop()
-            
-            # Run UnstructuredPDFLoader in a thread pool
+
+            # Run UnstructuredPDFLoader in a worker thread
             unstructured_loader = UnstructuredPDFLoader(file_path)
-            unstructured_documents = await loop.run_in_executor(None, unstructured_loader.load)
-            
+            unstructured_documents = await asyncio.to_thread(unstructured_loader.load)
+
             if unstructured_documents:
                 logger.info(f"Successfully loaded PDF with UnstructuredPDFLoader: {len(unstructured_documents)} elements")
                 return unstructured_documents
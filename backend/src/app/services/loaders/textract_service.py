@@ -2,44 +2,212 @@
 
 import asyncio
 import concurrent.futures
+import contextlib
+import functools
 import hashlib
+import itertools
 import logging
 import os
-import uuid
 from typing import Dict, List, Optional, Tuple
 import time
 import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.exceptions import ClientError
 import io
-import threading
+from cachetools import LRUCache
 
 from langchain.schema import Document as LangchainDocument
-from langchain_community.document_loaders import AmazonTextractPDFLoader
 
 from app.services.loaders.base import LoaderService
-from app.core.config import Settings
+from app.services.loaders.cache import DocumentCache, InflightLoads, PersistentDocumentCache
+from app.core.config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache for documents
-# Key: file_hash, Value: (timestamp, documents)
-TEXTRACT_CACHE: Dict[str, tuple[float, List[LangchainDocument]]] = {}
+# Try to import BLAKE3 for fast file hashing, falling back to SHA-256
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Try to import PyMuPDF to count PDF pages for inline Textract calls
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
 # Cache expiration time in seconds (1 hour)
 CACHE_EXPIRATION = 3600
+# Maximum number of cached documents
+MAX_CACHE_SIZE = 128
+
+# Bounded LRU + TTL in-memory cache for documents
+# Key: file_hash, Value: documents
+TEXTRACT_CACHE = DocumentCache("textract", maxsize=MAX_CACHE_SIZE, ttl=CACHE_EXPIRATION)
+
+# Prefix of persistent cache keys, naming the Textract API the result came from
+DISK_CACHE_KEY_PREFIX = "detect_text:"
+
+# Files currently being processed, keyed by file_hash
+TEXTRACT_INFLIGHT: InflightLoads[List[LangchainDocument]] = InflightLoads()
+
+# Maximum number of remembered content hashes
+MAX_HASH_CACHE_SIZE = 4096
+
+# Content hashes of files, so unchanged files aren't re-read on every load
+# Key: (file_path, size, mtime_ns), Value: content hash
+HASH_CACHE: LRUCache = LRUCache(maxsize=MAX_HASH_CACHE_SIZE)
 
 # Map of local file paths to S3 keys
 # This helps with cleanup if needed
 S3_FILE_MAP: Dict[str, str] = {}
 
-# Thread pool for parallel processing
-THREAD_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+# Thread pool shared by the blocking S3 and Textract calls, sized with the
+# S3 concurrency so load_many's uploads aren't queued behind four threads
+THREAD_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=get_settings().s3_max_concurrency, thread_name_prefix="textract-io"
+)
+
+# Multipart threshold and chunk size for S3 uploads
+UPLOAD_CHUNK_SIZE = get_settings().s3_multipart_threshold
+
+# Transfer settings shared by every S3 upload
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=UPLOAD_CHUNK_SIZE,
+    max_concurrency=get_settings().s3_max_concurrency,
+    multipart_chunksize=UPLOAD_CHUNK_SIZE,
+    use_threads=True
+)
+
+# Per-process counter making S3 keys unique within the same nanosecond
+_KEY_COUNTER = itertools.count()
+
+# Maximum number of pooled HTTP connections per boto3 client; room for every
+# transfer manager thread and THREAD_POOL worker to hold one at once
+MAX_POOL_CONNECTIONS = max(50, 2 * get_settings().s3_max_concurrency)
+
+# Single-page files up to this size are sent to Textract inline rather than
+# through S3 (5MB; the synchronous API accepts up to 10MB)
+TEXTRACT_INLINE_MAX_BYTES = 5 * 1024 * 1024
+# Extensions Textract can extract text from
+SUPPORTED_EXTENSIONS = frozenset((".pdf", ".tiff", ".tif", ".png", ".jpg", ".jpeg"))
+# Extensions that are always a single page
+SINGLE_PAGE_EXTENSIONS = frozenset((".png", ".jpg", ".jpeg"))
+
+# Maximum number of files processed concurrently by load_many
+MAX_CONCURRENT_LOADS = 10
+
+# Delay before the first Textract job status poll, doubled after each poll
+TEXTRACT_POLL_INITIAL_DELAY = 1.0
+# Longest delay between Textract job status polls
+TEXTRACT_POLL_MAX_DELAY = 10.0
+# Give up on a Textract job after this many seconds (10 minutes)
+TEXTRACT_JOB_TIMEOUT = 600
+# Maximum number of blocks per GetDocumentTextDetection page
+TEXTRACT_MAX_RESULTS = 1000
 
-# S3 client pool
-S3_CLIENTS = {}
-S3_CLIENT_LOCK = threading.Lock()
 
-# Textract client pool
-TEXTRACT_CLIENTS = {}
-TEXTRACT_CLIENT_LOCK = threading.Lock()
+def _client_args(
+    region: Optional[str],
+    access_key: Optional[str],
+    secret_key: Optional[str],
+    session_token: Optional[str],
+) -> Dict[str, str]:
+    """Build the keyword arguments for creating a boto3 client."""
+    client_args = {
+        "region_name": region,
+        "aws_access_key_id": access_key,
+        "aws_secret_access_key": secret_key
+    }
+    
+    # Add session token if available (required for temporary credentials)
+    if session_token:
+        client_args["aws_session_token"] = session_token
+    
+    return client_args
+
+
+@functools.lru_cache(maxsize=1)
+def _make_s3_client(
+    region: Optional[str],
+    access_key: Optional[str],
+    secret_key: Optional[str],
+    session_token: Optional[str],
+):
+    """Create the shared S3 client; boto3 clients are thread-safe."""
+    # Configure for faster uploads
+    config = boto3.session.Config(
+        signature_version='s3v4',
+        s3={'use_accelerate_endpoint': False},
+        retries={'max_attempts': 3, 'mode': 'standard'},
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True
+    )
+    
+    return boto3.client(
+        "s3",
+        **_client_args(region, access_key, secret_key, session_token),
+        config=config
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _make_transfer_manager(s3_client):
+    """Create the shared S3 transfer manager for a client.
+
+    The manager owns the worker threads for multipart uploads, so sharing it
+    avoids starting and joining a thread pool on every upload.
+    """
+    return create_transfer_manager(s3_client, UPLOAD_TRANSFER_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def _make_disk_cache(path: str, ttl: int) -> PersistentDocumentCache:
+    """Get the persistent Textract cache stored at a path, shared by loaders."""
+    return PersistentDocumentCache("textract", path, ttl=ttl)
+
+
+@functools.lru_cache(maxsize=1)
+def _make_textract_client(
+    region: Optional[str],
+    access_key: Optional[str],
+    secret_key: Optional[str],
+    session_token: Optional[str],
+):
+    """Create the shared Textract client; boto3 clients are thread-safe."""
+    # Configure for faster processing
+    # Adaptive retries slow the client down on throttling, which the low
+    # Textract request quotas make common under load_many
+    config = boto3.session.Config(
+        retries={'max_attempts': 5, 'mode': 'adaptive'},
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True
+    )
+    
+    return boto3.client(
+        "textract",
+        **_client_args(region, access_key, secret_key, session_token),
+        config=config
+    )
+
+
+def _documents_from_blocks(blocks: List[Dict], source: str) -> List[LangchainDocument]:
+    """Build one document per page from the LINE blocks of a Textract result."""
+    page_lines: Dict[int, List[str]] = {}
+    for block in blocks:
+        if block.get("BlockType") == "LINE":
+            page_lines.setdefault(block.get("Page", 1), []).append(block.get("Text", ""))
+    
+    return [
+        LangchainDocument(
+            page_content="\n".join(lines),
+            metadata={"source": source, "page": page}
+        )
+        for page, lines in sorted(page_lines.items())
+    ]
+
 
 class TextractLoader(LoaderService):
     """Amazon Textract PDF loader service with S3 integration and optimizations."""
@@ -53,16 +221,29 @@ class TextractLoader(LoaderService):
         self.aws_session_token = settings.aws_session_token
         self.s3_bucket = settings.s3_bucket_name
         self.s3_prefix = settings.s3_prefix
+        self.content_hash = settings.textract_content_hash
+        self.disk_cache = (
+            _make_disk_cache(settings.textract_cache_db_uri, settings.textract_cache_ttl)
+            if settings.textract_cache_db_uri
+            else None
+        )
 
     async def load(self, file_path: str) -> List[LangchainDocument]:
         """Load document from file path using Amazon Textract with S3."""
+        return await self._load(file_path)
+
+    async def _load(
+        self,
+        file_path: str,
+        upload_slots: Optional[asyncio.Semaphore] = None,
+        textract_slots: Optional[asyncio.Semaphore] = None,
+    ) -> List[LangchainDocument]:
+        """Load a file, optionally limiting its upload and Textract stages."""
         file_extension = os.path.splitext(file_path)[1].lower()
         logger.info(f"Loading file with extension: {file_extension}")
 
-        supported_extensions = [".pdf", ".tiff", ".tif", ".png", ".jpg", ".jpeg"]
-        
-        if file_extension not in supported_extensions:
-            error_msg = f"Unsupported file type for Textract: {file_path}. Supported types: {', '.join(supported_extensions)}"
+        if file_extension not in SUPPORTED_EXTENSIONS:
+            error_msg = f"Unsupported file type for Textract: {file_path}. Supported types: {', '.join(sorted(SUPPORTED_EXTENSIONS))}"
             logger.error(error_msg)
             raise ValueError(error_msg)
         
@@ -70,146 +251,233 @@ class TextractLoader(LoaderService):
         file_hash = await self._get_file_hash(file_path)
         
         # Check cache first
-        if file_hash in TEXTRACT_CACHE:
-            timestamp, documents = TEXTRACT_CACHE[file_hash]
-            if time.time() - timestamp < CACHE_EXPIRATION:
-                logger.info(f"Using cached Textract result for: {file_path}")
+        documents = TEXTRACT_CACHE.get(file_hash)
+        if documents is not None:
+            logger.info(f"Using cached Textract result for: {file_path}")
+            return documents
+        
+        # Not in cache or cache expired, process with Textract once even if
+        # several requests for the same file arrive concurrently
+        return await TEXTRACT_INFLIGHT.run(
+            file_hash,
+            lambda: self._process_and_cache(file_path, file_hash, upload_slots, textract_slots),
+        )
+
+    async def load_many(
+        self, file_paths: List[str], max_concurrency: int = MAX_CONCURRENT_LOADS
+    ) -> List[List[LangchainDocument]]:
+        """Load several files concurrently, in the order given.
+
+        Files go through two stages, each running at most ``max_concurrency``
+        at a time: the S3 upload and the Textract job. The stages are limited
+        separately, so later files upload while earlier ones are still being
+        extracted, and large batches don't open an S3 upload and a Textract
+        job for every file at once.
+        """
+        upload_slots = asyncio.Semaphore(max_concurrency)
+        textract_slots = asyncio.Semaphore(max_concurrency)
+        return await asyncio.gather(
+            *[self._load(file_path, upload_slots, textract_slots) for file_path in file_paths]
+        )
+
+    async def _process_and_cache(
+        self,
+        file_path: str,
+        file_hash: str,
+        upload_slots: Optional[asyncio.Semaphore] = None,
+        textract_slots: Optional[asyncio.Semaphore] = None,
+    ) -> List[LangchainDocument]:
+        """Process a file with Textract and store the result in the cache."""
+        content_hash = await self._get_known_content_hash(file_path)
+        # Stat metadata doesn't survive a file being copied or re-uploaded, so
+        # persisted results are always keyed by the file contents
+        disk_key = (
+            DISK_CACHE_KEY_PREFIX + content_hash
+            if self.disk_cache is not None and content_hash is not None
+            else None
+        )
+        if disk_key is not None:
+            loop = asyncio.get_running_loop()
+            documents = await loop.run_in_executor(THREAD_POOL, self.disk_cache.get, disk_key)
+            if documents is not None:
+                logger.info(f"Using persisted Textract result for: {file_path}")
+                TEXTRACT_CACHE.set(file_hash, documents)
                 return documents
         
-        # Not in cache or cache expired, process with Textract
         start_time = time.time()
         
-        # Upload to S3 first
-        s3_key = await self._upload_to_s3(file_path)
-        
-        # Process with Textract using the S3 location
-        documents = await self._process_with_textract_s3(s3_key, file_path)
+        if await self._can_process_inline(file_path):
+            # Small single-page files are sent with the request, skipping S3
+            async with textract_slots or contextlib.nullcontext():
+                documents = await self._process_with_textract_bytes(file_path)
+        else:
+            # Upload to S3 first
+            async with upload_slots or contextlib.nullcontext():
+                s3_key = await self._upload_to_s3(file_path, content_hash=content_hash)
+            
+            # Process with Textract using the S3 location
+            async with textract_slots or contextlib.nullcontext():
+                documents = await self._process_with_textract_s3(s3_key, file_path)
         
         elapsed_time = time.time() - start_time
         logger.info(f"Textract processing completed in {elapsed_time:.2f} seconds")
         
         # Cache the result using the file hash
-        TEXTRACT_CACHE[file_hash] = (time.time(), documents)
+        TEXTRACT_CACHE.set(file_hash, documents)
+        
+        # Persist complete results only; failed or partial extractions should
+        # be retried after a restart
+        if disk_key is not None and not any(
+            "error" in document.metadata or document.metadata.get("partial")
+            for document in documents
+        ):
+            await asyncio.get_running_loop().run_in_executor(THREAD_POOL, self.disk_cache.set, disk_key, documents)
         return documents
 
+    async def _get_known_content_hash(self, file_path: str) -> Optional[str]:
+        """Get the hash of the file contents if they are hashed anyway.
+
+        Contents are hashed when content hashing is configured or the
+        persistent cache is on; otherwise loads keep to O(1) stat keys and
+        this returns None, as it does when the file can't be hashed.
+        """
+        if not self.content_hash and self.disk_cache is None:
+            return None
+        try:
+            # Remembered in HASH_CACHE, so this doesn't read the file again
+            return await self._get_content_hash(file_path, fallback=False)
+        except Exception as e:
+            logger.warning(f"Could not hash file contents: {str(e)}")
+            return None
+
     async def _get_file_hash(self, file_path: str) -> str:
-        """Generate a hash of the file for caching."""
+        """Generate a cache key for the file.
+
+        Local files are identified by device, inode, size and modification
+        time, which is O(1). Content hashing is used when configured, for remote
+        or FUSE filesystems where stat results cannot be trusted.
+        """
+        if not self.content_hash:
+            try:
+                st = os.stat(file_path)
+                return f"{st.st_dev}-{st.st_ino}-{st.st_size}-{st.st_mtime_ns}"
+            except OSError as e:
+                logger.warning(f"Could not stat file, hashing contents instead: {str(e)}")
+        
+        return await self._get_content_hash(file_path)
+
+    async def _get_content_hash(self, file_path: str, fallback: bool = True) -> str:
+        """Generate a hash of the file contents for caching.
+
+        The hash is remembered by path, size and modification time, so a file
+        is only read again once it changes. If hashing fails, a key made of
+        the path and modification time is returned, or the error is raised
+        when ``fallback`` is False.
+        """
+        try:
+            st = os.stat(file_path)
+            stat_key = (file_path, st.st_size, st.st_mtime_ns)
+        except OSError:
+            stat_key = None
+        if stat_key is not None and stat_key in HASH_CACHE:
+            return HASH_CACHE[stat_key]
+        
         try:
-            loop = asyncio.get_event_loop()
-            
             # Use a small buffer size for large files
             buffer_size = 65536  # 64kb chunks
             
-            # Use SHA256 for hashing
-            sha256 = hashlib.sha256()
-            
             def _hash_file():
+                # BLAKE3 hashes a memory-mapped file with SIMD across threads;
+                # cache keys don't need SHA-256's collision resistance
+                if BLAKE3_AVAILABLE:
+                    hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                    hasher.update_mmap(file_path)
+                    return hasher.hexdigest()
+                
                 with open(file_path, 'rb') as f:
+                    # file_digest (Python 3.11+) hashes in C using OpenSSL
+                    if hasattr(hashlib, "file_digest"):
+                        return hashlib.file_digest(f, "sha256").hexdigest()
+                    
+                    sha256 = hashlib.sha256()
                     while True:
                         data = f.read(buffer_size)
                         if not data:
                             break
                         sha256.update(data)
-                return sha256.hexdigest()
+                    return sha256.hexdigest()
             
             # Run the hashing in a thread pool
-            file_hash = await loop.run_in_executor(THREAD_POOL, _hash_file)
+            file_hash = await asyncio.get_running_loop().run_in_executor(THREAD_POOL, _hash_file)
+            if stat_key is not None:
+                HASH_CACHE[stat_key] = file_hash
             return file_hash
             
         except Exception as e:
+            if not fallback:
+                raise
             logger.error(f"Error generating file hash: {str(e)}")
             # Fall back to using the file path and modification time
             return f"{file_path}_{os.path.getmtime(file_path)}"
 
     def _get_s3_client(self):
-        """Get or create an S3 client from the pool."""
-        thread_id = threading.get_ident()
-        
-        with S3_CLIENT_LOCK:
-            if thread_id not in S3_CLIENTS:
-                # Create an S3 client
-                s3_client_args = {
-                    "region_name": self.aws_region,
-                    "aws_access_key_id": self.aws_access_key,
-                    "aws_secret_access_key": self.aws_secret_key
-                }
-                
-                # Add session token if available (required for temporary credentials)
-                if self.aws_session_token:
-                    s3_client_args["aws_session_token"] = self.aws_session_token
-                    
-                # Configure for faster uploads
-                config = boto3.session.Config(
-                    signature_version='s3v4',
-                    s3={'use_accelerate_endpoint': False},
-                    retries={'max_attempts': 3, 'mode': 'standard'}
-                )
-                
-                S3_CLIENTS[thread_id] = boto3.client("s3", **s3_client_args, config=config)
-                
-            return S3_CLIENTS[thread_id]
+        """Get the shared S3 client."""
+        return _make_s3_client(
+            self.aws_region,
+            self.aws_access_key,
+            self.aws_secret_key,
+            self.aws_session_token,
+        )
 
     def _get_textract_client(self):
-        """Get or create a Textract client from the pool."""
-        thread_id = threading.get_ident()
-        
-        with TEXTRACT_CLIENT_LOCK:
-            if thread_id not in TEXTRACT_CLIENTS:
-                # Create boto3 clients
-                textract_client_args = {
-                    "region_name": self.aws_region,
-                    "aws_access_key_id": self.aws_access_key,
-                    "aws_secret_access_key": self.aws_secret_key
-                }
-                
-                # Add session token if available (required for temporary credentials)
-                if self.aws_session_token:
-                    textract_client_args["aws_session_token"] = self.aws_session_token
-                    
-                # Configure for faster processing
-                config = boto3.session.Config(
-                    retries={'max_attempts': 3, 'mode': 'standard'}
-                )
-                
-                TEXTRACT_CLIENTS[thread_id] = boto3.client("textract", **textract_client_args, config=config)
-                
-            return TEXTRACT_CLIENTS[thread_id]
+        """Get the shared Textract client."""
+        return _make_textract_client(
+            self.aws_region,
+            self.aws_access_key,
+            self.aws_secret_key,
+            self.aws_session_token,
+        )
 
-    async def _upload_to_s3(self, file_path: str) -> str:
-        """Upload a file to S3 and return the S3 key."""
+    async def _upload_to_s3(self, file_path: str, content_hash: Optional[str] = None) -> str:
+        """Upload a file to S3 and return the S3 key.
+
+        With the hash of the file contents, the object is keyed by it and the
+        upload is skipped if it is already in S3. Without one, the file isn't
+        read just to hash it and gets a unique key instead.
+        """
         try:
             logger.info(f"Uploading file to S3: {file_path}")
             
-            # Create a unique key for the file
             file_name = os.path.basename(file_path)
-            file_id = str(uuid.uuid4())
-            s3_key = f"{self.s3_prefix}/{file_id}/{file_name}"
+            if content_hash is not None:
+                # A file that was uploaded before is found again instead of
+                # being sent twice
+                s3_key = f"{self.s3_prefix}/{content_hash}/{file_name}"
+                if await self._s3_object_exists(s3_key, os.path.getsize(file_path)):
+                    logger.info(f"File already in S3, skipping upload: s3://{self.s3_bucket}/{s3_key}")
+                    S3_FILE_MAP[file_path] = s3_key
+                    return s3_key
+            else:
+                # Process id, time and a counter are unique without reading the OS RNG
+                file_id = f"{os.getpid():x}-{time.time_ns():x}-{next(_KEY_COUNTER):x}"
+                s3_key = f"{self.s3_prefix}/{file_id}/{file_name}"
             
-            # Get an S3 client from the pool
-            s3_client = self._get_s3_client()
+            # Get the shared transfer manager for the S3 client
+            transfer_manager = _make_transfer_manager(self._get_s3_client())
             
             # Upload the file to S3 with optimized settings
-            loop = asyncio.get_event_loop()
-            
             def _upload_file():
-                # Use TransferConfig for multipart uploads
-                transfer_config = boto3.s3.transfer.TransferConfig(
-                    multipart_threshold=8 * 1024 * 1024,  # 8MB
-                    max_concurrency=4,
-                    multipart_chunksize=8 * 1024 * 1024,  # 8MB
-                    use_threads=True
-                )
-                
-                # Upload with the transfer manager
-                s3_client.upload_file(
+                # Upload by path so the transfer manager reads each part on its
+                # own worker thread; an io_uring reader was not adopted since
+                # there is no maintained Python binding and it is Linux-only
+                transfer_manager.upload(
                     file_path, 
                     self.s3_bucket, 
-                    s3_key,
-                    Config=transfer_config
-                )
+                    s3_key
+                ).result()
             
             # Run the upload in a thread pool
-            await loop.run_in_executor(THREAD_POOL, _upload_file)
+            await asyncio.get_running_loop().run_in_executor(THREAD_POOL, _upload_file)
             
             logger.info(f"Successfully uploaded file to S3: s3://{self.s3_bucket}/{s3_key}")
             
@@ -228,32 +496,110 @@ class TextractLoader(LoaderService):
                 logger.error(f"Error uploading file to S3: {str(e)}")
                 raise
 
-    async def _process_with_textract_s3(self, s3_key: str, original_file_path: str) -> List[LangchainDocument]:
-        """Process document with Amazon Textract using S3 location."""
+    async def _s3_object_exists(self, s3_key: str, size: int) -> bool:
+        """Check whether an object of the given size is already stored at a key."""
+        def _head_object() -> Dict:
+            return self._get_s3_client().head_object(Bucket=self.s3_bucket, Key=s3_key)
+        
         try:
-            logger.info(f"Processing with Amazon Textract from S3: {s3_key}")
+            response = await asyncio.get_running_loop().run_in_executor(THREAD_POOL, _head_object)
+        except ClientError:
+            # Missing, or not allowed to look; the upload goes ahead either way
+            return False
+        return response.get("ContentLength") == size
+
+    async def _can_process_inline(self, file_path: str) -> bool:
+        """Check whether a file can be sent to synchronous Textract inline.
+
+        The synchronous API only takes single-page documents, so PDFs are
+        only sent inline when PyMuPDF can confirm they have one page.
+        """
+        try:
+            if os.path.getsize(file_path) > TEXTRACT_INLINE_MAX_BYTES:
+                return False
+        except OSError:
+            return False
+        
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension in SINGLE_PAGE_EXTENSIONS:
+            return True
+        if file_extension != ".pdf" or not PYMUPDF_AVAILABLE:
+            return False
+        
+        def _count_pages() -> int:
+            with fitz.open(file_path) as doc:
+                return doc.page_count
+        
+        try:
+            page_count = await asyncio.get_running_loop().run_in_executor(THREAD_POOL, _count_pages)
+        except Exception as e:
+            logger.warning(f"Could not count PDF pages, using S3: {str(e)}")
+            return False
+        return page_count == 1
+
+    async def _process_with_textract_bytes(self, file_path: str) -> List[LangchainDocument]:
+        """Process a single-page document with synchronous Textract."""
+        try:
+            logger.info(f"Processing with Amazon Textract inline: {file_path}")
             
-            # Get a Textract client from the pool
             textract_client = self._get_textract_client()
             
-            # Create the loader with S3 path
-            s3_path = f"s3://{self.s3_bucket}/{s3_key}"
+            def _detect_text() -> Dict:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+                return textract_client.detect_document_text(Document={"Bytes": data})
             
-            # Run Textract processing in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
+            response = await asyncio.get_running_loop().run_in_executor(THREAD_POOL, _detect_text)
+            documents = _documents_from_blocks(response.get("Blocks", []), file_path)
             
-            # Create the loader with appropriate configuration
-            loader = AmazonTextractPDFLoader(
-                s3_path,
-                client=textract_client
-            )
+            if documents:
+                logger.info("Successfully extracted text with inline Textract")
+                return documents
+            else:
+                logger.warning("Textract returned empty content")
+                return [LangchainDocument(
+                    page_content=f"Empty document: {os.path.basename(file_path)}",
+                    metadata={"source": file_path, "page": 1}
+                )]
+                
+        except Exception as e:
+            logger.error(f"Error using Amazon Textract inline: {str(e)}")
+            return [LangchainDocument(
+                page_content=f"Error processing document with Textract: {os.path.basename(file_path)}",
+                metadata={"source": file_path, "page": 1, "error": str(e)}
+            )]
+
+    async def _process_with_textract_s3(self, s3_key: str, original_file_path: str) -> List[LangchainDocument]:
+        """Process document with Amazon Textract using S3 location.
+
+        Runs a single asynchronous text detection job for the whole document,
+        so Textract processes the pages in parallel server-side instead of
+        one synchronous call per page.
+        """
+        try:
+            logger.info(f"Processing with Amazon Textract from S3: {s3_key}")
             
-            # Run the loader in a thread pool
-            documents = await loop.run_in_executor(THREAD_POOL, loader.load)
+            # Get the shared Textract client
+            textract_client = self._get_textract_client()
+            loop = asyncio.get_running_loop()
             
-            # Update metadata to point to the original file path
-            for doc in documents:
-                doc.metadata["source"] = original_file_path
+            # Start the text detection job on the S3 object
+            response = await loop.run_in_executor(
+                THREAD_POOL,
+                functools.partial(
+                    textract_client.start_document_text_detection,
+                    DocumentLocation={"S3Object": {"Bucket": self.s3_bucket, "Name": s3_key}},
+                ),
+            )
+            job_id = response["JobId"]
+            logger.info(f"Started Textract job {job_id} for s3://{self.s3_bucket}/{s3_key}")
+            
+            blocks, complete = await self._get_text_detection_blocks(textract_client, job_id)
+            documents = _documents_from_blocks(blocks, original_file_path)
+            if not complete:
+                # Some pages failed, so the text may be missing parts
+                for document in documents:
+                    document.metadata["partial"] = True
             
             if documents:
                 logger.info(f"Successfully extracted {len(documents)} pages with Textract from S3")
@@ -271,3 +617,48 @@ class TextractLoader(LoaderService):
                 page_content=f"Error processing document with Textract: {os.path.basename(original_file_path)}",
                 metadata={"source": original_file_path, "page": 1, "error": str(e)}
             )]
+
+    async def _get_text_detection_blocks(self, textract_client, job_id: str) -> Tuple[List[Dict], bool]:
+        """Wait for a text detection job and collect the blocks of every result page.
+
+        Also returns whether the job succeeded completely rather than
+        partially.
+        """
+        loop = asyncio.get_running_loop()
+        get_results = functools.partial(
+            textract_client.get_document_text_detection,
+            JobId=job_id,
+            MaxResults=TEXTRACT_MAX_RESULTS,
+        )
+        
+        # Poll with exponential backoff until the job finishes
+        delay = TEXTRACT_POLL_INITIAL_DELAY
+        deadline = time.monotonic() + TEXTRACT_JOB_TIMEOUT
+        while True:
+            response = await loop.run_in_executor(THREAD_POOL, get_results)
+            status = response["JobStatus"]
+            if status == "SUCCEEDED":
+                break
+            if status == "PARTIAL_SUCCESS":
+                logger.warning(f"Textract job {job_id} partially succeeded: {response.get('StatusMessage')}")
+                break
+            if status == "FAILED":
+                raise RuntimeError(f"Textract job {job_id} failed: {response.get('StatusMessage')}")
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError(f"Textract job {job_id} did not finish in {TEXTRACT_JOB_TIMEOUT} seconds")
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, TEXTRACT_POLL_MAX_DELAY)
+        
+        # Follow the pagination token to collect the remaining blocks
+        blocks = list(response.get("Blocks", []))
+        next_token = response.get("NextToken")
+        while next_token:
+            response = await loop.run_in_executor(
+                THREAD_POOL, functools.partial(get_results, NextToken=next_token)
+            )
+            blocks.extend(response.get("Blocks", []))
+            next_token = response.get("NextToken")
+        
+        return blocks, status == "SUCCEEDED"
+
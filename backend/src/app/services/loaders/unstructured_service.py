@@ -2,7 +2,7 @@
 
 import asyncio
 import logging
-from typing import List
+from typing import Any, Dict, List, Tuple
 
 from langchain.schema import Document as LangchainDocument
 
@@ -19,6 +19,17 @@ except ImportError:
     UNSTRUCTURED_AVAILABLE = False
     logger.warning("unstructured package not found, please install it with `pip install unstructured`")
 
+# Loader configurations in order of preference. They run concurrently, but a
+# later configuration's result is only used once every earlier one has failed
+# or come back empty, since each mode splits the document differently. The
+# concurrency costs up to one extra parse per configuration in CPU, as worker
+# threads can't be stopped once a preferred result is in
+UNSTRUCTURED_CONFIGS: List[Tuple[str, Dict[str, Any]]] = [
+    ("default", {}),
+    ("elements/fast", {"mode": "elements", "strategy": "fast"}),
+    ("paged", {"mode": "paged"}),
+]
+
 
 class UnstructuredLoader(LoaderService):
     """Unstructured loader service with local processing."""
@@ -33,77 +44,37 @@ class UnstructuredLoader(LoaderService):
         self.settings = settings
 
     async def load(self, file_path: str) -> List[LangchainDocument]:
-        """Load document from file path using local Unstructured processing."""
+        """Load document from file path using local Unstructured processing.
+
+        Every loader configuration starts at once and the first non-empty
+        result in preference order wins. A document that only a later
+        configuration can handle doesn't wait for the earlier ones to be
+        tried in turn, and the output granularity never depends on which
+        configuration happens to finish first.
+        """
         if not UNSTRUCTURED_AVAILABLE:
             raise ImportError(
                 "The 'unstructured' package is not installed. "
                 "Please install it with `pip install unstructured`"
             )
-        
+
         try:
             logger.info(f"Attempting to load document with UnstructuredPDFLoader: {file_path}")
-            loop = asyncio.get_event_loop()
-            
-            # Try different configurations to see what works
-            try:
-                # First try with default parameters
-                logger.info("Trying UnstructuredPDFLoader with default parameters")
-                unstructured_loader = UnstructuredPDFLoader(file_path)
-                unstructured_documents = await loop.run_in_executor(None, unstructured_loader.load)
-                
-                if unstructured_documents:
-                    logger.info(f"Successfully loaded document with default UnstructuredPDFLoader: {len(unstructured_documents)} elements")
-                    return unstructured_documents
-                else:
-                    logger.warning("Default UnstructuredPDFLoader returned empty content")
-            except Exception as e1:
-                logger.error(f"Error using default UnstructuredPDFLoader: {str(e1)}")
-                logger.error(f"Error type: {type(e1).__name__}")
-                logger.error(f"Error details: {repr(e1)}")
-            
-            try:
-                # Try with elements mode and fast strategy
-                logger.info("Trying UnstructuredPDFLoader with elements mode and fast strategy")
-                unstructured_loader = UnstructuredPDFLoader(
-                    file_path,
-                    mode="elements",
-                    strategy="fast"
-                )
-                
-                # Execute in thread pool to avoid blocking
-                unstructured_documents = await loop.run_in_executor(None, unstructured_loader.load)
-                
-                if unstructured_documents:
-                    logger.info(f"Successfully loaded document with elements/fast UnstructuredPDFLoader: {len(unstructured_documents)} elements")
-                    return unstructured_documents
-                else:
-                    logger.warning("Elements/fast UnstructuredPDFLoader returned empty content")
-            except Exception as e2:
-                logger.error(f"Error using elements/fast UnstructuredPDFLoader: {str(e2)}")
-                logger.error(f"Error type: {type(e2).__name__}")
-                logger.error(f"Error details: {repr(e2)}")
-            
+
+            tasks = [
+                asyncio.create_task(self._load_with_config(file_path, name, config))
+                for name, config in UNSTRUCTURED_CONFIGS
+            ]
             try:
-                # Try with paged mode
-                logger.info("Trying UnstructuredPDFLoader with paged mode")
-                unstructured_loader = UnstructuredPDFLoader(
-                    file_path,
-                    mode="paged"
-                )
-                
-                # Execute in thread pool to avoid blocking
-                unstructured_documents = await loop.run_in_executor(None, unstructured_loader.load)
-                
-                if unstructured_documents:
-                    logger.info(f"Successfully loaded document with paged UnstructuredPDFLoader: {len(unstructured_documents)} elements")
-                    return unstructured_documents
-                else:
-                    logger.warning("Paged UnstructuredPDFLoader returned empty content")
-            except Exception as e3:
-                logger.error(f"Error using paged UnstructuredPDFLoader: {str(e3)}")
-                logger.error(f"Error type: {type(e3).__name__}")
-                logger.error(f"Error details: {repr(e3)}")
-            
+                for task in tasks:
+                    unstructured_documents = await task
+                    if unstructured_documents:
+                        return unstructured_documents
+            finally:
+                # Worker threads can't be interrupted, but their results are dropped
+                for task in tasks:
+                    task.cancel()
+
             # If all attempts failed, return empty list
             logger.error("All UnstructuredPDFLoader configurations failed")
             return []
@@ -113,3 +84,25 @@ class UnstructuredLoader(LoaderService):
             logger.error(f"Error type: {type(e).__name__}")
             logger.error(f"Error details: {repr(e)}")
             return []
+
+    async def _load_with_config(
+        self, file_path: str, name: str, config: Dict[str, Any]
+    ) -> List[LangchainDocument]:
+        """Load a document with one UnstructuredPDFLoader configuration."""
+        try:
+            logger.info(f"Trying UnstructuredPDFLoader with {name} configuration")
+            unstructured_loader = UnstructuredPDFLoader(file_path, **config)
+            
+            # Execute in a worker thread to avoid blocking
+            unstructured_documents = await asyncio.to_thread(unstructured_loader.load)
+            
+            if unstructured_documents:
+                logger.info(f"Successfully loaded document with {name} UnstructuredPDFLoader: {len(unstructured_documents)} elements")
+            else:
+                logger.warning(f"{name} UnstructuredPDFLoader returned empty content")
+            return unstructured_documents
+        except Exception as e:
+            logger.error(f"Error using {name} UnstructuredPDFLoader: {str(e)}")
+            logger.error(f"Error type: {type(e).__name__}")
+            logger.error(f"Error details: {repr(e)}")
+            return []
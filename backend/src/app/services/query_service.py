@@ -1,12 +1,41 @@
 """Query service."""
 
+import ast
 import asyncio
+import contextlib
+import functools
+import itertools
 import logging
+import operator
+import random
 import re
 import time
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
-from app.models.query_core import Chunk, FormatType, QueryType, Rule
+import orjson
+from cachetools import TTLCache
+from pydantic import ValidationError
+
+from app.core.config import get_settings
+from app.models.query_core import (
+    Chunk,
+    FormatType,
+    QueryType,
+    Rule,
+    parse_entity_options,
+)
 from app.schemas.query_api import (
     QueryResult,
     ResolvedEntitySchema,
@@ -17,32 +46,135 @@ from app.services.llm_service import (
     generate_inferred_response,
     generate_response,
 )
+from app.services.loaders.cache import InflightLoads
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Try to import pyahocorasick for keyword replacement, falling back to regex
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 SearchMethod = Callable[[str, str, List[Rule]], Awaitable[SearchResponse]]
 
-# Concurrency control - increased from 5 to 10 for better throughput
-# This can be adjusted based on server capacity
-MAX_CONCURRENT_QUERIES = 10
+# Concurrency control - every document query, whether from
+# process_queries_in_parallel or a single endpoint call, holds the semaphore
+# while it runs, so the vector DB never sees more than this many concurrent
+# searches per worker.
+# Adjust with QUERY_CONCURRENCY based on backend capacity
+MAX_CONCURRENT_QUERIES = get_settings().query_concurrency
 QUERY_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
 
+# Maximum number of chunks returned with a query result
+MAX_RESULT_CHUNKS = 10
+
+# Maximum number of characters of chunk content sent to the LLM; retrieval
+# rarely gets near it, it guards against unbounded prompts from broad searches
+MAX_CONTEXT_CHARS = get_settings().query_max_context_chars
+
+# Gets a chunk's content without a Python-level frame per chunk
+_get_content = operator.attrgetter("content")
+
+# Separator for replacing keywords in every item of a list in one pass; it is
+# not a word character, so word boundaries at item edges are unchanged
+_ITEM_SEPARATOR = "\x1e"
+
+# Array answers longer than this are resolved in a worker thread; shorter
+# ones are resolved inline, where a thread hop would cost more than it saves
+THREAD_RESOLVE_MIN_ITEMS = 64
+
+# Queries asking for tags or categories, whose array answers default to []
+_TAG_QUERY_RE = re.compile(r"tag|categor|injur|type|list", re.IGNORECASE)
+
+# Query result cache - identical queries, e.g. repeated in one batch, reuse
+# the result instead of running the search and LLM call again
+QUERY_CACHE_SIZE = get_settings().query_cache_size
+QUERY_CACHE_TTL = get_settings().query_cache_ttl  # seconds
+QUERY_RESULT_CACHE: TTLCache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+_INFLIGHT_QUERIES: InflightLoads[QueryResult] = InflightLoads()
+# Position of the document ID in query result cache keys
+_CACHE_KEY_DOCUMENT_ID = 2
+# Bumped whenever cached results are cleared, so queries already running
+# against the old document don't cache their results afterwards
+_cache_generation = 0
+
+# Answers of failed queries by format; arrays are tuples so the shared
+# values can't be mutated, _fallback_result gives each result its own list
+FALLBACK_BY_FORMAT: Dict[str, Any] = {
+    "int": 0,
+    "bool": False,
+    "int_array": (),
+    "str_array": (),
+    "str": "",
+}
+
 # Retry configuration - reduced delay for faster failure recovery
 MAX_RETRIES = 2
 RETRY_DELAY = 1.0  # seconds
+MAX_RETRY_DELAY = 5.0  # seconds
+
+# Errors that would fail the same way again, so queries raising them are not
+# retried: invalid data and programming errors rather than backend hiccups
+NON_RETRYABLE_ERRORS = (ValidationError, AttributeError, KeyError, TypeError)
+
+
+def _fallback_result(format: FormatType) -> QueryResult:
+    """Create the fallback result of a failed query based on its format."""
+    fallback_answer = FALLBACK_BY_FORMAT.get(format, "")
+    if isinstance(fallback_answer, tuple):
+        fallback_answer = list(fallback_answer)
+
+    return QueryResult(
+        answer=fallback_answer,
+        chunks=[],
+        resolved_entities=[]
+    )
+
+
+def _simple_vector_search(
+    vector_db_service: Any, query: str, document_id: str, rules: List[Rule]
+) -> Awaitable[SearchResponse]:
+    """Run a vector search for a single query; rules don't apply."""
+    return vector_db_service.vector_search([query], document_id)
+
+
+# Search method getters by query type
+_SEARCH_METHODS: Dict[str, Callable[[Any], SearchMethod]] = {
+    "decomposition": lambda service: service.decomposed_search,
+    "hybrid": lambda service: service.hybrid_search,
+    "simple_vector": lambda service: functools.partial(
+        _simple_vector_search, service
+    ),
+}
 
 
 def get_search_method(
     query_type: QueryType, vector_db_service: Any
 ) -> SearchMethod:
     """Get the search method based on the query type."""
-    if query_type == "decomposition":
-        return vector_db_service.decomposed_search
-    elif query_type == "hybrid":
-        return vector_db_service.hybrid_search
-    else:  # simple_vector
-        return lambda q, d, r: vector_db_service.vector_search([q], d)
+    # Unknown types fall back to a simple vector search, as before
+    return _SEARCH_METHODS.get(query_type, _SEARCH_METHODS["simple_vector"])(
+        vector_db_service
+    )
+
+
+def _join_chunk_contents(chunks: List[Chunk], max_chars: int) -> str:
+    """Join the contents of the leading chunks that fit in ``max_chars``.
+
+    Chunks are ranked by relevance, so the ones left out matter least. The
+    first chunk is always included.
+    """
+    contents = list(map(_get_content, chunks))
+    total = 0
+    for count, content in enumerate(contents):
+        total += len(content) + 1
+        if total > max_chars and count:
+            logger.info("Context budget reached, using %d of %d chunks", count, len(chunks))
+            return " ".join(contents[:count])
+    return " ".join(contents)
 
 
 def extract_chunks(search_response: SearchResponse) -> List[Chunk]:
@@ -54,6 +186,135 @@ def extract_chunks(search_response: SearchResponse) -> List[Chunk]:
     )
 
 
+@functools.lru_cache(maxsize=256)
+def _compile_keyword_regex(keywords: FrozenSet[str]) -> re.Pattern:
+    """Compile a single regex matching any of the keywords as whole words.
+
+    Longer keywords come first so that e.g. "New York" wins over "New".
+    """
+    pattern = "|".join(
+        map(re.escape, sorted(keywords, key=lambda keyword: (-len(keyword), keyword)))
+    )
+    return re.compile(f"\\b({pattern})\\b")
+
+
+@functools.lru_cache(maxsize=256)
+def _build_keyword_automaton(keywords: FrozenSet[str]) -> Any:
+    """Build an Aho-Corasick automaton over the keywords."""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    """Check whether a regex ``\\b`` would match before ``text[index]``."""
+    before = index > 0 and (text[index - 1].isalnum() or text[index - 1] == "_")
+    after = index < len(text) and (text[index].isalnum() or text[index] == "_")
+    return before != after
+
+
+@functools.lru_cache(maxsize=256)
+def _keyword_first_chars(keywords: FrozenSet[str]) -> FrozenSet[str]:
+    """Get the characters that keywords start with."""
+    return frozenset(keyword[0] for keyword in keywords)
+
+
+def _keyword_set(keyword_replacements: Dict[str, str]) -> FrozenSet[str]:
+    """Get the non-empty keywords of a replacements dict."""
+    return frozenset(keyword for keyword in keyword_replacements if keyword)
+
+
+def _keyword_matcher(keywords: FrozenSet[str]) -> Any:
+    """Get the cached automaton, or regex, matching the keywords."""
+    if not keywords:
+        return None
+    if AHOCORASICK_AVAILABLE:
+        return _build_keyword_automaton(keywords)
+    return _compile_keyword_regex(keywords)
+
+
+def _build_replacements(rules: List[Rule]) -> Dict[str, str]:
+    """Build the keyword replacements of all resolve_entity rules.
+
+    Rules with an option that isn't a "keyword:replacement" pair are
+    skipped. The dict is cached and shared, so it must not be modified.
+    """
+    return _merged_replacements(
+        tuple(
+            tuple(rule.options)
+            for rule in rules
+            if rule.type == "resolve_entity" and rule.options
+        )
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _merged_replacements(
+    options_by_rule: Tuple[Tuple[str, ...], ...]
+) -> Dict[str, str]:
+    """Merge the parsed options of resolve_entity rules.
+
+    Cached by the options themselves, since every request deserializes new
+    Rule objects for the same column rules.
+    """
+    replacements: Dict[str, str] = {}
+    for options in options_by_rule:
+        try:
+            replacements.update(parse_entity_options(options))
+        except ValueError:
+            logger.warning("Skipping malformed resolve_entity rule: %s", list(options))
+    return replacements
+
+
+def _replace_all(text: str, keyword_replacements: Dict[str, str]) -> str:
+    """Replace every whole-word keyword in a single pass over the text.
+
+    Overlapping matches are resolved like the regex: leftmost first, then
+    longest.
+    """
+    keywords = _keyword_set(keyword_replacements)
+    if not keywords:
+        return text
+    if len(keywords) == 1:
+        # The common single-entity rule: one substring search in C rules out
+        # most texts before any matcher runs
+        (keyword,) = keywords
+        if keyword not in text:
+            return text
+    # No keyword can match if none of their first characters occur; the set
+    # check runs in C and is far cheaper than a scan with the matcher
+    elif _keyword_first_chars(keywords).isdisjoint(text):
+        return text
+
+    matcher = _keyword_matcher(keywords)
+
+    if isinstance(matcher, re.Pattern):
+        return matcher.sub(lambda m: keyword_replacements[m.group()], text)
+
+    # One walk of the automaton finds every keyword regardless of how many
+    # there are, unlike a regex alternation which tries each at every offset
+    matches = []
+    for end, keyword in matcher.iter(text):
+        start = end - len(keyword) + 1
+        if _is_word_boundary(text, start) and _is_word_boundary(text, end + 1):
+            matches.append((start, -len(keyword), keyword))
+    if not matches:
+        return text
+
+    parts = []
+    position = 0
+    for start, _, keyword in sorted(matches):
+        if start < position:
+            continue
+        parts.append(text[position:start])
+        parts.append(keyword_replacements[keyword])
+        position = start + len(keyword)
+    parts.append(text[position:])
+    return "".join(parts)
+
+
 def replace_keywords(
     text: Union[str, List[str]], keyword_replacements: Dict[str, str]
 ) -> tuple[
@@ -68,26 +329,22 @@ def replace_keywords(
 
     # Handle list of strings
     if isinstance(text, list):
-        original_text = text.copy()
-        result = []
-        modified = False
-
-        # Create a single regex pattern for all keywords
-        pattern = "|".join(map(re.escape, keyword_replacements.keys()))
-        regex = re.compile(f"\\b({pattern})\\b")
-
-        for item in text:
-            # Single pass replacement for all keywords
-            new_item = regex.sub(
-                lambda m: keyword_replacements[m.group()], item
-            )
-            result.append(new_item)
-            if new_item != item:
-                modified = True
+        if any(_ITEM_SEPARATOR in item for item in text) or any(
+            _ITEM_SEPARATOR in keyword or _ITEM_SEPARATOR in replacement
+            for keyword, replacement in keyword_replacements.items()
+        ):
+            result = [_replace_all(item, keyword_replacements) for item in text]
+        else:
+            # Single pass replacement for all keywords across all items
+            joined = _ITEM_SEPARATOR.join(text)
+            replaced = _replace_all(joined, keyword_replacements)
+            # The text comes back as is when no keyword matched
+            result = text if replaced is joined else replaced.split(_ITEM_SEPARATOR)
 
-        if modified:
-            return result, {"original": original_text, "resolved": result}
-        return result, {"original": original_text, "resolved": result}
+        if result == text:
+            # Nothing changed, so share the list instead of copying it
+            return text, {"original": text, "resolved": text}
+        return result, {"original": text.copy(), "resolved": result}
 
     # Handle single string
     return replace_keywords_in_string(text, keyword_replacements)
@@ -100,12 +357,8 @@ def replace_keywords_in_string(
     if not text:
         return text, {"original": text, "resolved": text}
 
-    # Create a single regex pattern for all keywords
-    pattern = "|".join(map(re.escape, keyword_replacements.keys()))
-    regex = re.compile(f"\\b({pattern})\\b")
-
     # Single pass replacement
-    result = regex.sub(lambda m: keyword_replacements[m.group()], text)
+    result = _replace_all(text, keyword_replacements)
 
     # Only return transformation if something changed
     if result != text:
@@ -113,6 +366,27 @@ def replace_keywords_in_string(
     return text, {"original": text, "resolved": text}
 
 
+async def _apply_entity_resolution(
+    answer_value: Any, replacements: Dict[str, str]
+) -> tuple[Any, Optional[Dict[str, Union[str, List[str]]]]]:
+    """Apply the resolve_entity keyword replacements to an answer.
+
+    Lists are resolved item by item, any other answer as a string. Long
+    lists are resolved in a worker thread so they don't block the event
+    loop for other queries. The transformations are None if nothing was
+    resolved.
+    """
+    if not replacements or not answer_value:
+        return answer_value, None
+
+    logger.debug("Resolving entities in answer: %s", answer_value)
+    if not isinstance(answer_value, list):
+        return replace_keywords(str(answer_value), replacements)
+    if len(answer_value) > THREAD_RESOLVE_MIN_ITEMS:
+        return await asyncio.to_thread(replace_keywords, answer_value, replacements)
+    return replace_keywords(answer_value, replacements)
+
+
 async def process_query_with_retry(
     query_type: QueryType,
     query: str,
@@ -123,20 +397,79 @@ async def process_query_with_retry(
     vector_db_service: Any,
     retries: int = MAX_RETRIES,
 ) -> QueryResult:
-    """Process a query with optimized retry logic for faster response times."""
+    """Process a query with optimized retry logic for faster response times.
+
+    Successful results are cached by the query inputs, and concurrent
+    identical queries share a single run.
+    """
+    cache_key = (
+        query_type,
+        query,
+        document_id,
+        tuple(rule.cache_key() for rule in rules),
+        format,
+        llm_service,
+        vector_db_service,
+    )
+    cached = QUERY_RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    return await _INFLIGHT_QUERIES.run(
+        cache_key,
+        lambda: _run_query_with_retry(
+            cache_key,
+            query_type,
+            query,
+            document_id,
+            rules,
+            format,
+            llm_service,
+            vector_db_service,
+            retries,
+        ),
+    )
+
+
+def clear_document_results(document_id: str) -> None:
+    """Drop the cached query results of a document.
+
+    Call this when a document is deleted or its content changes.
+    """
+    global _cache_generation
+    _cache_generation += 1
+    stale_keys = [
+        key for key in QUERY_RESULT_CACHE if key[_CACHE_KEY_DOCUMENT_ID] == document_id
+    ]
+    for key in stale_keys:
+        QUERY_RESULT_CACHE.pop(key, None)
+
+
+async def _run_query_with_retry(
+    cache_key: Any,
+    query_type: QueryType,
+    query: str,
+    document_id: str,
+    rules: List[Rule],
+    format: FormatType,
+    llm_service: CompletionService,
+    vector_db_service: Any,
+    retries: int,
+) -> QueryResult:
+    """Run a query with retries, caching the result if it succeeds."""
     last_exception = None
-    
-    # Truncate query for logging to avoid excessive log size
-    query_preview = query[:30] + "..." if len(query) > 30 else query
+    delay = RETRY_DELAY
+    generation = _cache_generation
     
     for attempt in range(retries + 1):
         try:
             # Use the semaphore to limit concurrency
             async with QUERY_SEMAPHORE:
                 if attempt > 0:
-                    logger.info(f"Retry {attempt}/{retries} for query: {query_preview}")
+                    # %.30s truncates the query to avoid excessive log size
+                    logger.info("Retry %d/%d for query: %.30s", attempt, retries, query)
                 
-                start_time = time.time()
+                start_time = time.perf_counter()
                 
                 # Process the query
                 result = await process_query(
@@ -149,36 +482,34 @@ async def process_query_with_retry(
                     vector_db_service,
                 )
                 
-                elapsed = time.time() - start_time
-                logger.info(f"Query processed in {elapsed:.2f}s")
+                elapsed = time.perf_counter() - start_time
+                logger.info("Query processed in %.2fs", elapsed)
+                # A None answer means the LLM call failed (generate_response
+                # swallows its errors) or the search found no chunks, e.g.
+                # while the document is still being indexed; like fallbacks,
+                # those are not cached so the query is retried next time
+                if result.answer is not None and generation == _cache_generation:
+                    QUERY_RESULT_CACHE[cache_key] = result
                 return result
                 
+        except NON_RETRYABLE_ERRORS as e:
+            last_exception = e
+            break
+
         except Exception as e:
             last_exception = e
             
             if attempt < retries:
-                # Simplified retry delay with minimal jitter
-                jitter = RETRY_DELAY * (0.9 + 0.2 * attempt)
-                await asyncio.sleep(jitter)
+                # Decorrelated jitter spreads out retries of queries that
+                # failed together, e.g. on a rate limit, instead of waking
+                # them all at once
+                delay = min(MAX_RETRY_DELAY, random.uniform(RETRY_DELAY, delay * 3))
+                await asyncio.sleep(delay)
     
     # If we get here, all retries failed - create appropriate fallback
-    logger.error(f"Query failed after {retries+1} attempts: {str(last_exception)}")
+    logger.error("Query failed after %d attempts: %s", attempt + 1, last_exception)
     
-    # Return a fallback result based on the expected format
-    if format == "int":
-        fallback = 0
-    elif format == "bool":
-        fallback = False
-    elif format in ["int_array", "str_array"]:
-        fallback = []
-    else:
-        fallback = ""
-        
-    return QueryResult(
-        answer=fallback,
-        chunks=[],
-        resolved_entities=[]
-    )
+    return _fallback_result(format)
 
 
 async def process_query(
@@ -194,65 +525,50 @@ async def process_query(
     search_method = get_search_method(query_type, vector_db_service)
 
     # Step 1: Get search response
-    search_response = await search_method(query, document_id, rules)
+    search_task = asyncio.ensure_future(search_method(query, document_id, rules))
+
+    # The replacements only depend on the rules, so build them and their
+    # keyword matcher while the search is in flight
+    replacements: Dict[str, str] = {}
+    if format in ["str", "str_array"] and any(
+        rule.type == "resolve_entity" for rule in rules
+    ):
+        replacements = _build_replacements(rules)
+        _keyword_matcher(_keyword_set(replacements))
+
+    search_response = await search_task
     chunks = extract_chunks(search_response)
-    concatenated_chunks = " ".join(chunk.content for chunk in chunks)
 
     # Step 2: Generate response from LLM
-    answer = await generate_response(
-        llm_service, query, concatenated_chunks, rules, format
-    )
-    answer_value = answer["answer"]
-
-    transformations: Dict[str, Union[str, List[str]]] = {
-        "original": "",
-        "resolved": "",
-    }
+    if chunks:
+        concatenated_chunks = _join_chunk_contents(chunks, MAX_CONTEXT_CHARS)
+        answer = await generate_response(
+            llm_service, query, concatenated_chunks, rules, format
+        )
+        answer_value = answer["answer"]
+    else:
+        # Without context there is nothing to answer from; skip the LLM call
+        # and answer as it does when it finds nothing
+        answer_value = None
 
     result_chunks = []
 
     if format in ["str", "str_array"]:
-        # Extract and apply keyword replacements from all resolve_entity rules
-        resolve_entity_rules = [
-            rule for rule in rules if rule.type == "resolve_entity"
-        ]
-
         result_chunks = (
             []
             if answer_value in ("not found", None)
             and query_type != "decomposition"
-            else chunks
+            else chunks[:MAX_RESULT_CHUNKS]
         )
 
-        # First populate the replacements dictionary
-        replacements: Dict[str, str] = {}
-        if resolve_entity_rules and answer_value:
-            for rule in resolve_entity_rules:
-                if rule.options:
-                    rule_replacements = dict(
-                        option.split(":") for option in rule.options
-                    )
-                    replacements.update(rule_replacements)
-
-            # Then apply the replacements if we have any
-            if replacements:
-                print(f"Resolving entities in answer: {answer_value}")
-                if isinstance(answer_value, list):
-                    transformed_list, transform_dict = replace_keywords(
-                        answer_value, replacements
-                    )
-                    transformations = transform_dict
-                    answer_value = transformed_list
-                else:
-                    transformed_value, transform_dict = replace_keywords(
-                        answer_value, replacements
-                    )
-                    transformations = transform_dict
-                    answer_value = transformed_value
+    # Apply the keyword replacements from all resolve_entity rules
+    answer_value, transformations = await _apply_entity_resolution(
+        answer_value, replacements
+    )
 
     return QueryResult(
         answer=answer_value,
-        chunks=result_chunks[:10],
+        chunks=result_chunks,
         resolved_entities=(
             [
                 ResolvedEntitySchema(
@@ -262,12 +578,84 @@ async def process_query(
                     entityType="some-type",
                 )
             ]
-            if transformations["original"] or transformations["resolved"]
+            if transformations
             else None
         ),
     )
 
 
+async def iter_queries_as_completed(
+    queries: List[Dict[str, Any]],
+    llm_service: CompletionService,
+    vector_db_service: Any,
+) -> AsyncIterator[Tuple[int, QueryResult]]:
+    """
+    Process multiple queries in parallel, yielding each result as it completes.
+
+    Parameters
+    ----------
+    queries : List[Dict[str, Any]]
+        List of query parameters, as for ``process_queries_in_parallel``.
+    llm_service : CompletionService
+        The language model service.
+    vector_db_service : Any
+        The vector database service.
+
+    Yields
+    ------
+    Tuple[int, QueryResult]
+        The index of a query in ``queries`` and its result, in completion
+        order. Failed queries yield a fallback result for their format.
+    """
+    logger.info("Processing %d queries in parallel", len(queries))
+
+    async def run(index: int, q: Dict[str, Any]) -> Tuple[int, QueryResult]:
+        try:
+            result = await process_query_with_retry(
+                q["query_type"],
+                q["query"],
+                q["document_id"],
+                q["rules"],
+                q["format"],
+                llm_service,
+                vector_db_service,
+            )
+        except Exception as e:
+            logger.error("Query %d failed: %s", index, e)
+            result = _fallback_result(q["format"])
+        return index, result
+
+    # Tasks queue on the semaphore in creation order, so starting the simpler
+    # queries first gets their results back first without sorting the batch
+    ordered = itertools.chain(
+        ((index, q) for index, q in enumerate(queries) if q["query_type"] == "simple_vector"),
+        ((index, q) for index, q in enumerate(queries) if q["query_type"] != "simple_vector"),
+    )
+
+    # Only a window of tasks exists at a time, topped up as queries finish,
+    # so large batches don't hold a task per query; it is wider than the
+    # semaphore so a freed slot always has a query waiting for it
+    window = MAX_CONCURRENT_QUERIES * 2
+    pending: Set["asyncio.Task[Tuple[int, QueryResult]]"] = set()
+    try:
+        while True:
+            pending.update(
+                asyncio.ensure_future(run(index, q))
+                for index, q in itertools.islice(ordered, window - len(pending))
+            )
+            if not pending:
+                break
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        # Stop the remaining queries if the consumer goes away early
+        for task in pending:
+            task.cancel()
+
+
 async def process_queries_in_parallel(
     queries: List[Dict[str, Any]],
     llm_service: CompletionService,
@@ -295,137 +683,28 @@ async def process_queries_in_parallel(
     List[QueryResult]
         List of query results in the same order as the input queries.
     """
-    logger.info(f"Processing {len(queries)} queries in parallel")
-    
-    # Prioritize queries - put simpler queries first for faster initial results
-    prioritized_queries = sorted(
-        enumerate(queries), 
-        key=lambda x: 0 if x[1]["query_type"] == "simple_vector" else 1
-    )
-    original_indices = [idx for idx, _ in prioritized_queries]
-    sorted_queries = [q for _, q in prioritized_queries]
-    
-    # Create tasks with retry logic
-    tasks = [
-        process_query_with_retry(
-            q["query_type"],
-            q["query"],
-            q["document_id"],
-            q["rules"],
-            q["format"],
-            llm_service,
-            vector_db_service,
-        )
-        for q in sorted_queries
-    ]
-    
-    # Use a larger batch size for the first batch to get initial results faster
-    first_batch_size = min(len(tasks), MAX_CONCURRENT_QUERIES * 2)
-    remaining_tasks = tasks[first_batch_size:]
-    
-    # Process first batch with higher priority
-    logger.info(f"Processing first batch with {first_batch_size} queries")
-    first_batch_results = await asyncio.gather(*tasks[:first_batch_size], return_exceptions=True)
-    
-    # Process remaining batches
-    remaining_results = []
-    if remaining_tasks:
-        # Process remaining tasks with standard concurrency
-        logger.info(f"Processing remaining {len(remaining_tasks)} queries")
-        remaining_results = await asyncio.gather(*remaining_tasks, return_exceptions=True)
-    
-    # Combine results
-    batch_results = first_batch_results + remaining_results
-    
-    # Process results, converting exceptions to fallback values
-    results = [None] * len(queries)  # Pre-allocate result list
-    
-    for i, result in enumerate(batch_results):
-        original_idx = original_indices[i]
-        q = queries[original_idx]
-        
-        if isinstance(result, Exception):
-            logger.error(f"Query {original_idx} failed: {str(result)}")
-            # Create fallback result based on format
-            if q["format"] == "int":
-                fallback_answer = 0
-            elif q["format"] == "bool":
-                fallback_answer = False
-            elif q["format"].endswith("_array"):
-                fallback_answer = []
-            else:
-                fallback_answer = ""
-            
-            results[original_idx] = QueryResult(
-                answer=fallback_answer,
-                chunks=[],
-                resolved_entities=[]
-            )
-        else:
-            results[original_idx] = result
-    
-    return results
+    results: List[Optional[QueryResult]] = [None] * len(queries)  # Pre-allocate result list
 
+    async with contextlib.aclosing(
+        iter_queries_as_completed(queries, llm_service, vector_db_service)
+    ) as completed:
+        async for index, result in completed:
+            results[index] = result
 
-# Convenience functions for specific query types
-async def decomposition_query(
-    query: str,
-    document_id: str,
-    rules: List[Rule],
-    format: FormatType,
-    llm_service: CompletionService,
-    vector_db_service: Any,
-) -> QueryResult:
-    """Process the query based on the decomposition type."""
-    return await process_query_with_retry(
-        "decomposition",
-        query,
-        document_id,
-        rules,
-        format,
-        llm_service,
-        vector_db_service,
-    )
-
+    return results
 
-async def hybrid_query(
-    query: str,
-    document_id: str,
-    rules: List[Rule],
-    format: FormatType,
-    llm_service: CompletionService,
-    vector_db_service: Any,
-) -> QueryResult:
-    """Process the query based on the hybrid type."""
-    return await process_query_with_retry(
-        "hybrid",
-        query,
-        document_id,
-        rules,
-        format,
-        llm_service,
-        vector_db_service,
-    )
 
+# Convenience functions for specific query types; partials avoid a wrapper
+# coroutine per call and take the remaining process_query_with_retry arguments
+QueryFunction = Callable[..., Awaitable[QueryResult]]
 
-async def simple_vector_query(
-    query: str,
-    document_id: str,
-    rules: List[Rule],
-    format: FormatType,
-    llm_service: CompletionService,
-    vector_db_service: Any,
-) -> QueryResult:
-    """Process the query based on the simple vector type."""
-    return await process_query_with_retry(
-        "simple_vector",
-        query,
-        document_id,
-        rules,
-        format,
-        llm_service,
-        vector_db_service,
-    )
+decomposition_query: QueryFunction = functools.partial(
+    process_query_with_retry, "decomposition"
+)
+hybrid_query: QueryFunction = functools.partial(process_query_with_retry, "hybrid")
+simple_vector_query: QueryFunction = functools.partial(
+    process_query_with_retry, "simple_vector"
+)
 
 
 async def inference_query(
@@ -440,98 +719,72 @@ async def inference_query(
     # logger.info(f"Processing inference query: {query_preview}")
     
     try:
-        # Use the semaphore to limit concurrency
-        async with QUERY_SEMAPHORE:
-            start_time = time.time()
-            
-            # Generate response from LLM
-            answer = await generate_inferred_response(
-                llm_service, query, rules, format
-            )
-            answer_value = answer["answer"]
-            
-            # Fast path for simple types
-            if format in ["int", "bool"] and not isinstance(answer_value, (list, dict)):
-                return QueryResult(answer=answer_value, chunks=[])
+        # The LLM service bounds its own concurrency, and there is no vector
+        # search, so inference queries don't wait on QUERY_SEMAPHORE
+        start_time = time.perf_counter()
+        
+        # Generate response from LLM
+        answer = await generate_inferred_response(
+            llm_service, query, rules, format
+        )
+        answer_value = answer["answer"]
+        
+        # Fast path for simple types
+        if format in ["int", "bool"] and not isinstance(answer_value, (list, dict)):
+            return QueryResult(answer=answer_value, chunks=[])
+        
+        # Optimized array handling
+        if format.endswith("_array"):
+            # Check if this is a tag query - use empty arrays for errors
+            is_tag_query = bool(_TAG_QUERY_RE.search(query))
             
-            # Optimized array handling
-            if format.endswith("_array"):
-                # Check if this is a tag query - use empty arrays for errors
-                is_tag_query = any(keyword in query.lower() for keyword in 
-                                ["tag", "categor", "injur", "type", "list"])
-                
-                # Convert string to array if needed
-                if isinstance(answer_value, str):
-                    try:
-                        # Try to parse as a Python list
-                        import ast
-                        cleaned_value = answer_value.strip()
-                        if cleaned_value.startswith('[') and cleaned_value.endswith(']'):
+            # Convert string to array if needed
+            if isinstance(answer_value, str):
+                try:
+                    # Try to parse as a Python list
+                    cleaned_value = answer_value.strip()
+                    if cleaned_value.startswith('[') and cleaned_value.endswith(']'):
+                        try:
+                            # LLMs mostly return JSON, which orjson parses
+                            # far faster than ast; Python literals such as
+                            # single-quoted strings still fall back to ast
                             try:
+                                parsed_value = orjson.loads(cleaned_value)
+                            except orjson.JSONDecodeError:
                                 parsed_value = ast.literal_eval(cleaned_value)
-                                if isinstance(parsed_value, list):
-                                    answer_value = parsed_value
-                            except (ValueError, SyntaxError):
-                                # Fallback to simple parsing
-                                items = cleaned_value[1:-1].split(',')
-                                items = [item.strip().strip('\'"') for item in items if item.strip()]
-                                
-                                if format == 'int_array':
-                                    try:
-                                        answer_value = [int(item) for item in items]
-                                    except ValueError:
-                                        answer_value = [] if is_tag_query else [0]
-                                else:
-                                    answer_value = items
-                    except Exception:
-                        # If all parsing fails, use default
-                        answer_value = [] if is_tag_query else ([0] if format == 'int_array' else [])
-                
-                # Ensure we have a list
-                if not isinstance(answer_value, list):
+                            if isinstance(parsed_value, list):
+                                answer_value = parsed_value
+                        except (ValueError, SyntaxError):
+                            # Fallback to simple parsing
+                            items = cleaned_value[1:-1].split(',')
+                            items = [item.strip().strip('\'"') for item in items if item.strip()]
+                            
+                            if format == 'int_array':
+                                try:
+                                    answer_value = [int(item) for item in items]
+                                except ValueError:
+                                    answer_value = [] if is_tag_query else [0]
+                            else:
+                                answer_value = items
+                except Exception:
+                    # If all parsing fails, use default
                     answer_value = [] if is_tag_query else ([0] if format == 'int_array' else [])
             
-            # Entity resolution if needed
-            resolve_entity_rules = [rule for rule in rules if rule.type == "resolve_entity"]
-            if resolve_entity_rules and answer_value:
-                # Build replacements dictionary
-                replacements = {}
-                for rule in resolve_entity_rules:
-                    if rule.options:
-                        try:
-                            rule_replacements = dict(option.split(":") for option in rule.options)
-                            replacements.update(rule_replacements)
-                        except ValueError:
-                            continue
-                
-                # Apply replacements if any
-                if replacements:
-                    if isinstance(answer_value, list):
-                        transformed_value, _ = replace_keywords(answer_value, replacements)
-                        answer_value = transformed_value
-                    else:
-                        transformed_value, _ = replace_keywords_in_string(str(answer_value), replacements)
-                        answer_value = transformed_value
-            
-            elapsed = time.time() - start_time
-            logger.info(f"Inference query processed in {elapsed:.2f}s")
-            return QueryResult(answer=answer_value, chunks=[])
+            # Ensure we have a list
+            if not isinstance(answer_value, list):
+                answer_value = [] if is_tag_query else ([0] if format == 'int_array' else [])
         
-    except Exception as e:
-        logger.error(f"Error in inference query: {str(e)}")
+        # Entity resolution if needed
+        if answer_value:
+            answer_value, _ = await _apply_entity_resolution(
+                answer_value, _build_replacements(rules)
+            )
         
-        # Fast fallback creation based on format
-        is_tag_query = format.endswith('_array') and any(
-            keyword in query.lower() for keyword in ["tag", "categor", "injur", "type", "list"]
-        )
+        elapsed = time.perf_counter() - start_time
+        logger.info("Inference query processed in %.2fs", elapsed)
+        return QueryResult(answer=answer_value, chunks=[])
+    
+    except Exception as e:
+        logger.error("Error in inference query: %s", e)
         
-        if format == 'int':
-            fallback_value = 0
-        elif format == 'bool':
-            fallback_value = False
-        elif format.endswith('_array'):
-            fallback_value = []
-        else:
-            fallback_value = ""
-            
-        return QueryResult(answer=fallback_value, chunks=[])
+        return _fallback_result(format)
@@ -1,14 +1,16 @@
 """Service for managing table state data using SQLite."""
 
-import json
 import logging
 import os
 import sqlite3
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
+import orjson
+
 from app.core.config import get_settings
-from app.models.table_state import TableState
+from app.models.table_state import TableState, TableStateSummary
 
 # Get settings
 settings = get_settings()
@@ -20,50 +22,37 @@ logger = logging.getLogger(__name__)
 DB_PATH = settings.table_states_db_uri
 logger.info(f"Using configured database path: {DB_PATH}")
 
-# Log the database path for debugging
-# logger.info(f"Table states database path: {DB_PATH}")
-# logger.info(f"Absolute database path: {os.path.abspath(DB_PATH)}")
+# Each thread keeps its own connection; with WAL, reads in one thread don't
+# wait on a write in another
+_local = threading.local()
+
+
+def get_connection() -> sqlite3.Connection:
+    """Get the calling thread's connection to the SQLite database."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH)
+        # WAL is persistent in the database file, the others are per connection
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        _local.conn = conn
+    return conn
 
-# Ensure the directory exists with proper permissions
-dir_path = os.path.dirname(DB_PATH) if os.path.dirname(DB_PATH) else '.'
-try:
-    # Create directory if it doesn't exist
-    os.makedirs(dir_path, exist_ok=True)
-    logger.info(f"Ensured directory exists: {dir_path}")
-    
-    # Try to set directory permissions (may fail if not running as root)
-    try:
-        os.chmod(dir_path, 0o777)
-        logger.info(f"Set permissions on directory: {dir_path}")
-    except Exception as e:
-        logger.warning(f"Could not set permissions on directory {dir_path}: {e}")
-    
-    # Create the database file if it doesn't exist
-    if not os.path.exists(DB_PATH):
-        open(DB_PATH, 'a').close()
-        logger.info(f"Created database file: {DB_PATH}")
-        
-        # Try to set file permissions
-        try:
-            os.chmod(DB_PATH, 0o666)
-            logger.info(f"Set permissions on database file: {DB_PATH}")
-        except Exception as e:
-            logger.warning(f"Could not set permissions on database file {DB_PATH}: {e}")
-    
-    # Check if we can write to the directory
-    test_file_path = os.path.join(dir_path, '.write_test')
-    with open(test_file_path, 'w') as f:
-        f.write('test')
-    os.remove(test_file_path)
-    logger.info(f"Successfully verified write access to {dir_path}")
-except Exception as e:
-    logger.error(f"Cannot create or access directory {dir_path}: {e}")
-    logger.error(f"This will cause database operations to fail!")
 
 # Initialize the database
 def init_db():
-    """Initialize the SQLite database."""
-    conn = sqlite3.connect(DB_PATH)
+    """Initialize the SQLite database.
+
+    Called once at application startup; the app sets up the data directory
+    permissions before this runs.
+    """
+    # sqlite3 creates the database file, but not its directory
+    dir_path = os.path.dirname(DB_PATH)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Create the table_states table if it doesn't exist
@@ -72,23 +61,28 @@ def init_db():
         id TEXT PRIMARY KEY,
         name TEXT NOT NULL,
         user_id TEXT,
-        data TEXT NOT NULL,
+        data BLOB NOT NULL,
         created_at TEXT NOT NULL,
         updated_at TEXT NOT NULL
     )
     ''')
     
+    # Serve the newest-first listings from the index instead of sorting
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_table_states_updated_at ON table_states(updated_at DESC)"
+    )
+    
     conn.commit()
-    conn.close()
     
     logger.info(f"Initialized SQLite database at {DB_PATH}")
 
-# Initialize the database when the module is loaded
-init_db()
-
 
 class TableStateService:
-    """Service for managing table state data using SQLite."""
+    """Service for managing table state data using SQLite.
+
+    The methods block on disk I/O, so async callers should run them in a
+    worker thread, e.g. with ``asyncio.to_thread``.
+    """
     
     @staticmethod
     def save_table_state(table_state: TableState) -> TableState:
@@ -96,48 +90,41 @@ class TableStateService:
         # Update the updated_at timestamp
         table_state.updated_at = datetime.utcnow()
         
-        # Convert the data to a JSON string
-        data_json = json.dumps(table_state.data, default=str)
+        # Serialize the data to JSON bytes, stored as a BLOB; rows written as
+        # TEXT by older versions still load since orjson parses both
+        data_json = orjson.dumps(
+            table_state.data, default=str, option=orjson.OPT_NON_STR_KEYS
+        )
         
-        # Connect to the database
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         try:
-            # Check if the table state already exists
-            cursor.execute("SELECT id FROM table_states WHERE id = ?", (table_state.id,))
-            exists = cursor.fetchone() is not None
-            
-            if exists:
-                # Update the existing table state
-                cursor.execute(
-                    "UPDATE table_states SET name = ?, user_id = ?, data = ?, updated_at = ? WHERE id = ?",
-                    (
-                        table_state.name,
-                        table_state.user_id,
-                        data_json,
-                        table_state.updated_at.isoformat(),
-                        table_state.id
-                    )
-                )
-                logger.info(f"Updated table state {table_state.id} in database")
-            else:
-                # Insert a new table state
-                cursor.execute(
-                    "INSERT INTO table_states (id, name, user_id, data, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
-                    (
-                        table_state.id,
-                        table_state.name,
-                        table_state.user_id,
-                        data_json,
-                        table_state.created_at.isoformat(),
-                        table_state.updated_at.isoformat()
-                    )
+            # Insert the table state, or update it if it already exists; the
+            # original created_at is kept
+            cursor.execute(
+                """
+                INSERT INTO table_states (id, name, user_id, data, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    name = excluded.name,
+                    user_id = excluded.user_id,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    table_state.id,
+                    table_state.name,
+                    table_state.user_id,
+                    data_json,
+                    table_state.created_at.isoformat(),
+                    table_state.updated_at.isoformat()
                 )
-                logger.info(f"Inserted new table state {table_state.id} into database")
+            )
             
             # Commit the transaction
             conn.commit()
+            logger.info(f"Saved table state {table_state.id} to database")
             
             return table_state
         except Exception as e:
@@ -145,15 +132,11 @@ class TableStateService:
             conn.rollback()
             logger.error(f"Error saving table state {table_state.id}: {e}")
             raise
-        finally:
-            # Close the connection
-            conn.close()
     
     @staticmethod
     def get_table_state(table_id: str) -> Optional[TableState]:
         """Get a table state by ID from the SQLite database."""
-        # Connect to the database
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         try:
@@ -169,7 +152,7 @@ class TableStateService:
                 return None
             
             # Parse the JSON data
-            data = json.loads(row[3])
+            data = orjson.loads(row[3])
             
             # Create a TableState object
             table_state = TableState(
@@ -187,15 +170,11 @@ class TableStateService:
         except Exception as e:
             logger.error(f"Error loading table state {table_id}: {e}")
             return None
-        finally:
-            # Close the connection
-            conn.close()
     
     @staticmethod
     def list_table_states() -> List[TableState]:
         """List all table states from the SQLite database."""
-        # Connect to the database
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         try:
@@ -209,7 +188,7 @@ class TableStateService:
             table_states = []
             for row in rows:
                 # Parse the JSON data
-                data = json.loads(row[3])
+                data = orjson.loads(row[3])
                 
                 # Create a TableState object
                 table_state = TableState(
@@ -229,32 +208,55 @@ class TableStateService:
         except Exception as e:
             logger.error(f"Error listing table states: {e}")
             return []
-        finally:
-            # Close the connection
-            conn.close()
     
     @staticmethod
-    def delete_table_state(table_id: str) -> bool:
-        """Delete a table state by ID from the SQLite database."""
-        # Connect to the database
-        conn = sqlite3.connect(DB_PATH)
+    def list_table_state_summaries() -> List[TableStateSummary]:
+        """List the metadata of all table states, without loading their data."""
+        conn = get_connection()
         cursor = conn.cursor()
         
         try:
-            # Check if the table state exists
-            cursor.execute("SELECT id FROM table_states WHERE id = ?", (table_id,))
-            exists = cursor.fetchone() is not None
+            # Query the table state metadata only, the data can be large
+            cursor.execute(
+                "SELECT id, name, user_id, created_at, updated_at FROM table_states ORDER BY updated_at DESC"
+            )
+            rows = cursor.fetchall()
             
-            if not exists:
-                logger.warning(f"Table state {table_id} not found in database")
-                return False
+            summaries = [
+                TableStateSummary(
+                    id=row[0],
+                    name=row[1],
+                    user_id=row[2],
+                    created_at=datetime.fromisoformat(row[3]),
+                    updated_at=datetime.fromisoformat(row[4])
+                )
+                for row in rows
+            ]
+            
+            logger.info(f"Listed {len(summaries)} table state summaries from database")
             
-            # Delete the table state
+            return summaries
+        except Exception as e:
+            logger.error(f"Error listing table state summaries: {e}")
+            return []
+    
+    @staticmethod
+    def delete_table_state(table_id: str) -> bool:
+        """Delete a table state by ID from the SQLite database."""
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # Delete the table state; no rows deleted means it didn't exist
             cursor.execute("DELETE FROM table_states WHERE id = ?", (table_id,))
             
             # Commit the transaction
             conn.commit()
             
+            if cursor.rowcount == 0:
+                logger.warning(f"Table state {table_id} not found in database")
+                return False
+            
             logger.info(f"Deleted table state {table_id} from database")
             
             return True
@@ -263,6 +265,3 @@ class TableStateService:
             conn.rollback()
             logger.error(f"Error deleting table state {table_id}: {e}")
             return False
-        finally:
-            # Close the connection
-            conn.close()
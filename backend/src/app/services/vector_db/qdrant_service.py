@@ -5,16 +5,20 @@
 import asyncio
 import logging
 import uuid
+import weakref
+from functools import lru_cache
 from typing import Any, Dict, List, Sequence
 
+from cachetools import LRUCache
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from qdrant_client import QdrantClient, models
+from qdrant_client import AsyncQdrantClient, models
 
 from app.core.config import Settings
 from app.models.query_core import Chunk, Rule
 from app.schemas.query_api import VectorResponseSchema
 from app.services.embedding.base import EmbeddingService
+from app.services.loaders.cache import InflightLoads
 from app.services.llm_service import CompletionService
 from app.services.vector_db.base import VectorDBService
 
@@ -23,6 +27,50 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Entry keys that make up a point itself rather than its payload
+POINT_FIELDS = frozenset(("id", "vector"))
+# Number of points fetched per scroll request when reading a whole document
+SCROLL_PAGE_SIZE = 1000
+
+# Query embeddings by (embedding model, query). The same question is usually
+# asked of every document in a table, so it only needs embedding once
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+QUERY_EMBEDDING_CACHE: LRUCache = LRUCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+_INFLIGHT_EMBEDDINGS: InflightLoads[List[List[float]]] = InflightLoads()
+
+
+@lru_cache(maxsize=1024)
+def _document_filter(document_id: str) -> models.Filter:
+    """Get the filter matching the points of a document.
+
+    Filters are cached per document and must not be mutated.
+    """
+    return models.Filter(
+        must=[
+            models.FieldCondition(
+                key="document_id",
+                match=models.MatchValue(value=document_id),
+            )
+        ]
+    )
+
+
+def _make_batches(
+    ids: Sequence[Any],
+    vectors: Sequence[List[float]],
+    payloads: Sequence[Dict[str, Any]],
+    size: int,
+) -> List[models.Batch]:
+    """Split point columns into columnar batches of at most ``size`` points."""
+    return [
+        models.Batch(
+            ids=ids[i:i + size],
+            vectors=vectors[i:i + size],
+            payloads=payloads[i:i + size],
+        )
+        for i in range(0, len(ids), size)
+    ]
+
 
 class QdrantMetadata(BaseModel, extra="forbid"):
     """Metadata for Qdrant documents."""
@@ -49,11 +97,27 @@ class QdrantService(VectorDBService):
         self.collection_name = settings.index_name
         self.dimensions = settings.dimensions
         qdrant_config = settings.qdrant.model_dump(exclude_none=True)
-        self.client = QdrantClient(**qdrant_config)
+        # The async client keeps Qdrant round-trips off the event loop
+        self.client = AsyncQdrantClient(**qdrant_config)
+
+    # Collections known to exist, shared by every instance in the process
+    _collection_ready: Dict[str, bool] = {}
+    # Locks serialising the first existence check of each collection, so
+    # concurrent upserts don't all create it. A lock binds to the event loop
+    # that first contends it, so each loop gets its own
+    _collection_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    @classmethod
+    def _get_collection_lock(cls, collection_name: str) -> asyncio.Lock:
+        """Get the running loop's lock for a collection's existence check."""
+        locks = cls._collection_locks.setdefault(asyncio.get_running_loop(), {})
+        lock = locks.get(collection_name)
+        if lock is None:
+            lock = locks[collection_name] = asyncio.Lock()
+        return lock
 
-    # Collection existence cache
-    _collection_exists = False
-    
     async def upsert_vectors(
         self, vectors: List[Dict[str, Any]], parent_run_id: str = None
     ) -> Dict[str, str]:
@@ -61,15 +125,17 @@ class QdrantService(VectorDBService):
         logger.info(f"Upserting {len(vectors)} chunks")
         
         # Only check collection existence once per application lifecycle
-        if not QdrantService._collection_exists:
-            await self.ensure_collection_exists()
-            QdrantService._collection_exists = True
+        if not QdrantService._collection_ready.get(self.collection_name):
+            async with QdrantService._get_collection_lock(self.collection_name):
+                if not QdrantService._collection_ready.get(self.collection_name):
+                    await self.ensure_collection_exists()
+                    QdrantService._collection_ready[self.collection_name] = True
         
-        # Convert vectors to points
-        points = [
-            models.PointStruct(
-                id=entry.pop("id"), vector=entry.pop("vector"), payload=entry
-            )
+        # Split the entries into columns, leaving the caller's dicts untouched
+        ids = [entry["id"] for entry in vectors]
+        embeddings = [entry["vector"] for entry in vectors]
+        payloads = [
+            {key: value for key, value in entry.items() if key not in POINT_FIELDS}
             for entry in vectors
         ]
         
@@ -82,51 +148,37 @@ class QdrantService(VectorDBService):
         else:
             batch_size = 50
             
-        # Split into batches
-        batches = [points[i:i + batch_size] for i in range(0, len(points), batch_size)]
+        # Split into columnar batches, which serialise more compactly than points
+        batches = _make_batches(ids, embeddings, payloads, batch_size)
         
-        logger.info(f"Split {len(points)} points into {len(batches)} batches with size {batch_size}")
+        logger.info(f"Split {len(ids)} points into {len(batches)} batches with size {batch_size}")
         
+        # Send batches concurrently, bounded so Qdrant isn't flooded. Only
+        # the last batch waits for the points to be applied: it is sent once
+        # the others are queued, and Qdrant applies updates in order, so the
+        # whole document is searchable once it returns
+        semaphore = asyncio.Semaphore(self.settings.qdrant_max_in_flight)
+        results = await asyncio.gather(
+            *[
+                self._upsert_batch(i, batch, len(batches), semaphore, wait=False)
+                for i, batch in enumerate(batches[:-1])
+            ],
+            return_exceptions=True,
+        )
+        if batches:
+            results.append(
+                await self._upsert_batch(
+                    len(batches) - 1, batches[-1], len(batches), semaphore, wait=True
+                )
+            )
+
         success_count = 0
-        error_count = 0
-        
-        # Process each batch with exponential backoff retry
-        for i, batch in enumerate(batches):
-            max_retries = 3
-            retry_delay = 1.0  # Start with 1 second delay
-            
-            for retry in range(max_retries):
-                try:
-                    logger.info(f"Processing batch {i+1}/{len(batches)} with {len(batch)} points (attempt {retry+1})")
-                    self.client.upsert(self.collection_name, points=batch, wait=True)
-                    success_count += len(batch)
-                    logger.info(f"Successfully processed batch {i+1}")
-                    break  # Success, exit retry loop
-                    
-                except Exception as e:
-                    if retry == max_retries - 1:  # Last retry attempt
-                        error_count += len(batch)
-                        logger.error(f"Error processing batch {i+1} after {max_retries} attempts: {str(e)}")
-                        
-                        # Try with even smaller batches as a last resort
-                        if len(batch) > 10:
-                            logger.info(f"Attempting final recovery with smaller batches for batch {i+1}")
-                            smaller_batch_size = 5
-                            smaller_batches = [batch[j:j + smaller_batch_size] for j in range(0, len(batch), smaller_batch_size)]
-                            
-                            for k, small_batch in enumerate(smaller_batches):
-                                try:
-                                    self.client.upsert(self.collection_name, points=small_batch, wait=True)
-                                    success_count += len(small_batch)
-                                    error_count -= len(small_batch)
-                                    logger.info(f"Successfully processed micro-batch {k+1}/{len(smaller_batches)}")
-                                except Exception as e2:
-                                    logger.error(f"Error processing micro-batch {k+1}: {str(e2)}")
-                    else:
-                        # Not the last retry, wait and try again
-                        logger.warning(f"Batch {i+1} failed, retrying in {retry_delay}s: {str(e)}")
-                        await asyncio.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.error("Unexpected error upserting batch: %s", result)
+            else:
+                success_count += result
+        error_count = len(ids) - success_count
         
         if error_count > 0:
             return {
@@ -136,51 +188,112 @@ class QdrantService(VectorDBService):
         
         return {"message": f"Successfully upserted {success_count} chunks."}
 
+    async def _upsert_batch(
+        self,
+        index: int,
+        batch: models.Batch,
+        total: int,
+        semaphore: asyncio.Semaphore,
+        wait: bool = True,
+    ) -> int:
+        """Upsert one batch with exponential backoff retry.
+
+        With ``wait=False`` Qdrant acknowledges the batch once it is queued,
+        before its points are searchable.
+
+        Returns
+        -------
+        int
+            The number of points successfully upserted.
+        """
+        max_retries = 3
+        retry_delay = 1.0  # Start with 1 second delay
+
+        for retry in range(max_retries):
+            try:
+                logger.info(
+                    "Processing batch %d/%d with %d points (attempt %d)",
+                    index + 1, total, len(batch.ids), retry + 1,
+                )
+                async with semaphore:
+                    await self.client.upsert(self.collection_name, points=batch, wait=wait)
+                logger.info("Successfully processed batch %d", index + 1)
+                return len(batch.ids)
+
+            except Exception as e:
+                if retry < max_retries - 1:
+                    # Not the last retry, wait and try again
+                    logger.warning("Batch %d failed, retrying in %ss: %s", index + 1, retry_delay, e)
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                else:
+                    logger.error("Error processing batch %d after %d attempts: %s", index + 1, max_retries, e)
+
+        # Try with even smaller batches as a last resort
+        success_count = 0
+        if len(batch.ids) > 10:
+            logger.info("Attempting final recovery with smaller batches for batch %d", index + 1)
+            smaller_batch_size = 5
+            smaller_batches = _make_batches(
+                batch.ids, batch.vectors, batch.payloads, smaller_batch_size
+            )
+
+            for k, small_batch in enumerate(smaller_batches):
+                try:
+                    async with semaphore:
+                        await self.client.upsert(self.collection_name, points=small_batch, wait=wait)
+                    success_count += len(small_batch.ids)
+                    logger.info("Successfully processed micro-batch %d/%d", k + 1, len(smaller_batches))
+                except Exception as e2:
+                    logger.error("Error processing micro-batch %d: %s", k + 1, e2)
+        return success_count
+
     async def vector_search(
         self, queries: List[str], document_id: str, parent_run_id: str = None
     ) -> VectorResponseSchema:
         """Perform a vector search on the Qdrant collection."""
-        logger.info(f"Retrieving vectors for {len(queries)} queries.")
-
-        final_chunks: List[Dict[str, Any]] = []
+        logger.info("Retrieving vectors for %d queries.", len(queries))
 
-        for query in queries:
-            logger.info("Generating embedding.")
-            embedded_query = await self.get_single_embedding(query, parent_run_id)
-            logger.info("Searching...")
-
-            query_response = self.client.query_points(
-                self.collection_name,
-                query=embedded_query,
-                limit=40,
-                with_payload=True,
-                query_filter=models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="document_id",
-                            match=models.MatchValue(value=document_id),
-                        )
-                    ]
-                ),
-            ).points
+        # One embedding request covers every query
+        logger.info("Generating embeddings.")
+        embedded_queries = await self._embed_queries(queries, parent_run_id)
+        logger.info("Searching...")
 
-            final_chunks.extend(
-                [point.payload for point in query_response if point.payload]
-            )
+        # Every query is searched in a single batch request
+        document_filter = _document_filter(document_id)
+        responses = await self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                models.QueryRequest(
+                    query=embedded_query,
+                    limit=40,
+                    with_payload=True,
+                    filter=document_filter,
+                )
+                for embedded_query in embedded_queries
+            ],
+        )
 
-        seen_chunks, formatted_output = set(), []
+        final_chunks: List[Dict[str, Any]] = [
+            point.payload
+            for response in responses
+            for point in response.points
+            if point.payload
+        ]
 
-        for chunk in final_chunks:
-            if chunk["chunk_number"] not in seen_chunks:
-                seen_chunks.add(chunk["chunk_number"])
-                formatted_output.append(
-                    {"content": chunk["text"], "page": chunk["page_number"]}
-                )
+        # Deduplicate by chunk number, keeping first-seen order
+        unique_chunks = {chunk["chunk_number"]: chunk for chunk in final_chunks}
+        # Payloads are written by prepare_chunks with a str text and an int
+        # page number, so the models are built without validating them again
+        chunks = [
+            Chunk.model_construct(content=chunk["text"], page=chunk["page_number"])
+            for chunk in unique_chunks.values()
+        ]
 
-        logger.info(f"Retrieved {len(formatted_output)} unique chunks.")
-        return VectorResponseSchema(
+        logger.info("Retrieved %d unique chunks.", len(chunks))
+        return VectorResponseSchema.model_construct(
             message="Query processed successfully.",
-            chunks=[Chunk(**chunk) for chunk in formatted_output],
+            chunks=chunks,
         )
 
     async def hybrid_search(
@@ -193,96 +306,121 @@ class QdrantService(VectorDBService):
         """Perform a hybrid search on the Qdrant collection."""
         logger.info("Performing hybrid search.")
 
-        sorted_keyword_chunks = []
-        keywords = await self.extract_keywords(query, rules, self.llm_service)
+        # The keyword and semantic branches don't depend on each other
+        sorted_keyword_chunks, semantic_response = await asyncio.gather(
+            self._keyword_chunks(query, document_id, rules),
+            self._semantic_chunks(query, document_id, parent_run_id),
+        )
 
-        if keywords:
-            like_conditions: Sequence[models.FieldCondition] = [
-                models.FieldCondition(
-                    key="text", match=models.MatchText(text=keyword)
-                )
-                for keyword in keywords
-            ]
-            _filter = models.Filter(
-                must=models.FieldCondition(
-                    key="document_id",
-                    match=models.MatchValue(value=document_id),
-                ),
-                should=like_conditions,  # type: ignore
+        logger.debug("Found %d semantic chunks.", len(semantic_response))
+
+        # Combine the top results from keyword and semantic searches
+        combined_chunks = sorted_keyword_chunks[:20] + semantic_response
+
+        # Eliminate duplicate chunks, then sort the rest by chunk number
+        unique_chunks = {chunk["chunk_number"]: chunk for chunk in combined_chunks}
+        chunks = [
+            Chunk.model_construct(content=chunk["text"], page=chunk["page_number"])
+            for chunk in sorted(
+                unique_chunks.values(), key=lambda chunk: chunk["chunk_number"]
             )
+        ]
 
-            logger.info("Running query with keyword filters.")
-            keyword_response = self.client.query_points(
-                collection_name=self.collection_name,
-                query_filter=_filter,
-                with_payload=True,
-            ).points
-            keyword_response = [
-                point.payload for point in keyword_response if point.payload  # type: ignore
-            ]
-
-            def count_keywords(text: str, keywords: List[str]) -> int:
-                return sum(
-                    text.lower().count(keyword.lower()) for keyword in keywords
-                )
+        logger.info("Retrieved %d unique chunks.", len(chunks))
 
-            sorted_keyword_chunks = sorted(
-                keyword_response,
-                key=lambda chunk: count_keywords(
-                    chunk["text"], keywords or []
-                ),
-                reverse=True,
+        return VectorResponseSchema.model_construct(
+            message="Query processed successfully.",
+            chunks=chunks,
+        )
+
+    async def _embed_queries(
+        self, queries: List[str], parent_run_id: str = None
+    ) -> List[List[float]]:
+        """Get the embeddings of the queries, reusing cached ones.
+
+        Queries missing from the cache are embedded in a single request, and
+        concurrent requests for the same queries share it.
+        """
+        model = self.settings.embedding_model
+        embedded = {}
+        missing = []
+        for query in queries:
+            embedding = QUERY_EMBEDDING_CACHE.get((model, query))
+            if embedding is not None:
+                embedded[query] = embedding
+            elif query not in missing:
+                missing.append(query)
+
+        if missing:
+            embeddings = await _INFLIGHT_EMBEDDINGS.run(
+                (model, tuple(missing)),
+                lambda: self.get_embeddings(missing, parent_run_id),
             )
+            for query, embedding in zip(missing, embeddings):
+                QUERY_EMBEDDING_CACHE[(model, query)] = embedding
+                embedded[query] = embedding
 
-        embedded_query = await self.get_single_embedding(query, parent_run_id)
-        logger.info("Running semantic similarity search.")
+        return [embedded[query] for query in queries]
 
-        semantic_response = self.client.query_points(
-            collection_name=self.collection_name,
-            query=embedded_query,
-            query_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="document_id",
-                        match=models.MatchValue(value=document_id),
-                    )
-                ]
+    async def _keyword_chunks(
+        self, query: str, document_id: str, rules: list[Rule]
+    ) -> List[Dict[str, Any]]:
+        """Get the keyword search chunks, most keyword hits first."""
+        keywords = await self.extract_keywords(query, rules, self.llm_service)
+        if not keywords:
+            return []
+
+        like_conditions: Sequence[models.FieldCondition] = [
+            models.FieldCondition(
+                key="text", match=models.MatchText(text=keyword)
+            )
+            for keyword in keywords
+        ]
+        _filter = models.Filter(
+            must=models.FieldCondition(
+                key="document_id",
+                match=models.MatchValue(value=document_id),
             ),
-            limit=40,
-            with_payload=True,
-        ).points
+            should=like_conditions,  # type: ignore
+        )
 
-        semantic_response = [
-            point.payload for point in semantic_response if point.payload  # type: ignore
+        logger.info("Running query with keyword filters.")
+        keyword_response = (await self.client.query_points(
+            collection_name=self.collection_name,
+            query_filter=_filter,
+            with_payload=True,
+        )).points
+        keyword_response = [
+            point.payload for point in keyword_response if point.payload  # type: ignore
         ]
 
-        print(f"Found {len(semantic_response)} semantic chunks.")
+        # Lowercase the keywords once and each chunk's text once
+        lowered_keywords = [keyword.lower() for keyword in keywords]
 
-        # Combine the top results from keyword and semantic searches
-        combined_chunks = sorted_keyword_chunks[:20] + semantic_response
+        def count_keywords(chunk: Dict[str, Any]) -> int:
+            text = chunk["text"].lower()
+            return sum(text.count(keyword) for keyword in lowered_keywords)
 
-        # Sort the combined results by chunk number
-        combined_sorted_chunks = sorted(
-            combined_chunks, key=lambda chunk: chunk["chunk_number"]
-        )
+        return sorted(keyword_response, key=count_keywords, reverse=True)
 
-        # Eliminate duplicate chunks
-        seen_chunks = set()
-        formatted_output = []
-
-        for chunk in combined_sorted_chunks:
-            if chunk["chunk_number"] not in seen_chunks:
-                formatted_output.append(
-                    {"content": chunk["text"], "page": chunk["page_number"]}
-                )
-                seen_chunks.add(chunk["chunk_number"])
+    async def _semantic_chunks(
+        self, query: str, document_id: str, parent_run_id: str = None
+    ) -> List[Dict[str, Any]]:
+        """Get the semantic similarity search chunks."""
+        (embedded_query,) = await self._embed_queries([query], parent_run_id)
+        logger.info("Running semantic similarity search.")
 
-        logger.info(f"Retrieved {len(formatted_output)} unique chunks.")
+        semantic_response = (await self.client.query_points(
+            collection_name=self.collection_name,
+            query=embedded_query,
+            query_filter=_document_filter(document_id),
+            limit=40,
+            with_payload=True,
+        )).points
 
-        return VectorResponseSchema(
-            message="Query processed successfully.",
-            chunks=[Chunk(**chunk) for chunk in formatted_output],
-        )
+        return [
+            point.payload for point in semantic_response if point.payload  # type: ignore
+        ]
 
     # Decomposition query
     async def decomposed_search(
@@ -312,13 +450,30 @@ class QdrantService(VectorDBService):
 
     async def ensure_collection_exists(self) -> None:
         """Ensure the Qdrant collection exists."""
-        if not self.client.collection_exists(self.collection_name):
-            self.client.create_collection(
+        if not await self.client.collection_exists(self.collection_name):
+            await self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=models.VectorParams(
                     size=self.dimensions, distance=models.Distance.COSINE
                 ),
             )
+            # Full-text index so keyword filters don't scan every payload
+            await self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name="text",
+                field_schema=models.TextIndexParams(
+                    type=models.TextIndexType.TEXT,
+                    tokenizer=models.TokenizerType.WORD,
+                    lowercase=True,
+                ),
+            )
+        # Every search and delete filters on document_id; creating the index
+        # is idempotent, so existing collections get it too
+        await self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="document_id",
+            field_schema=models.PayloadSchemaType.KEYWORD,
+        )
 
     async def get_document_chunks(self, document_id: str, parent_run_id: str = None) -> List[Dict[str, Any]]:
         """Get all chunks for a document from the Qdrant database.
@@ -336,36 +491,30 @@ class QdrantService(VectorDBService):
         try:
             logger.info(f"Retrieving chunks for document_id: {document_id} from Qdrant")
             
-            # Query the collection for all chunks with this document_id
-            scroll_response = self.client.scroll(
-                collection_name=self.collection_name,
-                scroll_filter=models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="document_id",
-                            match=models.MatchValue(value=document_id),
-                        )
-                    ]
-                ),
-                limit=1000,  # Set a high limit to get all chunks
-                with_payload=True,
-            )
-            
-            # The scroll method returns a tuple (records, next_page_offset)
-            # Extract the records from the tuple
-            records = scroll_response[0] if isinstance(scroll_response, tuple) else scroll_response
+            # Page through every chunk with this document_id; scroll offsets
+            # are point IDs, so pages have to be fetched one after another
+            scroll_filter = _document_filter(document_id)
+            records: List[models.Record] = []
+            offset = None
+            while True:
+                page, offset = await self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=scroll_filter,
+                    limit=SCROLL_PAGE_SIZE,
+                    offset=offset,
+                    with_payload=True,
+                )
+                records.extend(page)
+                if offset is None:
+                    break
             
             if not records:
                 logger.warning(f"No chunks found for document_id: {document_id}")
                 return []
             
-            # Convert the records to dictionaries
-            chunks = []
-            for record in records:
-                if hasattr(record, 'payload') and record.payload:
-                    # Create a dictionary with the payload data
-                    chunk_dict = record.payload.copy()
-                    chunks.append(chunk_dict)
+            # The payloads are freshly deserialised and callers only read them,
+            # so they are returned without copying
+            chunks = [record.payload for record in records if record.payload]
             
             logger.info(f"Retrieved {len(chunks)} chunks from Qdrant")
             return chunks
@@ -376,16 +525,9 @@ class QdrantService(VectorDBService):
 
     async def delete_document(self, document_id: str, parent_run_id: str = None) -> Dict[str, str]:
         """Delete a document from a Qdrant collection."""
-        self.client.delete(
+        await self.client.delete(
             collection_name=self.collection_name,
-            points_selector=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="document_id",
-                        match=models.MatchValue(value=document_id),
-                    )
-                ]
-            ),
+            points_selector=_document_filter(document_id),
             wait=True,
         )
         return {
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -48,6 +49,75 @@ async def test_generate_completion_none_response(openai_service):
     openai_service.client.beta.chat.completions.parse = mock_parse
 
 
+@pytest.mark.asyncio
+async def test_generate_completion_runs_concurrently(openai_service):
+    class DummyResponseModel(BaseModel):
+        content: str
+
+    mock_response = MagicMock()
+    mock_response.choices[0].message.parsed = DummyResponseModel(
+        content="Test response"
+    )
+    in_flight = 0
+    max_in_flight = 0
+
+    async def mock_parse(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return mock_response
+
+    openai_service.client.beta.chat.completions.parse = mock_parse
+
+    results = await asyncio.gather(
+        *(
+            openai_service.generate_completion("prompt", DummyResponseModel)
+            for _ in range(3)
+        )
+    )
+
+    assert [result.content for result in results] == ["Test response"] * 3
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_generate_completion_bounds_concurrency(test_settings):
+    class DummyResponseModel(BaseModel):
+        content: str
+
+    service = OpenAICompletionService(
+        test_settings.model_copy(update={"llm_concurrency": 2})
+    )
+    service.client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices[0].message.parsed = DummyResponseModel(
+        content="Test response"
+    )
+    in_flight = 0
+    max_in_flight = 0
+
+    async def mock_parse(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return mock_response
+
+    service.client.beta.chat.completions.parse = mock_parse
+
+    await asyncio.gather(
+        *(
+            service.generate_completion("prompt", DummyResponseModel)
+            for _ in range(5)
+        )
+    )
+
+    assert max_in_flight == 2
+
+
 @pytest.mark.asyncio
 async def test_get_embeddings(openai_service):
     test_texts = ["Test text 1", "Test text 2"]
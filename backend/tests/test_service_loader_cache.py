@@ -0,0 +1,213 @@
+"""Tests for the loader document cache."""
+
+import asyncio
+import time
+
+import pytest
+from langchain.schema import Document as LangchainDocument
+
+from app.services.loaders.cache import (
+    DocumentCache,
+    InflightLoads,
+    cache_stats,
+    close_caches,
+)
+
+
+@pytest.fixture
+def documents():
+    """Create test documents."""
+    return [LangchainDocument(page_content="Test content", metadata={"page": 1})]
+
+
+def test_get_counts_hits_and_misses(documents):
+    cache = DocumentCache("test", maxsize=2, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", documents)
+    assert cache.get("a") == documents
+
+    assert cache.stats() == {"size": 1, "maxsize": 2, "hits": 1, "misses": 1}
+
+
+def test_evicts_least_recently_used(documents):
+    cache = DocumentCache("test", maxsize=2, ttl=60)
+    cache.set("a", documents)
+    cache.set("b", documents)
+
+    # Touch "a" so that "b" becomes the least recently used entry
+    cache.get("a")
+    cache.set("c", documents)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_expire_removes_stale_entries(documents):
+    cache = DocumentCache("test", maxsize=2, ttl=0.01)
+    cache.set("a", documents)
+
+    time.sleep(0.02)
+    cache.expire()
+
+    assert len(cache) == 0
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_set_starts_sweeper(documents):
+    cache = DocumentCache("test", maxsize=2, ttl=60)
+    cache.set("a", documents)
+
+    assert cache._sweeper is not None
+    cache.close()
+    assert cache._sweeper is None
+
+
+@pytest.mark.asyncio
+async def test_no_ttl_never_expires_or_sweeps(documents):
+    cache = DocumentCache("test", maxsize=2, ttl=None)
+    cache.set("a", documents)
+    cache.expire()
+
+    assert cache._sweeper is None
+    assert cache.get("a") == documents
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_and_close_caches(documents):
+    cache = DocumentCache("stats-test", maxsize=2, ttl=60)
+    cache.set("a", documents)
+    cache.get("a")
+    sweeper = cache._sweeper
+
+    assert cache_stats()["stats-test"] == {"size": 1, "maxsize": 2, "hits": 1, "misses": 0}
+
+    close_caches()
+    await asyncio.sleep(0)
+    assert sweeper.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_inflight_loads_are_coalesced(documents):
+    inflight = InflightLoads()
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return documents
+
+    first = asyncio.create_task(inflight.run("a", load))
+    second = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == documents
+    assert await second == documents
+    assert calls == 1
+    assert len(inflight) == 0
+
+
+@pytest.mark.asyncio
+async def test_inflight_load_error_reaches_all_callers():
+    inflight = InflightLoads()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        raise ValueError("load failed")
+
+    first = asyncio.create_task(inflight.run("a", load))
+    second = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(ValueError, match="load failed"):
+        await first
+    with pytest.raises(ValueError, match="load failed"):
+        await second
+    assert len(inflight) == 0
+
+
+@pytest.mark.asyncio
+async def test_inflight_owner_cancel_does_not_cancel_waiters(documents):
+    inflight = InflightLoads()
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return documents
+
+    owner = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+
+    # Cancelling the caller running the load hands it over to the waiter
+    owner.cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == documents
+    assert owner.cancelled()
+    assert calls == 2
+    assert len(inflight) == 0
+
+
+@pytest.mark.asyncio
+async def test_inflight_waiter_cancel_keeps_shared_load(documents):
+    inflight = InflightLoads()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return documents
+
+    owner = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await owner == documents
+    assert waiter.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_inflight_waiter_cancelled_with_owner_does_not_reload(documents):
+    inflight = InflightLoads()
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return documents
+
+    owner = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(inflight.run("a", load))
+    await asyncio.sleep(0)
+
+    # Both are cancelled together, the waiter must not take the load over
+    owner.cancel()
+    waiter.cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert owner.cancelled()
+    assert waiter.cancelled()
+    assert calls == 1
+    assert len(inflight) == 0
@@ -24,10 +24,42 @@ def gpt4o_loader(mock_settings):
     return GPT4OPDFLoader(settings=mock_settings)
 
 
+@pytest.fixture(scope="module")
+def _loader_mocks():
+    """Patch the loader's LangChain classes once for the whole module."""
+    with patch("app.services.loaders.gpt4o_pdf_service.PyMuPDFLoader") as pymupdf_loader, \
+         patch("app.services.loaders.gpt4o_pdf_service.ChatOpenAI") as chat_openai, \
+         patch("app.services.loaders.gpt4o_pdf_service.LLMImageBlobParser") as image_parser:
+        yield pymupdf_loader, chat_openai, image_parser
+
+
+@pytest.fixture
+def loader_mocks(_loader_mocks):
+    """Get the shared LangChain mocks, reset for this test."""
+    for mock in _loader_mocks:
+        mock.reset_mock(return_value=True, side_effect=True)
+    return _loader_mocks
+
+
+@pytest.fixture
+def mock_pymupdf_loader(loader_mocks):
+    """Get the shared PyMuPDFLoader mock."""
+    return loader_mocks[0]
+
+
+@pytest.fixture
+def mock_chat_openai(loader_mocks):
+    """Get the shared ChatOpenAI mock."""
+    return loader_mocks[1]
+
+
+@pytest.fixture
+def mock_image_parser(loader_mocks):
+    """Get the shared LLMImageBlobParser mock."""
+    return loader_mocks[2]
+
+
 @pytest.mark.asyncio
-@patch("langchain_community.document_loaders.PyMuPDFLoader")
-@patch("langchain_openai.ChatOpenAI")
-@patch("langchain_community.document_loaders.parsers.LLMImageBlobParser")
 async def test_load_with_table_extraction(
     mock_image_parser, mock_chat_openai, mock_pymupdf_loader, gpt4o_loader
 ):
@@ -65,9 +97,6 @@ async def test_load_with_table_extraction(
 
 
 @pytest.mark.asyncio
-@patch("langchain_community.document_loaders.PyMuPDFLoader")
-@patch("langchain_openai.ChatOpenAI")
-@patch("langchain_community.document_loaders.parsers.LLMImageBlobParser")
 async def test_load_with_gpt4o_image_extraction(
     mock_image_parser, mock_chat_openai, mock_pymupdf_loader, gpt4o_loader
 ):
@@ -120,7 +149,6 @@ async def test_load_with_gpt4o_image_extraction(
 
 
 @pytest.mark.asyncio
-@patch("langchain_community.document_loaders.PyMuPDFLoader")
 async def test_load_with_standard_pymupdf_fallback(
     mock_pymupdf_loader, gpt4o_loader
 ):
@@ -148,7 +176,6 @@ async def test_load_with_standard_pymupdf_fallback(
 
 
 @pytest.mark.asyncio
-@patch("langchain_community.document_loaders.PyMuPDFLoader")
 async def test_load_with_all_methods_failing(
     mock_pymupdf_loader, gpt4o_loader
 ):
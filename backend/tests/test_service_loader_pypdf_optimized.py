@@ -1,6 +1,7 @@
 """Tests for the optimized PyPDF loader service."""
 
 import os
+import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -15,8 +16,29 @@ def pdf_loader():
     return PDFLoader()
 
 
+@pytest.fixture(scope="module")
+def _parser_mocks():
+    """Patch the PDF parsers once for the whole module."""
+    with patch("app.services.loaders.pypdf_service.pypdf.PdfReader") as pdf_reader, \
+         patch("app.services.loaders.pypdf_service.fitz.open") as fitz_open:
+        yield pdf_reader, fitz_open
+
+
+@pytest.fixture
+def mock_pdf_reader(_parser_mocks):
+    """Get the shared PdfReader mock, reset for this test."""
+    _parser_mocks[0].reset_mock(return_value=True, side_effect=True)
+    return _parser_mocks[0]
+
+
+@pytest.fixture
+def mock_fitz_open(_parser_mocks):
+    """Get the shared fitz.open mock, reset for this test."""
+    _parser_mocks[1].reset_mock(return_value=True, side_effect=True)
+    return _parser_mocks[1]
+
+
 @pytest.mark.asyncio
-@patch("app.services.loaders.pypdf_service.pypdf.PdfReader")
 async def test_load_pdf_optimized(mock_pdf_reader, pdf_loader):
     """Test loading a PDF with optimized PyPDF."""
     # Mock the PDF reader
@@ -34,7 +56,7 @@ async def test_load_pdf_optimized(mock_pdf_reader, pdf_loader):
     # Mock file hash to avoid caching issues
     with patch.object(pdf_loader, "_get_file_hash", return_value="test_hash"):
         # Mock PDF type detection
-        with patch.object(pdf_loader, "_detect_pdf_type", return_value=PDF_TYPE_TEXT):
+        with patch.object(pdf_loader, "_detect_pdf_type", return_value=(PDF_TYPE_TEXT, None)):
             # Call the load method
             result = await pdf_loader.load("test.pdf")
     
@@ -44,6 +66,33 @@ async def test_load_pdf_optimized(mock_pdf_reader, pdf_loader):
     assert result[1].page_content == "Test content page 2"
 
 
+@pytest.mark.asyncio
+async def test_load_pdf_optimized_extracts_pages_serially(mock_pdf_reader, pdf_loader):
+    """Test that pages sharing one reader are never extracted concurrently."""
+    active = []
+    overlaps = []
+
+    def extract_text(page_num):
+        def extract():
+            overlaps.append(bool(active))
+            active.append(page_num)
+            time.sleep(0.001)
+            active.remove(page_num)
+            return f"Test content page {page_num + 1}"
+        return extract
+
+    mock_reader_instance = MagicMock()
+    mock_reader_instance.pages = [
+        MagicMock(extract_text=extract_text(page_num)) for page_num in range(30)
+    ]
+    mock_pdf_reader.return_value = mock_reader_instance
+
+    result = await pdf_loader._load_pdf_optimized("test.pdf")
+
+    assert [doc.metadata["page"] for doc in result] == list(range(1, 31))
+    assert not any(overlaps)
+
+
 @pytest.mark.asyncio
 @patch("app.services.loaders.pypdf_service.partition_pdf")
 async def test_load_with_optimized_unstructured(mock_partition_pdf, pdf_loader):
@@ -62,7 +111,7 @@ async def test_load_with_optimized_unstructured(mock_partition_pdf, pdf_loader):
     # Mock file hash to avoid caching issues
     with patch.object(pdf_loader, "_get_file_hash", return_value="test_hash"):
         # Mock PDF type detection
-        with patch.object(pdf_loader, "_detect_pdf_type", return_value=PDF_TYPE_SCANNED):
+        with patch.object(pdf_loader, "_detect_pdf_type", return_value=(PDF_TYPE_SCANNED, None)):
             # Call the load method
             result = await pdf_loader.load("test.pdf")
     
@@ -81,7 +130,6 @@ async def test_load_with_optimized_unstructured(mock_partition_pdf, pdf_loader):
 
 
 @pytest.mark.asyncio
-@patch("app.services.loaders.pypdf_service.fitz.open")
 async def test_detect_pdf_type_with_pymupdf(mock_fitz_open, pdf_loader):
     """Test detecting PDF type with PyMuPDF."""
     # Mock the fitz.open function
@@ -101,10 +149,43 @@ async def test_detect_pdf_type_with_pymupdf(mock_fitz_open, pdf_loader):
     mock_doc.__len__.return_value = 2
     
     # Call the detect_pdf_type method
-    result = await pdf_loader._detect_pdf_type("test.pdf")
+    with patch("app.services.loaders.pypdf_service.os.path.getsize", return_value=1024):
+        pdf_type, page_texts = await pdf_loader._detect_pdf_type("test.pdf")
     
     # Verify the result
-    assert result == PDF_TYPE_MIXED  # Should be mixed because it has both text and images
+    assert pdf_type == PDF_TYPE_MIXED  # Should be mixed because it has both text and images
+    assert page_texts is None  # Only text PDFs are extracted during detection
+
+
+@pytest.mark.asyncio
+async def test_load_small_text_pdf_skips_pypdf(mock_fitz_open, mock_pdf_reader, pdf_loader):
+    """Test that small text PDFs are extracted during detection."""
+    # Mock the fitz.open function
+    mock_doc = MagicMock()
+    mock_fitz_open.return_value = mock_doc
+    
+    # Mock pages
+    mock_page1 = MagicMock()
+    mock_page1.get_text.return_value = "This is a text page with lots of content " * 10
+    mock_page1.get_images.return_value = []
+    
+    mock_page2 = MagicMock()
+    mock_page2.get_text.return_value = "Second page " * 20
+    mock_page2.get_images.return_value = []
+    
+    mock_doc.__getitem__.side_effect = lambda i: [mock_page1, mock_page2][i]
+    mock_doc.__len__.return_value = 2
+    
+    with patch.object(pdf_loader, "_get_file_hash", return_value="fast_path_hash"):
+        with patch("app.services.loaders.pypdf_service.os.path.getsize", return_value=1024):
+            result = await pdf_loader.load("test.pdf")
+    
+    # Verify the result came from PyMuPDF without a second parse
+    assert len(result) == 2
+    assert result[0].metadata == {"page": 1, "source": "test.pdf"}
+    assert result[1].page_content.startswith("Second page")
+    mock_pdf_reader.assert_not_called()
+    mock_doc.close.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,385 @@
+"""Tests for the simple PDF loader service."""
+
+import asyncio
+import concurrent.futures
+import mmap
+
+import pytest
+import pytest_asyncio
+from unittest.mock import MagicMock, patch
+
+from langchain.schema import Document as LangchainDocument
+
+from app.services.loaders import simple_pdf_service
+from app.services.loaders.simple_pdf_service import (
+    PDF_CACHE,
+    SCANNED_DECISIONS,
+    SimplePDFLoader,
+    _MP_CONTEXT,
+    _strip_graphics_ops,
+    close_pdf_pool,
+)
+
+
+@pytest_asyncio.fixture
+async def simple_pdf_loader():
+    """Create a simple PDF loader for testing."""
+    PDF_CACHE.clear()
+    SCANNED_DECISIONS.clear()
+    yield SimplePDFLoader()
+    # Drop cached documents and stop the cache sweeper
+    PDF_CACHE.clear()
+
+
+@pytest.mark.asyncio
+@patch("app.services.loaders.simple_pdf_service.pypdf.PdfReader")
+@patch("app.services.loaders.simple_pdf_service.fitz.open")
+async def test_load_pdf_with_pymupdf(mock_fitz_open, mock_pdf_reader, simple_pdf_loader):
+    """Test loading a PDF with PyMuPDF."""
+    # Mock the PyMuPDF document
+    mock_doc = MagicMock()
+    mock_doc.page_count = 3
+    mock_fitz_open.return_value = mock_doc
+
+    # Mock pages, including an empty one
+    page_texts = ["Test content for the first page", "   ", "Test content for the third page"]
+    mock_doc.load_page.side_effect = lambda n: MagicMock(
+        get_text=MagicMock(return_value=page_texts[n])
+    )
+
+    result = await simple_pdf_loader.load("test.pdf")
+
+    # Verify the result
+    assert len(result) == 2
+    assert result[0].page_content == "Test content for the first page"
+    assert result[1].metadata == {"page": 3, "source": "test.pdf"}
+    mock_doc.close.assert_called_once()
+    mock_pdf_reader.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.services.loaders.simple_pdf_service.pypdf.PdfReader")
+@patch("app.services.loaders.simple_pdf_service.fitz.open")
+async def test_load_pdf_falls_back_to_pypdf(mock_fitz_open, mock_pdf_reader, simple_pdf_loader, tmp_path):
+    """Test falling back to PyPDF when PyMuPDF fails."""
+    mock_fitz_open.side_effect = RuntimeError("cannot open")
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+
+    # Mock the PDF reader
+    mock_page = MagicMock()
+    mock_page.extract_text.return_value = "PyPDF content of the only page"
+    mock_pdf_reader.return_value.pages = [mock_page]
+
+    result = await simple_pdf_loader.load(str(file_path))
+
+    # Verify the result
+    assert len(result) == 1
+    assert result[0].page_content == "PyPDF content of the only page"
+    # The reader is given a memory map of the file rather than its path
+    assert isinstance(mock_pdf_reader.call_args.args[0], mmap.mmap)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_invalidated_when_file_changes(simple_pdf_loader, tmp_path):
+    """Test that a cached PDF is reused until the file on disk changes."""
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 first")
+
+    async def fake_load_pdf_optimized(path):
+        return [LangchainDocument(page_content=file_path.read_text(), metadata={"page": 1})]
+
+    with patch.object(
+        simple_pdf_loader, "_load_pdf_optimized", side_effect=fake_load_pdf_optimized
+    ) as mock_load:
+        first = await simple_pdf_loader.load(str(file_path))
+        cached = await simple_pdf_loader.load(str(file_path))
+        file_path.write_bytes(b"%PDF-1.4 second version")
+        changed = await simple_pdf_loader.load(str(file_path))
+
+    assert cached == first
+    assert changed[0].page_content == "%PDF-1.4 second version"
+    assert mock_load.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced(simple_pdf_loader):
+    """Test that concurrent loads of the same PDF parse it only once."""
+    documents = [LangchainDocument(page_content="Test content", metadata={"page": 1})]
+    release = asyncio.Event()
+    calls = 0
+
+    async def fake_load_pdf_optimized(file_path):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return documents
+
+    with patch.object(simple_pdf_loader, "_load_pdf_optimized", side_effect=fake_load_pdf_optimized):
+        tasks = [asyncio.create_task(simple_pdf_loader.load("test.pdf")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+    assert results == [documents] * 3
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+@patch("app.services.loaders.simple_pdf_service.UNSTRUCTURED_AVAILABLE", True)
+@patch("app.services.loaders.simple_pdf_service.os.stat")
+@patch("app.services.loaders.simple_pdf_service.fitz.open")
+async def test_scanned_pdf_skips_text_extraction(mock_fitz_open, mock_stat, simple_pdf_loader):
+    """Test that scanned PDFs go straight to Unstructured and the decision is reused."""
+    mock_stat.return_value = MagicMock(st_size=1024, st_mtime_ns=1)
+    mock_doc = MagicMock()
+    mock_doc.page_count = 10
+    mock_doc.load_page.return_value.get_text.return_value = " "
+    mock_fitz_open.return_value = mock_doc
+    unstructured_docs = [MagicMock()]
+
+    with patch.object(
+        simple_pdf_loader, "_load_with_unstructured", return_value=unstructured_docs
+    ) as mock_unstructured:
+        first = await simple_pdf_loader._load_pdf_optimized("scan.pdf")
+        second = await simple_pdf_loader._load_pdf_optimized("scan.pdf")
+
+    assert first == second == unstructured_docs
+    assert mock_unstructured.call_count == 2
+    # Only the first, middle and last pages were sampled, and only once
+    mock_fitz_open.assert_called_once_with("scan.pdf")
+    assert [c.args[0] for c in mock_doc.load_page.call_args_list] == [0, 5, 9]
+
+
+@pytest.mark.asyncio
+@patch("app.services.loaders.simple_pdf_service.UNSTRUCTURED_AVAILABLE", True)
+@patch("app.services.loaders.simple_pdf_service.fitz.open")
+async def test_text_pdf_reuses_sampled_pages(mock_fitz_open, simple_pdf_loader):
+    """Test that sampling a text PDF costs no extra open or page extraction."""
+    mock_doc = MagicMock()
+    mock_doc.page_count = 4
+    mock_doc.load_page.side_effect = lambda n: MagicMock(
+        get_text=MagicMock(return_value=f"Text content of page {n}")
+    )
+    mock_fitz_open.return_value = mock_doc
+
+    result = await simple_pdf_loader._load_pdf_optimized("test.pdf")
+
+    assert [doc.metadata["page"] for doc in result] == [1, 2, 3, 4]
+    mock_fitz_open.assert_called_once()
+    assert mock_doc.load_page.call_count == 4
+
+
+@pytest.mark.asyncio
+@patch("app.services.loaders.simple_pdf_service.STREAM_BATCH_PAGES", 2)
+@patch("app.services.loaders.simple_pdf_service.fitz.open")
+async def test_load_stream_yields_pages_and_caches(mock_fitz_open, simple_pdf_loader, tmp_path):
+    """Test that streamed pages arrive in order and the result is cached."""
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    mock_doc = MagicMock()
+    mock_doc.page_count = 5
+    mock_doc.load_page.side_effect = lambda n: MagicMock(
+        get_text=MagicMock(return_value=f"Text content of page {n}")
+    )
+    mock_fitz_open.return_value = mock_doc
+
+    streamed = [doc async for doc in simple_pdf_loader.load_stream(str(file_path))]
+    cached = await simple_pdf_loader.load(str(file_path))
+
+    assert [doc.metadata["page"] for doc in streamed] == [1, 2, 3, 4, 5]
+    assert cached == streamed
+    mock_fitz_open.assert_called_once()
+    mock_doc.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.services.loaders.simple_pdf_service.UNSTRUCTURED_AVAILABLE", True)
+@patch("app.services.loaders.simple_pdf_service.fitz.open")
+async def test_load_stream_sends_scanned_pdfs_to_unstructured(mock_fitz_open, simple_pdf_loader, tmp_path):
+    """Test that a scanned PDF found while streaming is loaded with Unstructured."""
+    file_path = tmp_path / "scan.pdf"
+    file_path.write_bytes(b"%PDF-1.4 scan")
+    mock_doc = MagicMock()
+    mock_doc.page_count = 10
+    mock_doc.load_page.return_value.get_text.return_value = " "
+    mock_fitz_open.return_value = mock_doc
+    unstructured_docs = [LangchainDocument(page_content="OCR content", metadata={"page": 1})]
+
+    with patch.object(
+        simple_pdf_loader, "_load_with_unstructured", return_value=unstructured_docs
+    ):
+        streamed = [doc async for doc in simple_pdf_loader.load_stream(str(file_path))]
+
+    assert streamed == unstructured_docs
+    # The scanned decision made while streaming is reused, the PDF isn't reopened
+    mock_fitz_open.assert_called_once()
+    mock_doc.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.services.loaders.simple_pdf_service.fitz.open")
+async def test_load_stream_closes_document_when_abandoned(mock_fitz_open, simple_pdf_loader, tmp_path):
+    """Test that the document is closed when the consumer stops early."""
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    mock_doc = MagicMock()
+    mock_doc.page_count = 20
+    mock_doc.load_page.side_effect = lambda n: MagicMock(
+        get_text=MagicMock(return_value=f"Text content of page {n}")
+    )
+    mock_fitz_open.return_value = mock_doc
+
+    stream = simple_pdf_loader.load_stream(str(file_path))
+    first = await stream.__anext__()
+    await stream.aclose()
+
+    assert first.metadata["page"] == 1
+    mock_doc.close.assert_called_once()
+    # A partial result is never cached
+    assert len(PDF_CACHE) == 0
+
+
+def test_strip_graphics_ops_keeps_text_objects():
+    """Test that graphics operators are removed outside text objects only."""
+    stream = (
+        b"q 0.5 0.5 0.5 rg\n10 10 m 20 20 l 30 30 40 40 50 50 c S\n"
+        b"10 10 100 100 re f*\n"
+        b"BT /F1 12 Tf 10 10 Td (draw 1 2 re f) Tj ET\nQ"
+    )
+
+    result = _strip_graphics_ops(stream)
+
+    assert b" rg" not in result
+    assert b" re f*" not in result
+    assert b"BT /F1 12 Tf 10 10 Td (draw 1 2 re f) Tj ET" in result
+    assert result.startswith(b"q ") and result.endswith(b"Q")
+
+
+def test_strip_graphics_ops_keeps_inline_images():
+    """Test that inline image data is never matched as operators."""
+    image = b"BI /W 2 /H 2 /BPC 8 /CS /G ID\n0 0 m 1 1 l S f\nEI"
+    stream = b"q 10 10 m 20 20 l S\n" + image + b"\nQ"
+
+    result = _strip_graphics_ops(stream)
+
+    assert image in result
+    assert b"10 10 m" not in result
+
+
+def test_strip_graphics_ops_ignores_operators_in_strings():
+    """Test that operator-like text inside string literals is left alone."""
+    text = b"BT /F1 12 Tf (Smith ET al wrote 5 m and c of it) Tj ET"
+    nested = b"(a (b (5 m) c) \\) 1 2 re f) Tj"
+    stream = b"q " + text + b" 10 10 m 20 20 l S " + nested + b" <3520ET6D> Tj Q"
+
+    result = _strip_graphics_ops(stream)
+
+    assert text in result
+    assert nested in result
+    assert b"<3520ET6D> Tj" in result
+    assert b"10 10 m" not in result
+
+
+def test_strip_graphics_ops_removes_name_operands():
+    """Test that operators are removed together with name operands."""
+    stream = b"/Pattern cs /P1 scn 0 0 10 10 re f /Span <</MCID 0>> BDC EMC"
+
+    result = _strip_graphics_ops(stream)
+
+    assert result.split() == b"/Pattern cs /Span <</MCID 0>> BDC EMC".split()
+
+
+def test_strip_page_graphics_skips_small_pages(simple_pdf_loader):
+    """Test that small pages are gated on stream length without being decoded."""
+    mock_doc = MagicMock()
+    mock_doc.xref_get_key.return_value = ("int", "1024")
+    mock_page = MagicMock()
+    mock_page.get_contents.return_value = [5]
+
+    simple_pdf_loader._strip_page_graphics(mock_doc, mock_page, 0)
+
+    mock_page.read_contents.assert_not_called()
+    mock_doc.update_stream.assert_not_called()
+
+
+def test_strip_page_graphics_rewrites_large_pages(simple_pdf_loader):
+    """Test that oversized pages are stripped and merged into one stream."""
+    mock_doc = MagicMock()
+    mock_doc.xref_get_key.side_effect = [("int", "50000"), ("xref", "9 0 R")]
+    mock_doc.xref_stream_raw.return_value = b"x" * 20000
+    mock_page = MagicMock()
+    mock_page.get_contents.return_value = [5, 6]
+    mock_page.read_contents.return_value = b"10 10 m 20 20 l S\nBT (text) Tj ET"
+
+    simple_pdf_loader._strip_page_graphics(mock_doc, mock_page, 0)
+
+    mock_doc.xref_stream_raw.assert_called_once_with(6)
+    xref, stripped = mock_doc.update_stream.call_args.args
+    assert xref == 5
+    assert stripped.strip() == b"BT (text) Tj ET"
+    mock_page.set_contents.assert_called_once_with(5)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "num_pages, expected_workers",
+    [(10, 4), (2, 2)],
+)
+@patch("app.services.loaders.simple_pdf_service._available_cpus", return_value=4)
+async def test_extract_pages_in_processes_interleaves_pages(
+    mock_available_cpus, num_pages, expected_workers, simple_pdf_loader
+):
+    """Test that large PDFs are split into one interleaved page set per worker."""
+    calls = []
+
+    def fake_extract_file_pages(file_path, offset, step):
+        calls.append((offset, step))
+        return [(page_num, f"Page {page_num}") for page_num in range(offset, num_pages, step)]
+
+    with concurrent.futures.ThreadPoolExecutor() as pool:
+        with patch("app.services.loaders.simple_pdf_service._get_pdf_pool", return_value=pool), \
+             patch(
+                 "app.services.loaders.simple_pdf_service._count_file_pages",
+                 return_value=num_pages,
+             ) as mock_count, \
+             patch(
+                 "app.services.loaders.simple_pdf_service._extract_file_pages",
+                 side_effect=fake_extract_file_pages,
+             ):
+            result = await simple_pdf_loader._extract_pages_in_processes("test.pdf", True)
+
+    # The scanned check runs once, before fanning out to at most one worker per page
+    mock_count.assert_called_once_with("test.pdf", True)
+    assert calls == [(offset, expected_workers) for offset in range(expected_workers)]
+    assert [page_num for page_num, _ in result] == list(range(num_pages))
+
+
+@pytest.mark.asyncio
+async def test_extract_pages_in_processes_skips_scanned(simple_pdf_loader):
+    """Test that scanned PDFs aren't extracted by any worker."""
+    with concurrent.futures.ThreadPoolExecutor() as pool:
+        with patch("app.services.loaders.simple_pdf_service._get_pdf_pool", return_value=pool), \
+             patch(
+                 "app.services.loaders.simple_pdf_service._count_file_pages",
+                 return_value=None,
+             ), \
+             patch("app.services.loaders.simple_pdf_service._extract_file_pages") as mock_extract:
+            result = await simple_pdf_loader._extract_pages_in_processes("test.pdf", True)
+
+    assert result is None
+    mock_extract.assert_not_called()
+
+
+def test_close_pdf_pool():
+    """Test that the pool is shut down and recreated on next use."""
+    pool = MagicMock()
+    with patch("app.services.loaders.simple_pdf_service._PDF_POOL", pool):
+        close_pdf_pool()
+        pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        assert simple_pdf_service._PDF_POOL is None
+
+
+def test_pdf_pool_does_not_fork():
+    """Test that pool workers aren't forked from the multithreaded server."""
+    assert _MP_CONTEXT.get_start_method() in ("forkserver", "spawn")
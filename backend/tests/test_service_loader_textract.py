@@ -1,18 +1,32 @@
 """Test the TextractLoader service with S3 integration."""
 
+import asyncio
+import hashlib
 import os
+import threading
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+import pytest_asyncio
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
+from botocore.exceptions import ClientError
 from langchain.schema import Document as LangchainDocument
 
-from app.core.config import Settings
-from app.services.loaders.textract_service import TextractLoader
+from app.core.config import Settings, get_settings
+from app.services.loaders import textract_service
+from app.services.loaders.textract_service import (
+    HASH_CACHE,
+    TEXTRACT_CACHE,
+    TextractLoader,
+    UPLOAD_TRANSFER_CONFIG,
+    _make_s3_client,
+    _make_textract_client,
+    _make_transfer_manager,
+)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def settings():
-    """Create a settings object for testing."""
+    """Create a settings object shared by the module; copy it to change it."""
     return Settings(
         aws_region="us-east-1",
         aws_access_key_id="test-key",
@@ -23,12 +37,26 @@ def settings():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def textract_loader(settings):
-    """Create a TextractLoader instance for testing."""
+    """Create a TextractLoader shared by the module; it holds no per-file state."""
     return TextractLoader(settings=settings)
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def reset_textract_state():
+    """Reset the process-wide caches around each test."""
+    # Shared clients are cached per process, reset them so mocks apply
+    _make_s3_client.cache_clear()
+    _make_textract_client.cache_clear()
+    _make_transfer_manager.cache_clear()
+    TEXTRACT_CACHE.clear()
+    HASH_CACHE.clear()
+    yield
+    # Drop cached documents and stop the cache sweeper
+    TEXTRACT_CACHE.clear()
+
+
 @pytest.mark.asyncio
 async def test_load_unsupported_file_type(textract_loader):
     """Test loading an unsupported file type."""
@@ -37,12 +65,13 @@ async def test_load_unsupported_file_type(textract_loader):
 
 
 @pytest.mark.asyncio
-@patch("app.services.loaders.textract_service.TextractLoader._upload_to_s3")
-@patch("app.services.loaders.textract_service.TextractLoader._process_with_textract_s3")
-async def test_load_pdf_with_textract(mock_process_with_textract_s3, mock_upload_to_s3, textract_loader):
+async def test_load_pdf_with_textract(textract_loader, mocker):
     """Test loading a PDF file with Textract using S3."""
     # Setup mocks
-    mock_upload_to_s3.return_value = "test-documents/test-uuid/test.pdf"
+    mocker.patch.object(TextractLoader, "_get_file_hash", return_value="test_hash")
+    mock_upload_to_s3 = mocker.patch.object(
+        TextractLoader, "_upload_to_s3", return_value="test-documents/test-uuid/test.pdf"
+    )
     
     # Mock the process_with_textract_s3 method to return documents
     mock_documents = [
@@ -51,14 +80,16 @@ async def test_load_pdf_with_textract(mock_process_with_textract_s3, mock_upload
             metadata={"source": "test.pdf", "page": 1}
         )
     ]
-    mock_process_with_textract_s3.return_value = mock_documents
+    mock_process_with_textract_s3 = mocker.patch.object(
+        TextractLoader, "_process_with_textract_s3", return_value=mock_documents
+    )
     
     # Call the method
     result = await textract_loader.load("test.pdf")
     
     # Assertions
     assert result == mock_documents
-    mock_upload_to_s3.assert_called_once_with("test.pdf")
+    mock_upload_to_s3.assert_called_once_with("test.pdf", content_hash=None)
     mock_process_with_textract_s3.assert_called_once_with(
         "test-documents/test-uuid/test.pdf", 
         "test.pdf"
@@ -66,58 +97,144 @@ async def test_load_pdf_with_textract(mock_process_with_textract_s3, mock_upload
 
 
 @pytest.mark.asyncio
-@patch("app.services.loaders.textract_service.boto3.client")
-@patch("app.services.loaders.textract_service.asyncio.get_event_loop")
-async def test_upload_to_s3(mock_get_event_loop, mock_boto3_client, textract_loader):
+async def test_upload_to_s3(textract_loader, tmp_path, mocker):
     """Test uploading a file to S3."""
     # Setup mocks
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
+    mock_create_transfer_manager = mocker.patch.object(textract_service, "create_transfer_manager")
     mock_s3_client = MagicMock()
     mock_boto3_client.return_value = mock_s3_client
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    mock_transfer_manager = mock_create_transfer_manager.return_value
+    upload_threads = []
     
-    mock_loop = MagicMock()
-    mock_get_event_loop.return_value = mock_loop
-    mock_loop.run_in_executor.return_value = None
+    def record_upload_thread(*args):
+        upload_threads.append(threading.current_thread().name.rsplit("_", 1)[0])
+        return mock_transfer_manager.upload.return_value
     
-    # Call the method
-    with patch("app.services.loaders.textract_service.uuid.uuid4", return_value="test-uuid"):
-        s3_key = await textract_loader._upload_to_s3("test.pdf")
+    mock_transfer_manager.upload.side_effect = record_upload_thread
+    
+    # Call the method twice
+    with patch("app.services.loaders.textract_service.os.getpid", return_value=0xabc), \
+         patch("app.services.loaders.textract_service.time.time_ns", return_value=0x123):
+        s3_key = await textract_loader._upload_to_s3(str(file_path))
+        second_key = await textract_loader._upload_to_s3(str(file_path))
     
     # Assertions
-    assert s3_key == "test-documents/test-uuid/test.pdf"
+    assert s3_key.startswith("test-documents/abc-123-")
+    assert s3_key.endswith("/test.pdf")
+    assert second_key != s3_key
+    # Without a content hash there is nothing to look up
+    mock_s3_client.head_object.assert_not_called()
     mock_boto3_client.assert_called_once_with(
         "s3",
         region_name="us-east-1",
         aws_access_key_id="test-key",
         aws_secret_access_key="test-secret",
-        aws_session_token="test-session-token"
+        aws_session_token="test-session-token",
+        config=ANY
+    )
+    # The transfer manager is created once and reused for every upload
+    mock_create_transfer_manager.assert_called_once_with(mock_s3_client, UPLOAD_TRANSFER_CONFIG)
+    assert UPLOAD_TRANSFER_CONFIG.max_concurrency == get_settings().s3_max_concurrency
+    assert UPLOAD_TRANSFER_CONFIG.multipart_threshold == get_settings().s3_multipart_threshold
+    # The upload runs on the shared S3/Textract thread pool
+    assert upload_threads == ["textract-io"] * 2
+    mock_transfer_manager.upload.assert_called_with(str(file_path), "test-bucket", second_key)
+    assert mock_transfer_manager.upload.return_value.result.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_upload_to_s3_skips_existing_object(textract_loader, tmp_path, mocker):
+    """Test that a file already stored under its content key isn't uploaded again."""
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
+    mock_create_transfer_manager = mocker.patch.object(textract_service, "create_transfer_manager")
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    mock_boto3_client.return_value.head_object.return_value = {"ContentLength": file_path.stat().st_size}
+    
+    s3_key = await textract_loader._upload_to_s3(str(file_path), content_hash="abc123")
+    
+    assert s3_key == "test-documents/abc123/test.pdf"
+    mock_boto3_client.return_value.head_object.assert_called_once_with(Bucket="test-bucket", Key=s3_key)
+    mock_create_transfer_manager.return_value.upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_reuses_content_hash_only_when_configured(settings, tmp_path):
+    """Test that uploads are keyed by content only when it is hashed anyway."""
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"not a pdf")
+    documents = [LangchainDocument(page_content="Test content", metadata={"page": 1})]
+    hashing_loader = TextractLoader(settings=settings.model_copy(update={"textract_content_hash": True}))
+    
+    with patch.object(TextractLoader, "_upload_to_s3", return_value="test-key") as mock_upload_to_s3, \
+         patch.object(TextractLoader, "_process_with_textract_s3", return_value=documents), \
+         patch.object(TextractLoader, "_get_content_hash", wraps=hashing_loader._get_content_hash) as mock_hash:
+        await TextractLoader(settings=settings).load(str(file_path))
+        mock_hash.assert_not_called()
+        await hashing_loader.load(str(file_path))
+    
+    content_hash = await hashing_loader._get_content_hash(str(file_path))
+    assert mock_upload_to_s3.call_args_list[0].kwargs == {"content_hash": None}
+    assert mock_upload_to_s3.call_args_list[1].kwargs == {"content_hash": content_hash}
+    # A file that can't be hashed gets a unique key, never a path-based one
+    assert await hashing_loader._get_known_content_hash(str(tmp_path / "missing.pdf")) is None
+
+
+@pytest.mark.asyncio
+async def test_upload_to_s3_errors(textract_loader, tmp_path, mocker):
+    """Test that upload failures on the I/O thread reach the caller."""
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
+    mock_create_transfer_manager = mocker.patch.object(textract_service, "create_transfer_manager")
+    mock_boto3_client.return_value.head_object.side_effect = ClientError(
+        {"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject"
     )
-    mock_loop.run_in_executor.assert_called_once()
+    mock_upload_result = mock_create_transfer_manager.return_value.upload.return_value.result
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    
+    mock_upload_result.side_effect = Exception("Test error")
+    with pytest.raises(Exception, match="Test error"):
+        await textract_loader._upload_to_s3(str(file_path))
+    
+    # Expired credentials are reported with a code the caller can handle
+    mock_upload_result.side_effect = Exception("ExpiredToken: The security token has expired")
+    with pytest.raises(ValueError, match="AWS_CREDENTIALS_EXPIRED"):
+        await textract_loader._upload_to_s3(str(file_path))
 
 
 @pytest.mark.asyncio
-@patch("app.services.loaders.textract_service.boto3.client")
-@patch("app.services.loaders.textract_service.AmazonTextractPDFLoader")
-@patch("app.services.loaders.textract_service.asyncio.get_event_loop")
-async def test_process_with_textract_s3(mock_get_event_loop, mock_textract_loader, mock_boto3_client, textract_loader):
-    """Test processing a document with Textract using S3."""
+async def test_process_with_textract_s3(textract_loader, mocker):
+    """Test processing a document with an asynchronous Textract job."""
     # Setup mocks
+    mocker.patch.object(textract_service, "TEXTRACT_POLL_INITIAL_DELAY", 0)
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
     mock_textract_client = MagicMock()
     mock_boto3_client.return_value = mock_textract_client
+    mock_textract_client.start_document_text_detection.return_value = {"JobId": "test-job"}
     
-    mock_loader_instance = MagicMock()
-    mock_textract_loader.return_value = mock_loader_instance
-    
-    mock_loop = MagicMock()
-    mock_get_event_loop.return_value = mock_loop
-    
-    # Mock the load method to return documents
-    mock_documents = [
-        LangchainDocument(
-            page_content="Test content",
-            metadata={"source": "s3://test-bucket/test-documents/test-uuid/test.pdf", "page": 1}
-        )
+    # The job is polled until it succeeds, then results are paginated
+    mock_textract_client.get_document_text_detection.side_effect = [
+        {"JobStatus": "IN_PROGRESS"},
+        {
+            "JobStatus": "SUCCEEDED",
+            "NextToken": "next",
+            "Blocks": [
+                {"BlockType": "PAGE", "Page": 1},
+                {"BlockType": "LINE", "Page": 1, "Text": "Test content"},
+            ],
+        },
+        {
+            "JobStatus": "SUCCEEDED",
+            "Blocks": [
+                {"BlockType": "LINE", "Page": 1, "Text": "More content"},
+                {"BlockType": "WORD", "Page": 2, "Text": "Page"},
+                {"BlockType": "LINE", "Page": 2, "Text": "Page two"},
+            ],
+        },
     ]
-    mock_loop.run_in_executor.return_value = mock_documents
     
     # Call the method
     result = await textract_loader._process_with_textract_s3(
@@ -126,31 +243,63 @@ async def test_process_with_textract_s3(mock_get_event_loop, mock_textract_loade
     )
     
     # Assertions
-    assert len(result) == 1
-    assert result[0].page_content == "Test content"
-    assert result[0].metadata["source"] == "test.pdf"  # Should be updated to original path
-    assert result[0].metadata["page"] == 1
+    assert len(result) == 2
+    assert result[0].page_content == "Test content\nMore content"
+    assert result[0].metadata == {"source": "test.pdf", "page": 1}
+    assert result[1].page_content == "Page two"
+    assert result[1].metadata == {"source": "test.pdf", "page": 2}
     
     mock_boto3_client.assert_called_once_with(
         "textract",
         region_name="us-east-1",
         aws_access_key_id="test-key",
         aws_secret_access_key="test-secret",
-        aws_session_token="test-session-token"
+        aws_session_token="test-session-token",
+        config=ANY
+    )
+    mock_textract_client.start_document_text_detection.assert_called_once_with(
+        DocumentLocation={
+            "S3Object": {"Bucket": "test-bucket", "Name": "test-documents/test-uuid/test.pdf"}
+        }
     )
-    mock_textract_loader.assert_called_once_with(
-        "s3://test-bucket/test-documents/test-uuid/test.pdf",
-        client=mock_textract_client
+    assert mock_textract_client.get_document_text_detection.call_args.kwargs == {
+        "JobId": "test-job",
+        "MaxResults": 1000,
+        "NextToken": "next",
+    }
+
+
+@pytest.mark.asyncio
+async def test_process_with_textract_s3_job_failed(textract_loader, mocker):
+    """Test that a failed Textract job produces an error document."""
+    mocker.patch.object(textract_service, "TEXTRACT_POLL_INITIAL_DELAY", 0)
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
+    mock_textract_client = MagicMock()
+    mock_boto3_client.return_value = mock_textract_client
+    mock_textract_client.start_document_text_detection.return_value = {"JobId": "test-job"}
+    mock_textract_client.get_document_text_detection.return_value = {
+        "JobStatus": "FAILED",
+        "StatusMessage": "Unsupported document",
+    }
+    
+    result = await textract_loader._process_with_textract_s3(
+        "test-documents/test-uuid/test.pdf", 
+        "test.pdf"
     )
+    
+    assert len(result) == 1
+    assert "Error processing document with Textract" in result[0].page_content
+    assert "Unsupported document" in result[0].metadata["error"]
 
 
 @pytest.mark.asyncio
-@patch("app.services.loaders.textract_service.TextractLoader._upload_to_s3")
-@patch("app.services.loaders.textract_service.TextractLoader._process_with_textract_s3")
-async def test_load_pdf_with_cache(mock_process_with_textract_s3, mock_upload_to_s3, textract_loader):
+async def test_load_pdf_with_cache(textract_loader, mocker):
     """Test loading a PDF file with cache."""
     # Setup mocks
-    mock_upload_to_s3.return_value = "test-documents/test-uuid/test.pdf"
+    mocker.patch.object(TextractLoader, "_get_file_hash", return_value="test_hash")
+    mock_upload_to_s3 = mocker.patch.object(
+        TextractLoader, "_upload_to_s3", return_value="test-documents/test-uuid/test.pdf"
+    )
     
     # Mock the process_with_textract_s3 method to return documents
     mock_documents = [
@@ -159,7 +308,9 @@ async def test_load_pdf_with_cache(mock_process_with_textract_s3, mock_upload_to
             metadata={"source": "test.pdf", "page": 1}
         )
     ]
-    mock_process_with_textract_s3.return_value = mock_documents
+    mock_process_with_textract_s3 = mocker.patch.object(
+        TextractLoader, "_process_with_textract_s3", return_value=mock_documents
+    )
     
     # Call the method twice
     result1 = await textract_loader.load("test.pdf")
@@ -174,23 +325,131 @@ async def test_load_pdf_with_cache(mock_process_with_textract_s3, mock_upload_to
 
 
 @pytest.mark.asyncio
-@patch("app.services.loaders.textract_service.boto3.client")
-@patch("app.services.loaders.textract_service.AmazonTextractPDFLoader")
-@patch("app.services.loaders.textract_service.asyncio.get_event_loop")
-async def test_process_with_textract_s3_empty_result(mock_get_event_loop, mock_textract_loader, mock_boto3_client, textract_loader):
-    """Test processing a document with Textract using S3 with empty result."""
-    # Setup mocks
+async def test_load_pdf_cache_misses_after_file_changes(textract_loader, tmp_path, mocker):
+    """Test that rewriting a file at the same path is processed again."""
+    mocker.patch.object(TextractLoader, "_upload_to_s3", return_value="test-key")
+    mock_process_with_textract_s3 = mocker.patch.object(
+        TextractLoader,
+        "_process_with_textract_s3",
+        return_value=[LangchainDocument(page_content="Test content", metadata={"page": 1})],
+    )
+    file_path = tmp_path / "test.pdf"
+    
+    file_path.write_bytes(b"%PDF-1.4 first")
+    await textract_loader.load(str(file_path))
+    await textract_loader.load(str(file_path))
+    file_path.write_bytes(b"%PDF-1.4 second version")
+    await textract_loader.load(str(file_path))
+    
+    assert mock_process_with_textract_s3.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_load_small_image_skips_s3(textract_loader, tmp_path, mocker):
+    """Test that small single-page files are sent to Textract inline."""
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
+    mock_upload_to_s3 = mocker.patch.object(TextractLoader, "_upload_to_s3")
     mock_textract_client = MagicMock()
     mock_boto3_client.return_value = mock_textract_client
+    mock_textract_client.detect_document_text.return_value = {
+        "Blocks": [{"BlockType": "LINE", "Page": 1, "Text": "Inline content"}],
+    }
+    file_path = tmp_path / "scan.png"
+    file_path.write_bytes(b"\x89PNG test")
+    
+    result = await textract_loader.load(str(file_path))
+    
+    assert [document.page_content for document in result] == ["Inline content"]
+    assert result[0].metadata == {"source": str(file_path), "page": 1}
+    mock_textract_client.detect_document_text.assert_called_once_with(
+        Document={"Bytes": b"\x89PNG test"}
+    )
+    mock_upload_to_s3.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_can_process_inline_checks_pdf_pages(textract_loader, tmp_path):
+    """Test that only single-page PDFs are sent to Textract inline."""
+    fitz = pytest.importorskip("fitz")
+    paths = []
+    for page_count in (1, 2):
+        doc = fitz.open()
+        for _ in range(page_count):
+            doc.new_page()
+        path = tmp_path / f"{page_count}-pages.pdf"
+        doc.save(str(path))
+        doc.close()
+        paths.append(str(path))
+    
+    assert await textract_loader._can_process_inline(paths[0]) is True
+    assert await textract_loader._can_process_inline(paths[1]) is False
+    assert await textract_loader._can_process_inline(str(tmp_path / "missing.pdf")) is False
+
+
+@pytest.mark.asyncio
+async def test_persisted_results_survive_restart(settings, tmp_path):
+    """Test that a new loader reuses Textract results persisted on disk."""
+    settings = settings.model_copy(update={"textract_cache_db_uri": str(tmp_path / "textract_cache.db")})
+    file_path = tmp_path / "test.pdf"
+    # Not a readable PDF, so it goes through S3
+    file_path.write_bytes(b"not a pdf")
+    documents = [LangchainDocument(page_content="Test content", metadata={"page": 1})]
+    
+    with patch.object(TextractLoader, "_upload_to_s3", return_value="test-documents/test.pdf"), \
+         patch.object(
+             TextractLoader, "_process_with_textract_s3", return_value=documents
+         ) as mock_process_with_textract_s3:
+        first = await TextractLoader(settings=settings).load(str(file_path))
+        # A restart loses the in-memory caches
+        TEXTRACT_CACHE.clear()
+        HASH_CACHE.clear()
+        second = await TextractLoader(settings=settings).load(str(file_path))
+    
+    assert first == second == documents
+    mock_process_with_textract_s3.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_partial_results_are_not_persisted(settings, tmp_path, mocker):
+    """Test that a partially successful Textract job is flagged and not persisted."""
+    settings = settings.model_copy(update={"textract_cache_db_uri": str(tmp_path / "textract_cache.db")})
+    mocker.patch.object(textract_service, "TEXTRACT_POLL_INITIAL_DELAY", 0)
+    mocker.patch.object(TextractLoader, "_upload_to_s3", return_value="test-documents/test.pdf")
+    mock_textract_client = mocker.patch.object(textract_service.boto3, "client").return_value
+    mock_textract_client.start_document_text_detection.return_value = {"JobId": "test-job"}
+    mock_textract_client.get_document_text_detection.return_value = {
+        "JobStatus": "PARTIAL_SUCCESS",
+        "StatusMessage": "Some pages failed",
+        "Blocks": [{"BlockType": "LINE", "Page": 1, "Text": "Test content"}],
+    }
+    file_path = tmp_path / "test.pdf"
+    # Not a readable PDF, so it goes through S3
+    file_path.write_bytes(b"not a pdf")
     
-    mock_loader_instance = MagicMock()
-    mock_textract_loader.return_value = mock_loader_instance
+    first = await TextractLoader(settings=settings).load(str(file_path))
+    # A restart loses the in-memory caches
+    TEXTRACT_CACHE.clear()
+    HASH_CACHE.clear()
+    await TextractLoader(settings=settings).load(str(file_path))
     
-    mock_loop = MagicMock()
-    mock_get_event_loop.return_value = mock_loop
+    assert first[0].metadata == {"source": str(file_path), "page": 1, "partial": True}
+    assert mock_textract_client.start_document_text_detection.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_process_with_textract_s3_empty_result(textract_loader, mocker):
+    """Test processing a document with Textract using S3 with empty result."""
+    # Setup mocks
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
+    mock_textract_client = MagicMock()
+    mock_boto3_client.return_value = mock_textract_client
+    mock_textract_client.start_document_text_detection.return_value = {"JobId": "test-job"}
     
-    # Mock the load method to return an empty list
-    mock_loop.run_in_executor.return_value = []
+    # Mock a successful job without any text
+    mock_textract_client.get_document_text_detection.return_value = {
+        "JobStatus": "SUCCEEDED",
+        "Blocks": [{"BlockType": "PAGE", "Page": 1}],
+    }
     
     # Call the method
     result = await textract_loader._process_with_textract_s3(
@@ -206,23 +465,15 @@ async def test_process_with_textract_s3_empty_result(mock_get_event_loop, mock_t
 
 
 @pytest.mark.asyncio
-@patch("app.services.loaders.textract_service.boto3.client")
-@patch("app.services.loaders.textract_service.AmazonTextractPDFLoader")
-@patch("app.services.loaders.textract_service.asyncio.get_event_loop")
-async def test_process_with_textract_s3_exception(mock_get_event_loop, mock_textract_loader, mock_boto3_client, textract_loader):
+async def test_process_with_textract_s3_exception(textract_loader, mocker):
     """Test processing a document with Textract using S3 with exception."""
     # Setup mocks
+    mock_boto3_client = mocker.patch.object(textract_service.boto3, "client")
     mock_textract_client = MagicMock()
     mock_boto3_client.return_value = mock_textract_client
     
-    mock_loader_instance = MagicMock()
-    mock_textract_loader.return_value = mock_loader_instance
-    
-    mock_loop = MagicMock()
-    mock_get_event_loop.return_value = mock_loop
-    
-    # Mock the load method to raise an exception
-    mock_loop.run_in_executor.side_effect = Exception("Test error")
+    # Mock the job start to raise an exception
+    mock_textract_client.start_document_text_detection.side_effect = Exception("Test error")
     
     # Call the method
     result = await textract_loader._process_with_textract_s3(
@@ -236,3 +487,168 @@ async def test_process_with_textract_s3_exception(mock_get_event_loop, mock_text
     assert result[0].metadata["source"] == "test.pdf"
     assert result[0].metadata["page"] == 1
     assert result[0].metadata["error"] == "Test error"
+
+
+@pytest.mark.asyncio
+async def test_get_file_hash_uses_stat(textract_loader, tmp_path):
+    """Test that the cache key comes from stat metadata without reading the file."""
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    st = os.stat(file_path)
+    
+    with patch.object(textract_loader, "_get_content_hash") as mock_content_hash:
+        file_hash = await textract_loader._get_file_hash(str(file_path))
+    
+    assert file_hash == f"{st.st_dev}-{st.st_ino}-{st.st_size}-{st.st_mtime_ns}"
+    mock_content_hash.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_file_hash_content_hash_enabled(settings, tmp_path):
+    """Test that content hashing uses BLAKE3 when configured."""
+    blake3 = pytest.importorskip("blake3")
+    textract_loader = TextractLoader(settings=settings.model_copy(update={"textract_content_hash": True}))
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    
+    first_hash = await textract_loader._get_file_hash(str(file_path))
+    second_hash = await textract_loader._get_file_hash(str(file_path))
+    
+    assert first_hash == second_hash
+    assert first_hash == blake3.blake3(b"%PDF-1.4 test").hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_get_content_hash_falls_back_to_sha256(textract_loader, tmp_path, mocker):
+    """Test that content hashing falls back to SHA-256 without BLAKE3."""
+    mocker.patch.object(textract_service, "BLAKE3_AVAILABLE", False)
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    
+    file_hash = await textract_loader._get_content_hash(str(file_path))
+    
+    assert file_hash == hashlib.sha256(b"%PDF-1.4 test").hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_get_content_hash_is_remembered_until_file_changes(textract_loader, tmp_path, mocker):
+    """Test that an unchanged file is hashed only once."""
+    mocker.patch.object(textract_service, "BLAKE3_AVAILABLE", False)
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+    
+    with patch("builtins.open", wraps=open) as mock_open:
+        first_hash = await textract_loader._get_content_hash(str(file_path))
+        second_hash = await textract_loader._get_content_hash(str(file_path))
+        file_path.write_bytes(b"%PDF-1.4 changed")
+        changed_hash = await textract_loader._get_content_hash(str(file_path))
+    
+    assert first_hash == second_hash
+    assert changed_hash == hashlib.sha256(b"%PDF-1.4 changed").hexdigest()
+    # Only the first and the changed file were read
+    assert mock_open.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced(textract_loader):
+    """Test that concurrent loads of the same file call Textract only once."""
+    documents = [LangchainDocument(page_content="Test content", metadata={"page": 1})]
+    release = asyncio.Event()
+    
+    async def fake_process_with_textract_s3(s3_key, file_path):
+        await release.wait()
+        return documents
+    
+    with patch.object(textract_loader, "_get_file_hash", AsyncMock(return_value="test_hash")), \
+         patch.object(textract_loader, "_upload_to_s3", AsyncMock(return_value="test-key")) as mock_upload, \
+         patch.object(
+             textract_loader, "_process_with_textract_s3", side_effect=fake_process_with_textract_s3
+         ):
+        tasks = [asyncio.create_task(textract_loader.load("test.pdf")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+    
+    assert results == [documents] * 3
+    mock_upload.assert_called_once_with("test.pdf", content_hash=None)
+
+
+@pytest.mark.asyncio
+async def test_load_many_loads_files_concurrently(textract_loader):
+    """Test that load_many overlaps loads up to the concurrency limit."""
+    started = []
+    both_started = asyncio.Event()
+    
+    async def fake_upload_to_s3(file_path, content_hash=None):
+        started.append(file_path)
+        if len(started) == 2:
+            both_started.set()
+        # Only returns once the second upload has started alongside it
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+        return f"test-documents/{file_path}"
+    
+    async def fake_process_with_textract_s3(s3_key, file_path):
+        return [LangchainDocument(page_content=file_path, metadata={"page": 1})]
+    
+    with patch.object(textract_loader, "_get_file_hash", side_effect=lambda path: path), \
+         patch.object(textract_loader, "_upload_to_s3", side_effect=fake_upload_to_s3), \
+         patch.object(
+             textract_loader, "_process_with_textract_s3", side_effect=fake_process_with_textract_s3
+         ):
+        results = await textract_loader.load_many(["a.pdf", "b.pdf", "c.pdf"], max_concurrency=2)
+    
+    assert [result[0].page_content for result in results] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert started[:2] == ["a.pdf", "b.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_load_many_uploads_while_earlier_files_are_extracted(textract_loader):
+    """Test that uploads overlap Textract jobs of earlier files."""
+    events = []
+    last_upload_started = asyncio.Event()
+    
+    async def fake_upload_to_s3(file_path, content_hash=None):
+        events.append(("upload", file_path))
+        if file_path == "c.pdf":
+            last_upload_started.set()
+        return f"test-documents/{file_path}"
+    
+    async def fake_process_with_textract_s3(s3_key, file_path):
+        events.append(("textract", file_path))
+        # The first job only finishes once every file has been uploaded
+        if file_path == "a.pdf":
+            await asyncio.wait_for(last_upload_started.wait(), timeout=1)
+        return [LangchainDocument(page_content=file_path, metadata={"page": 1})]
+    
+    with patch.object(textract_loader, "_get_file_hash", side_effect=lambda path: path), \
+         patch.object(textract_loader, "_upload_to_s3", side_effect=fake_upload_to_s3), \
+         patch.object(
+             textract_loader, "_process_with_textract_s3", side_effect=fake_process_with_textract_s3
+         ):
+        results = await textract_loader.load_many(["a.pdf", "b.pdf", "c.pdf"], max_concurrency=1)
+    
+    assert [result[0].page_content for result in results] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert events.index(("textract", "a.pdf")) < events.index(("upload", "c.pdf"))
+    assert events[-2:] == [("textract", "b.pdf"), ("textract", "c.pdf")]
+
+def test_clients_are_shared(textract_loader):
+    """Test that boto3 clients are created once and shared."""
+    with patch("app.services.loaders.textract_service.boto3.client") as mock_boto3_client:
+        first = textract_loader._get_s3_client()
+        second = textract_loader._get_s3_client()
+    
+    assert first is second
+    mock_boto3_client.assert_called_once()
+
+
+def test_clients_keep_enough_pooled_connections(textract_loader):
+    """Test that clients pool a connection for every I/O thread."""
+    with patch("app.services.loaders.textract_service.boto3.client") as mock_boto3_client:
+        textract_loader._get_s3_client()
+        textract_loader._get_textract_client()
+    
+    for call in mock_boto3_client.call_args_list:
+        config = call.kwargs["config"]
+        assert config.max_pool_connections >= max(50, 2 * get_settings().s3_max_concurrency)
+        assert config.tcp_keepalive is True
+    assert mock_boto3_client.call_args_list[1].kwargs["config"].retries["mode"] == "adaptive"
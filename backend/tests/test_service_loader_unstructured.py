@@ -0,0 +1,122 @@
+"""Tests for the Unstructured loader service."""
+
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from langchain.schema import Document as LangchainDocument
+
+from app.core.config import Settings
+from app.services.loaders.unstructured_service import UnstructuredLoader
+
+
+@pytest.fixture
+def unstructured_loader():
+    """Create an Unstructured loader for testing."""
+    with patch("app.services.loaders.unstructured_service.UNSTRUCTURED_AVAILABLE", True):
+        yield UnstructuredLoader(settings=MagicMock(spec=Settings))
+
+
+def _fake_loader_class(results):
+    """Create a fake UnstructuredPDFLoader returning a result per mode."""
+    def fake_loader(file_path, **config):
+        result = results[config.get("mode", "default")]
+        loader = MagicMock()
+        if isinstance(result, Exception):
+            loader.load.side_effect = result
+        else:
+            loader.load.side_effect = result if callable(result) else lambda: result
+        return loader
+    return fake_loader
+
+
+@pytest.mark.asyncio
+async def test_load_returns_first_non_empty_config(unstructured_loader):
+    """Test that failing and empty configurations are skipped."""
+    documents = [LangchainDocument(page_content="Paged content", metadata={"page": 1})]
+    results = {
+        "default": RuntimeError("default failed"),
+        "elements": [],
+        "paged": documents,
+    }
+
+    with patch(
+        "app.services.loaders.unstructured_service.UnstructuredPDFLoader",
+        side_effect=_fake_loader_class(results),
+    ):
+        result = await unstructured_loader.load("test.pdf")
+
+    assert result == documents
+
+
+@pytest.mark.asyncio
+async def test_load_prefers_earlier_configs(unstructured_loader):
+    """Test that a slower preferred configuration wins over a faster one."""
+    documents = [LangchainDocument(page_content="Default content", metadata={})]
+    release = threading.Event()
+
+    def slow_load():
+        release.wait(5)
+        return documents
+
+    def fast_load():
+        release.set()
+        return [LangchainDocument(page_content="Element", metadata={"page": 1})]
+
+    results = {"default": slow_load, "elements": fast_load, "paged": []}
+
+    try:
+        with patch(
+            "app.services.loaders.unstructured_service.UnstructuredPDFLoader",
+            side_effect=_fake_loader_class(results),
+        ):
+            result = await unstructured_loader.load("test.pdf")
+    finally:
+        release.set()
+
+    assert result == documents
+
+
+@pytest.mark.asyncio
+async def test_load_runs_configs_concurrently(unstructured_loader):
+    """Test that later configurations run while earlier ones are still failing."""
+    documents = [LangchainDocument(page_content="Paged content", metadata={"page": 1})]
+    paged_started = threading.Event()
+
+    def failing_load():
+        # Only fails once the paged configuration is already running
+        if not paged_started.wait(5):
+            return [LangchainDocument(page_content="Not concurrent", metadata={})]
+        raise RuntimeError("default failed")
+
+    def paged_load():
+        paged_started.set()
+        return documents
+
+    results = {"default": failing_load, "elements": [], "paged": paged_load}
+
+    try:
+        with patch(
+            "app.services.loaders.unstructured_service.UnstructuredPDFLoader",
+            side_effect=_fake_loader_class(results),
+        ):
+            result = await unstructured_loader.load("test.pdf")
+    finally:
+        paged_started.set()
+
+    assert result == documents
+
+
+@pytest.mark.asyncio
+async def test_load_all_configs_empty(unstructured_loader):
+    """Test that an empty list is returned when every configuration fails."""
+    results = {"default": [], "elements": [], "paged": RuntimeError("paged failed")}
+
+    with patch(
+        "app.services.loaders.unstructured_service.UnstructuredPDFLoader",
+        side_effect=_fake_loader_class(results),
+    ):
+        result = await unstructured_loader.load("test.pdf")
+
+    assert result == []
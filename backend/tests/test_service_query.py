@@ -1,17 +1,36 @@
+import asyncio
 from unittest.mock import patch
 
 import pytest
 
-from app.models.query_core import Chunk
+from app.models.query_core import Chunk, Rule
 from app.schemas.query_api import QueryResult, VectorResponseSchema
 from app.services.query_service import (
+    QUERY_RESULT_CACHE,
+    _build_replacements,
+    _compile_keyword_regex,
+    _join_chunk_contents,
+    _merged_replacements,
+    clear_document_results,
     decomposition_query,
     hybrid_query,
+    inference_query,
+    iter_queries_as_completed,
+    process_queries_in_parallel,
     process_query,
+    process_query_with_retry,
+    replace_keywords,
     simple_vector_query,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_query_cache():
+    QUERY_RESULT_CACHE.clear()
+    yield
+    QUERY_RESULT_CACHE.clear()
+
+
 @pytest.mark.asyncio
 async def test_process_query_decomposition(
     mock_vector_db_service, mock_llm_service
@@ -202,3 +221,581 @@ async def test_simple_vector_query(mock_llm_service, mock_vector_db_service):
             mock_llm_service,
             mock_vector_db_service,
         )
+
+
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_replace_keywords_prefers_longest_keyword(use_automaton):
+    if use_automaton:
+        pytest.importorskip("ahocorasick")
+    replacements = {"New": "Old", "New York": "NYC"}
+
+    with patch(
+        "app.services.query_service.AHOCORASICK_AVAILABLE", use_automaton
+    ):
+        result, transformations = replace_keywords(
+            "New York is New", replacements
+        )
+
+    assert result == "NYC is Old"
+    assert transformations == {"original": "New York is New", "resolved": "NYC is Old"}
+
+
+@patch("app.services.query_service.AHOCORASICK_AVAILABLE", False)
+def test_replace_keywords_reuses_compiled_regex():
+    _compile_keyword_regex.cache_clear()
+
+    replace_keywords(["a cat", "a dog"], {"cat": "feline", "dog": "canine"})
+    replace_keywords("the dog", {"dog": "canine", "cat": "feline"})
+
+    info = _compile_keyword_regex.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_replace_keywords_list_items_stay_separate(use_automaton):
+    if use_automaton:
+        pytest.importorskip("ahocorasick")
+    replacements = {"ms": "multiple sclerosis", "a b": "ab"}
+    texts = ["ms", "a", "b", "ms\x1ems", ""]
+
+    with patch(
+        "app.services.query_service.AHOCORASICK_AVAILABLE", use_automaton
+    ):
+        joined_result, _ = replace_keywords(texts[:3], replacements)
+        separate_result, _ = replace_keywords(texts, replacements)
+
+    assert joined_result == ["multiple sclerosis", "a", "b"]
+    assert separate_result == [
+        "multiple sclerosis",
+        "a",
+        "b",
+        "multiple sclerosis\x1emultiple sclerosis",
+        "",
+    ]
+
+
+def test_replace_keywords_returns_unchanged_list_as_is():
+    texts = ["no", "keywords", "here"]
+
+    result, transformations = replace_keywords(texts, {"ms": "multiple sclerosis"})
+
+    assert result is texts
+    assert transformations == {"original": texts, "resolved": texts}
+
+
+def test_replace_keywords_automaton_matches_regex():
+    pytest.importorskip("ahocorasick")
+    replacements = {
+        "cat": "feline",
+        "cats": "felines",
+        "at": "@",
+        "C++": "cpp",
+        "a b": "ab",
+        "_x": "y",
+    }
+    texts = [
+        "cat cats concat at-at",
+        "a cat, a b c and C++ or C++x",
+        "_x x_x _x_ (cat)",
+        "no keywords here",
+    ]
+
+    with patch("app.services.query_service.AHOCORASICK_AVAILABLE", True):
+        automaton_result, _ = replace_keywords(texts, replacements)
+    with patch("app.services.query_service.AHOCORASICK_AVAILABLE", False):
+        regex_result, _ = replace_keywords(texts, replacements)
+
+    assert automaton_result == regex_result
+
+
+@pytest.mark.asyncio
+async def test_process_query_resolves_entities(
+    mock_vector_db_service, mock_llm_service
+):
+    rules = [
+        Rule(type="resolve_entity", options=["ms:multiple sclerosis"]),
+        Rule(type="resolve_entity", options=["bad:option:format"]),
+    ]
+    with patch(
+        "app.services.query_service.generate_response"
+    ) as mock_generate_response:
+        mock_vector_db_service.hybrid_search.return_value = {
+            "chunks": [Chunk(content="The patient has ms.", page=1)]
+        }
+        mock_generate_response.return_value = {"answer": ["ms", "als"]}
+
+        result = await process_query(
+            "hybrid",
+            "test query",
+            "doc_id",
+            rules,
+            "str_array",
+            mock_llm_service,
+            mock_vector_db_service,
+        )
+
+    assert result.answer == ["multiple sclerosis", "als"]
+    assert result.resolved_entities[0].original == ["ms", "als"]
+
+
+@pytest.mark.asyncio
+async def test_process_query_caps_returned_chunks(
+    mock_vector_db_service, mock_llm_service
+):
+    chunks = [Chunk(content=f"Chunk {i}", page=i) for i in range(15)]
+    with patch(
+        "app.services.query_service.generate_response"
+    ) as mock_generate_response:
+        mock_vector_db_service.hybrid_search.return_value = {"chunks": chunks}
+        mock_generate_response.return_value = {"answer": "Test answer"}
+
+        result = await process_query(
+            "hybrid",
+            "test query",
+            "doc_id",
+            [],
+            "str",
+            mock_llm_service,
+            mock_vector_db_service,
+        )
+
+    assert result.chunks == chunks[:10]
+    # The LLM still sees every retrieved chunk
+    context = mock_generate_response.call_args.args[2]
+    assert context.endswith("Chunk 14")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "raw_answer",
+    ['["ms", "als"]', "['ms', 'als']", "[ms, als]"],
+)
+async def test_inference_query_parses_array_answers(
+    mock_llm_service, raw_answer
+):
+    with patch(
+        "app.services.query_service.generate_inferred_response"
+    ) as mock_generate_inferred_response:
+        mock_generate_inferred_response.return_value = {"answer": raw_answer}
+
+        result = await inference_query(
+            "which diseases", [], "str_array", mock_llm_service
+        )
+
+    assert result.answer == ["ms", "als"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, expected", [("List the INJURIES", []), ("count of visits", [0])]
+)
+async def test_inference_query_int_array_fallback(
+    mock_llm_service, query, expected
+):
+    with patch(
+        "app.services.query_service.generate_inferred_response"
+    ) as mock_generate_inferred_response:
+        mock_generate_inferred_response.return_value = {"answer": "[a, b]"}
+
+        result = await inference_query(
+            query, [], "int_array", mock_llm_service
+        )
+
+    assert result.answer == expected
+
+
+def test_rule_options_are_parsed_once():
+    rule = Rule(type="resolve_entity", options=["ms:multiple sclerosis"])
+
+    assert rule.parsed_options == {"ms": "multiple sclerosis"}
+    assert rule.parsed_options is rule.parsed_options
+    assert rule == Rule(type="resolve_entity", options=["ms:multiple sclerosis"])
+
+
+def test_build_replacements_is_cached_across_rule_objects():
+    _merged_replacements.cache_clear()
+
+    def rules():
+        return [
+            Rule(type="resolve_entity", options=["ms:multiple sclerosis"]),
+            Rule(type="must_return", options=["ignored"]),
+            Rule(type="resolve_entity", options=["ra:rheumatoid arthritis", "bad"]),
+        ]
+
+    first = _build_replacements(rules())
+    second = _build_replacements(rules())
+
+    assert first == {"ms": "multiple sclerosis"}
+    assert second is first
+    assert _merged_replacements.cache_info().hits == 1
+
+
+def test_rule_parsed_options_rejects_option_without_separator():
+    rule = Rule(type="resolve_entity", options=["ms:multiple sclerosis", "ms"])
+
+    with pytest.raises(ValueError):
+        rule.parsed_options
+
+
+def test_rule_parsed_options_keeps_colons_in_replacement():
+    rule = Rule(type="resolve_entity", options=["noon:12:00"])
+
+    assert rule.parsed_options == {"noon": "12:00"}
+
+
+@patch("app.services.query_service.AHOCORASICK_AVAILABLE", False)
+def test_replace_keywords_skips_text_without_keyword_initials():
+    _compile_keyword_regex.cache_clear()
+
+    result, _ = replace_keywords(
+        "not found", {"MS": "Multiple Sclerosis", "RA": "Rheumatoid Arthritis"}
+    )
+
+    assert result == "not found"
+    assert _compile_keyword_regex.cache_info().currsize == 0
+
+
+@patch("app.services.query_service.AHOCORASICK_AVAILABLE", False)
+def test_replace_keywords_skips_text_without_single_keyword():
+    _compile_keyword_regex.cache_clear()
+
+    result, _ = replace_keywords("Massachusetts", {"MS": "Multiple Sclerosis"})
+
+    assert result == "Massachusetts"
+    assert _compile_keyword_regex.cache_info().currsize == 0
+
+
+@pytest.mark.asyncio
+async def test_process_queries_in_parallel_bounds_concurrency(
+    mock_llm_service, mock_vector_db_service
+):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_process_query(query_type, query, *args):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return QueryResult(answer=query, chunks=[])
+
+    queries = [
+        {
+            "query_type": "hybrid",
+            "query": f"query {i}",
+            "document_id": "doc_id",
+            "rules": [],
+            "format": "str",
+        }
+        for i in range(12)
+    ]
+    with patch(
+        "app.services.query_service.QUERY_SEMAPHORE", asyncio.Semaphore(3)
+    ), patch(
+        "app.services.query_service.process_query",
+        side_effect=fake_process_query,
+    ):
+        results = await process_queries_in_parallel(
+            queries, mock_llm_service, mock_vector_db_service
+        )
+
+    assert [result.answer for result in results] == [
+        q["query"] for q in queries
+    ]
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_process_queries_in_parallel_runs_duplicates_once(
+    mock_llm_service, mock_vector_db_service
+):
+    async def fake_process_query(query_type, query, *args):
+        await asyncio.sleep(0.001)
+        return QueryResult(answer=query, chunks=[])
+
+    queries = [
+        {
+            "query_type": "hybrid",
+            "query": query,
+            "document_id": "doc_id",
+            "rules": [Rule(type="must_return", options=["a"])],
+            "format": "str",
+        }
+        for query in ["first", "second", "first", "first"]
+    ]
+    with patch(
+        "app.services.query_service.process_query",
+        side_effect=fake_process_query,
+    ) as mock_process_query:
+        results = await process_queries_in_parallel(
+            queries, mock_llm_service, mock_vector_db_service
+        )
+        assert mock_process_query.call_count == 2
+
+        # Repeats after the batch are served from the cache
+        await process_queries_in_parallel(
+            queries[:1], mock_llm_service, mock_vector_db_service
+        )
+        assert mock_process_query.call_count == 2
+
+    assert [result.answer for result in results] == [
+        "first", "second", "first", "first"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_process_query_with_retry_does_not_cache_failures(
+    mock_llm_service, mock_vector_db_service
+):
+    args = (
+        "hybrid", "query", "doc_id", [], "str",
+        mock_llm_service, mock_vector_db_service,
+    )
+    with patch(
+        "app.services.query_service.process_query",
+        side_effect=[Exception("boom"), QueryResult(answer="ok", chunks=[])],
+    ) as mock_process_query:
+        failed = await process_query_with_retry(*args, retries=0)
+        result = await process_query_with_retry(*args, retries=0)
+
+    assert failed.answer == ""
+    assert result.answer == "ok"
+    assert mock_process_query.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_process_query_with_retry_does_not_cache_missing_answers(
+    mock_llm_service, mock_vector_db_service
+):
+    args = (
+        "hybrid", "query", "doc_id", [], "str",
+        mock_llm_service, mock_vector_db_service,
+    )
+    # A failed LLM call or an empty search both come back without an answer
+    with patch(
+        "app.services.query_service.process_query",
+        side_effect=[
+            QueryResult(answer=None, chunks=[]),
+            QueryResult(answer="ok", chunks=[]),
+        ],
+    ) as mock_process_query:
+        missing = await process_query_with_retry(*args, retries=0)
+        result = await process_query_with_retry(*args, retries=0)
+
+    assert missing.answer is None
+    assert result.answer == "ok"
+    assert mock_process_query.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_clear_document_results(mock_llm_service, mock_vector_db_service):
+    def args(document_id):
+        return (
+            "hybrid", "query", document_id, [], "str",
+            mock_llm_service, mock_vector_db_service,
+        )
+
+    release = asyncio.Event()
+
+    async def fake_process_query(query_type, query, document_id, *args):
+        if document_id == "slow_doc":
+            await release.wait()
+        return QueryResult(answer=document_id, chunks=[])
+
+    with patch(
+        "app.services.query_service.process_query",
+        side_effect=fake_process_query,
+    ) as mock_process_query:
+        await process_query_with_retry(*args("doc_id"))
+        await process_query_with_retry(*args("other_doc"))
+        running = asyncio.create_task(process_query_with_retry(*args("slow_doc")))
+        await asyncio.sleep(0)
+
+        clear_document_results("doc_id")
+        release.set()
+        await running
+        assert mock_process_query.call_count == 3
+
+        # The cleared document runs again, the other one is still cached
+        await process_query_with_retry(*args("doc_id"))
+        await process_query_with_retry(*args("other_doc"))
+        assert mock_process_query.call_count == 4
+
+        # A result that was running during the clear wasn't cached
+        await process_query_with_retry(*args("slow_doc"))
+        assert mock_process_query.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_inference_query_resolves_long_arrays_in_thread(mock_llm_service):
+    items = [f"MS case {i}" for i in range(100)]
+    rules = [Rule(type="resolve_entity", options=["MS:Multiple Sclerosis"])]
+
+    with patch(
+        "app.services.query_service.generate_inferred_response",
+        return_value={"answer": items},
+    ), patch(
+        "app.services.query_service.asyncio.to_thread", wraps=asyncio.to_thread
+    ) as mock_to_thread:
+        result = await inference_query("query", rules, "str_array", mock_llm_service)
+
+    mock_to_thread.assert_called_once()
+    assert result.answer == [f"Multiple Sclerosis case {i}" for i in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_iter_queries_as_completed_yields_in_completion_order(
+    mock_llm_service, mock_vector_db_service
+):
+    delays = {"slow": 0.02, "fast": 0.0, "failing": 0.01}
+
+    async def fake_process_query(query_type, query, *args):
+        await asyncio.sleep(delays[query])
+        if query == "failing":
+            raise ValueError("boom")
+        return QueryResult(answer=query, chunks=[])
+
+    queries = [
+        {
+            "query_type": "hybrid",
+            "query": query,
+            "document_id": "doc_id",
+            "rules": [],
+            "format": "str_array",
+        }
+        for query in delays
+    ]
+    with patch(
+        "app.services.query_service.process_query_with_retry",
+        side_effect=fake_process_query,
+    ):
+        completed = [
+            (index, result.answer)
+            async for index, result in iter_queries_as_completed(
+                queries, mock_llm_service, mock_vector_db_service
+            )
+        ]
+
+    assert completed == [(1, "fast"), (2, []), (0, "slow")]
+
+
+def test_join_chunk_contents_stops_at_char_budget():
+    chunks = [Chunk(content=content, page=1) for content in ["aaaa", "bbbb", "cccc"]]
+
+    assert _join_chunk_contents(chunks, 100) == "aaaa bbbb cccc"
+    assert _join_chunk_contents(chunks, 10) == "aaaa bbbb"
+    # The top chunk is kept even if it alone exceeds the budget
+    assert _join_chunk_contents(chunks, 2) == "aaaa"
+
+
+@pytest.mark.asyncio
+async def test_process_query_with_retry_does_not_retry_programming_errors(
+    mock_llm_service, mock_vector_db_service
+):
+    with patch(
+        "app.services.query_service.process_query",
+        side_effect=TypeError("bad argument"),
+    ) as mock_process_query, patch(
+        "app.services.query_service.asyncio.sleep"
+    ) as mock_sleep:
+        result = await process_query_with_retry(
+            "hybrid", "query", "doc_id", [], "int",
+            mock_llm_service, mock_vector_db_service,
+        )
+
+    assert result.answer == 0
+    mock_process_query.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_query_with_retry_backs_off_with_capped_jitter(
+    mock_llm_service, mock_vector_db_service
+):
+    with patch(
+        "app.services.query_service.process_query",
+        side_effect=[
+            ConnectionError("down"),
+            ConnectionError("down"),
+            QueryResult(answer="ok", chunks=[]),
+        ],
+    ), patch(
+        "app.services.query_service.asyncio.sleep"
+    ) as mock_sleep:
+        result = await process_query_with_retry(
+            "hybrid", "query", "doc_id", [], "str",
+            mock_llm_service, mock_vector_db_service,
+        )
+
+    assert result.answer == "ok"
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert len(delays) == 2
+    assert all(1.0 <= delay <= 5.0 for delay in delays)
+
+
+@pytest.mark.asyncio
+async def test_iter_queries_as_completed_limits_live_tasks(
+    mock_llm_service, mock_vector_db_service
+):
+    started = 0
+    max_started = 0
+
+    async def fake_process_query(query_type, query, *args):
+        nonlocal started, max_started
+        started += 1
+        max_started = max(max_started, started)
+        await asyncio.sleep(0.001)
+        started -= 1
+        return QueryResult(answer=query, chunks=[])
+
+    queries = [
+        {
+            "query_type": "simple_vector" if i % 2 else "hybrid",
+            "query": f"query {i}",
+            "document_id": "doc_id",
+            "rules": [],
+            "format": "str",
+        }
+        for i in range(20)
+    ]
+    with patch("app.services.query_service.MAX_CONCURRENT_QUERIES", 2), patch(
+        "app.services.query_service.process_query_with_retry",
+        side_effect=fake_process_query,
+    ):
+        results = dict(
+            [
+                item
+                async for item in iter_queries_as_completed(
+                    queries, mock_llm_service, mock_vector_db_service
+                )
+            ]
+        )
+
+    assert max_started == 4
+    assert {i: result.answer for i, result in results.items()} == {
+        i: f"query {i}" for i in range(20)
+    }
+
+
+@pytest.mark.asyncio
+async def test_process_query_skips_llm_without_chunks(
+    mock_vector_db_service, mock_llm_service
+):
+    with patch(
+        "app.services.query_service.generate_response"
+    ) as mock_generate_response:
+        mock_vector_db_service.hybrid_search.return_value = {"chunks": []}
+
+        result = await process_query(
+            "hybrid",
+            "test query",
+            "doc_id",
+            [],
+            "str",
+            mock_llm_service,
+            mock_vector_db_service,
+        )
+
+    assert result == QueryResult(answer=None, chunks=[])
+    mock_generate_response.assert_not_called()
@@ -1,15 +1,17 @@
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from qdrant_client import models
 
 from app.schemas.query_api import VectorResponseSchema
-from app.services.vector_db.qdrant_service import QdrantService
+from app.services.vector_db.qdrant_service import QUERY_EMBEDDING_CACHE, QdrantService
 
 
 @pytest.fixture
 def mock_qdrant_client():
-    with patch("app.services.vector_db.qdrant_service.QdrantClient") as mock:
-        client = Mock()
+    with patch("app.services.vector_db.qdrant_service.AsyncQdrantClient") as mock:
+        client = AsyncMock()
         # Set up mock responses
         client.collection_exists.return_value = True
         client.upsert.return_value = None
@@ -27,6 +29,9 @@ def mock_qdrant_client():
             )
         ]
         client.query_points.return_value = response_mock
+        client.query_batch_points.side_effect = lambda collection_name, requests: [
+            response_mock for _ in requests
+        ]
 
         client.delete.return_value = None
         mock.return_value = client
@@ -47,6 +52,8 @@ def qdrant_service(
     )
     # Override the client with our mock
     service.client = mock_qdrant_client
+    QdrantService._collection_ready.clear()
+    QUERY_EMBEDDING_CACHE.clear()
     return service
 
 
@@ -54,6 +61,41 @@ def qdrant_service(
 async def test_ensure_collection_exists(qdrant_service):
     await qdrant_service.ensure_collection_exists()
     assert qdrant_service.client.collection_exists.called
+    assert not qdrant_service.client.create_collection.called
+    # The document_id index is ensured on existing collections too
+    qdrant_service.client.create_payload_index.assert_called_once_with(
+        collection_name=qdrant_service.collection_name,
+        field_name="document_id",
+        field_schema=models.PayloadSchemaType.KEYWORD,
+    )
+
+
+@pytest.mark.asyncio
+async def test_ensure_collection_exists_creates_text_index(qdrant_service):
+    qdrant_service.client.collection_exists.return_value = False
+
+    await qdrant_service.ensure_collection_exists()
+
+    assert qdrant_service.client.create_collection.called
+    indexed_fields = [
+        call.kwargs["field_name"] for call in qdrant_service.client.create_payload_index.call_args_list
+    ]
+    assert indexed_fields == ["text", "document_id"]
+
+
+@pytest.mark.asyncio
+async def test_keyword_chunks_ranked_by_hits(qdrant_service):
+    keyword_response = Mock()
+    keyword_response.points = [
+        Mock(payload={"text": text, "page_number": 1, "chunk_number": number, "document_id": "test_doc"})
+        for number, text in enumerate(["one Foo", "foo FOO bar", "Bar"], start=10)
+    ]
+    qdrant_service.client.query_points.return_value = keyword_response
+
+    with patch.object(qdrant_service, "extract_keywords", return_value=["foo", "Bar"]):
+        chunks = await qdrant_service._keyword_chunks("test query", "test_doc", [])
+
+    assert [chunk["chunk_number"] for chunk in chunks] == [11, 10, 12]
 
 
 @pytest.mark.asyncio
@@ -73,6 +115,125 @@ async def test_upsert_vectors(qdrant_service):
 
     assert "message" in result
     assert qdrant_service.client.upsert.called
+    batch = qdrant_service.client.upsert.call_args.kwargs["points"]
+    assert batch.ids == ["1"]
+    assert batch.vectors == [[0.1, 0.2]]
+    assert batch.payloads == [{"text": "test", "page_number": 1, "chunk_number": 1, "document_id": "doc1"}]
+    # The caller's entries are not modified
+    assert vectors[0]["id"] == "1"
+    assert vectors[0]["vector"] == [0.1, 0.2]
+
+
+@pytest.mark.asyncio
+async def test_upsert_vectors_counts_failed_batches(qdrant_service):
+    vectors = [
+        {
+            "id": str(i),
+            "vector": [0.1, 0.2],
+            "text": "test",
+            "page_number": 1,
+            "chunk_number": i,
+            "document_id": "doc1",
+        }
+        for i in range(60)
+    ]
+
+    def upsert(collection_name, points, wait):
+        # The second of two batches fails on every attempt
+        if points.ids[0] != "0":
+            raise Exception("boom")
+
+    qdrant_service.client.upsert.side_effect = upsert
+
+    with patch("app.services.vector_db.qdrant_service.asyncio.sleep"):
+        result = await qdrant_service.upsert_vectors(vectors)
+
+    assert result["message"] == "Partially upserted vectors. Success: 40, Failed: 20"
+
+
+@pytest.mark.asyncio
+async def test_upsert_vectors_waits_on_last_batch(qdrant_service):
+    vectors = [
+        {
+            "id": str(i),
+            "vector": [0.1, 0.2],
+            "text": "test",
+            "page_number": 1,
+            "chunk_number": i,
+            "document_id": "doc1",
+        }
+        for i in range(120)
+    ]
+
+    result = await qdrant_service.upsert_vectors(vectors)
+
+    assert result["message"] == "Successfully upserted 120 chunks."
+    waits = [call.kwargs["wait"] for call in qdrant_service.client.upsert.call_args_list]
+    assert waits == [False, False, False, True]
+    assert qdrant_service.client.upsert.call_args.kwargs["points"].ids[0] == "90"
+
+
+@pytest.mark.asyncio
+async def test_upsert_vectors_empty(qdrant_service):
+    result = await qdrant_service.upsert_vectors([])
+
+    assert result["message"] == "Successfully upserted 0 chunks."
+    assert not qdrant_service.client.upsert.called
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_check_collection_once(qdrant_service):
+    def vectors(document_id):
+        return [
+            {
+                "id": "1",
+                "vector": [0.1, 0.2],
+                "text": "test",
+                "page_number": 1,
+                "chunk_number": 1,
+                "document_id": document_id,
+            }
+        ]
+
+    await asyncio.gather(
+        qdrant_service.upsert_vectors(vectors("doc1")),
+        qdrant_service.upsert_vectors(vectors("doc2")),
+    )
+
+    qdrant_service.client.collection_exists.assert_called_once()
+    assert qdrant_service.client.upsert.call_count == 2
+
+
+def test_collection_check_works_on_each_event_loop(qdrant_service):
+    async def collection_exists(collection_name):
+        # Yield so the second upsert contends the lock
+        await asyncio.sleep(0)
+        return True
+
+    qdrant_service.client.collection_exists.side_effect = collection_exists
+    vectors = [
+        {
+            "id": "1",
+            "vector": [0.1, 0.2],
+            "text": "test",
+            "page_number": 1,
+            "chunk_number": 1,
+            "document_id": "doc1",
+        }
+    ]
+
+    async def upsert_twice():
+        QdrantService._collection_ready.clear()
+        await asyncio.gather(
+            qdrant_service.upsert_vectors(vectors),
+            qdrant_service.upsert_vectors(vectors),
+        )
+
+    # A lock shared across loops would raise on the second one
+    asyncio.run(upsert_twice())
+    asyncio.run(upsert_twice())
+
+    assert qdrant_service.client.collection_exists.call_count == 2
 
 
 @pytest.mark.asyncio
@@ -83,7 +244,23 @@ async def test_vector_search(qdrant_service, mock_embeddings_service):
 
     assert isinstance(result, VectorResponseSchema)
     assert result.message == "Query processed successfully."
-    assert qdrant_service.client.query_points.called
+    assert qdrant_service.client.query_batch_points.called
+
+
+@pytest.mark.asyncio
+async def test_vector_search_batches_queries(qdrant_service, mock_embeddings_service):
+    mock_embeddings_service.get_embeddings.reset_mock()
+    mock_embeddings_service.get_embeddings.return_value = [[0.1, 0.2], [0.3, 0.4]]
+
+    result = await qdrant_service.vector_search(["query1", "query2"], "test_doc")
+
+    mock_embeddings_service.get_embeddings.assert_called_once_with(["query1", "query2"], None)
+    # Both queries are searched in one batch request
+    qdrant_service.client.query_batch_points.assert_called_once()
+    requests = qdrant_service.client.query_batch_points.call_args.kwargs["requests"]
+    assert [request.query for request in requests] == [[0.1, 0.2], [0.3, 0.4]]
+    # Both searches return the same chunk, which is kept once
+    assert len(result.chunks) == 1
 
 
 @pytest.mark.asyncio
@@ -105,10 +282,68 @@ async def test_hybrid_search(qdrant_service, mock_embeddings_service):
 
 
 @pytest.mark.asyncio
-async def test_decomposed_search(qdrant_service, mock_llm_service):
+async def test_query_embeddings_are_cached(qdrant_service, mock_embeddings_service):
+    mock_embeddings_service.get_embeddings.reset_mock()
+    mock_embeddings_service.get_embeddings.side_effect = lambda texts, parent_run_id: [
+        [float(len(text))] for text in texts
+    ]
+
+    try:
+        # Concurrent searches for the same query share one embedding request
+        await asyncio.gather(
+            qdrant_service._embed_queries(["same query"]),
+            qdrant_service._embed_queries(["same query"]),
+        )
+        embeddings = await qdrant_service._embed_queries(["same query", "other", "same query"])
+    finally:
+        mock_embeddings_service.get_embeddings.side_effect = None
+
+    assert embeddings == [[10.0], [5.0], [10.0]]
+    assert [call.args[0] for call in mock_embeddings_service.get_embeddings.call_args_list] == [
+        ["same query"],
+        ["other"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_without_keywords(qdrant_service, mock_embeddings_service):
+    mock_embeddings_service.get_embeddings.return_value = [[0.1, 0.2]]
+    qdrant_service.client.query_points.reset_mock()
+
+    with patch.object(qdrant_service, "extract_keywords", return_value=[]):
+        result = await qdrant_service.hybrid_search("test query", "test_doc", [])
+
+    # Only the semantic search runs
+    qdrant_service.client.query_points.assert_called_once()
+    assert len(result.chunks) == 1
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_merges_chunks_in_order(qdrant_service, mock_embeddings_service):
+    mock_embeddings_service.get_embeddings.return_value = [[0.1, 0.2]]
+
+    def payloads(*numbers):
+        return Mock(points=[
+            Mock(payload={"text": f"chunk {n}", "page_number": n, "chunk_number": n, "document_id": "test_doc"})
+            for n in numbers
+        ])
+
+    qdrant_service.client.query_points.side_effect = (
+        lambda **kwargs: payloads(5, 2) if "query" in kwargs else payloads(3, 5)
+    )
+
+    with patch.object(qdrant_service, "extract_keywords", return_value=["chunk"]):
+        result = await qdrant_service.hybrid_search("test query", "test_doc", [])
+
+    assert [chunk.content for chunk in result.chunks] == ["chunk 2", "chunk 3", "chunk 5"]
+
+
+@pytest.mark.asyncio
+async def test_decomposed_search(qdrant_service, mock_llm_service, mock_embeddings_service):
     mock_llm_service.decompose_query.return_value = {
         "sub-queries": ["query1", "query2"]
     }
+    mock_embeddings_service.get_embeddings.return_value = [[0.1, 0.2], [0.3, 0.4]]
 
     result = await qdrant_service.decomposed_search(
         "test query", "test_doc", []
@@ -127,6 +362,19 @@ async def test_delete_document(qdrant_service):
     assert qdrant_service.client.delete.called
 
 
+@pytest.mark.asyncio
+async def test_get_document_chunks_reads_every_page(qdrant_service):
+    qdrant_service.client.scroll.side_effect = [
+        ([Mock(payload={"chunk_number": 1}), Mock(payload={"chunk_number": 2})], "next"),
+        ([Mock(payload={"chunk_number": 3})], None),
+    ]
+
+    chunks = await qdrant_service.get_document_chunks("test_doc")
+
+    assert chunks == [{"chunk_number": 1}, {"chunk_number": 2}, {"chunk_number": 3}]
+    assert qdrant_service.client.scroll.call_args.kwargs["offset"] == "next"
+
+
 @pytest.mark.asyncio
 async def test_keyword_search_not_implemented(qdrant_service):
     with pytest.raises(NotImplementedError):